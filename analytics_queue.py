@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Analytics Write-Behind Queue
+Request handlers enqueue small conversion events and return immediately; a
+background thread writes them to the database in batches, one transaction per
+batch, so conversions never wait on SQLite.
+"""
+
+import queue
+import threading
+import time
+from collections import namedtuple
+
+# One logged conversion; created_at is a time.time() timestamp
+ConversionEvent = namedtuple('ConversionEvent', [
+    'url_count', 'folder_name', 'conversion_type',
+    'client_ip_hash', 'user_agent', 'session_id',
+    'processing_time_ms', 'success', 'created_at'
+])
+
+
+class _FlushRequest:
+    """Queue marker asking the writer to write everything queued before it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class AnalyticsWriter:
+    """
+    Bounded write-behind queue with a single background writer thread.
+
+    write_batch(events) is called from the writer thread with a list of
+    events and must return how many of them were stored. A batch is written
+    when max_batch events are waiting or flush_interval_ms has passed since
+    the first one arrived. When the queue is full new events are dropped
+    (and counted) rather than blocking the request.
+    """
+
+    def __init__(self, write_batch, max_batch=200, flush_interval_ms=250, max_queue=10000):
+        self.write_batch = write_batch
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_queue = max_queue
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'dropped': 0,
+            'written': 0,
+            'rejected': 0,
+            'failed': 0,
+            'batches': 0,
+            'last_batch_ms': 0,
+        }
+
+    def start(self):
+        """Start the background writer thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='analytics-writer', daemon=True)
+            self._thread.start()
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def submit(self, event):
+        """Queue a single event; returns False if it had to be dropped"""
+        return self.submit_many([event])
+
+    def submit_many(self, events):
+        """Queue several events that will be written in the same transaction"""
+        try:
+            self._queue.put_nowait(list(events))
+        except queue.Full:
+            self._count('dropped', len(events))
+            return False
+        self._count('enqueued', len(events))
+        return True
+
+    def flush(self, timeout=5.0):
+        """Block until everything queued so far has been written"""
+        if self._thread is None or not self._thread.is_alive():
+            return False
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.done.wait(timeout)
+
+    def stop(self, timeout=5.0):
+        """Write any queued events and stop the writer thread"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def metrics(self):
+        """Counters for monitoring: queue depth, drops, writes and batch timings"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['queue_depth'] = self._queue.qsize()
+        stats['max_queue'] = self.max_queue
+        return stats
+
+    def _write(self, batch):
+        if not batch:
+            return
+        start_time = time.time()
+        try:
+            written = self.write_batch(batch)
+            self._count('written', written)
+            self._count('rejected', len(batch) - written)
+        except Exception as e:
+            print(f"Database error writing analytics batch: {e}")
+            self._count('failed', len(batch))
+        with self._stats_lock:
+            self._stats['batches'] += 1
+            self._stats['last_batch_ms'] = int((time.time() - start_time) * 1000)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+
+            # Collect items until the batch is full, the interval passes or we are told to flush
+            while True:
+                if item is _STOP:
+                    self._write(batch)
+                    return
+                if isinstance(item, _FlushRequest):
+                    self._write(batch)
+                    batch = []
+                    item.done.set()
+                else:
+                    batch.extend(item)
+                    if len(batch) >= self.max_batch:
+                        break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            self._write(batch)
@@ -5,19 +5,36 @@ A simple Flask web application for converting URLs to HTML bookmarks
 Enhanced with secure database and live statistics
 """
 
-from flask import Flask, render_template, request, send_file, jsonify, Response
-from flask_socketio import SocketIO, emit
+from flask import Flask, render_template, request, send_file, jsonify, Response, stream_with_context
+from flask_socketio import SocketIO, emit, join_room
+import csv
+import io
 import os
 import tempfile
-from datetime import datetime, timedelta
-import json
+from datetime import datetime
 import sqlite3
 import threading
 import hashlib
 import secrets
-import re
 from functools import wraps
+from itertools import chain
 import time
+import atexit
+
+from analytics_queue import AnalyticsWriter, ConversionEvent
+from artifact_store import ArtifactStore, QuotaExceeded
+from background_tasks import PeriodicTask
+from bookmark_formats import FORMATS, convert as convert_records
+from bookmark_writer import BookmarkFoldersHTMLStream, BookmarkHTMLStream, iter_bookmarks
+from conversion_jobs import JobQueue
+from database import ConnectionPool, apply_migrations
+from input_validator import validate_input
+from rate_limiter import create_rate_limiter
+from result_cache import ResultCache, cache_key
+from stats_aggregator import LiveStatsAggregator
+from upload_stream import ChunkReader, UploadRejected, iter_text_chunks, iter_validated_chunks, iter_validated_lines, iter_validated_records
+from url_dedup import UrlDeduplicator
+from url_normalizer import normalize_lines, normalize_text
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', secrets.token_hex(32))
@@ -26,63 +43,35 @@ app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', secrets.token_hex(32))
 socketio = SocketIO(app, cors_allowed_origins="*")
 
 # Database setup with enhanced security
-DATABASE = 'bookmark_stats.db'
-lock = threading.Lock()
+DATABASE = os.environ.get('DATABASE_PATH', 'bookmark_stats.db')
+lock = threading.Lock()  # serializes writers; readers share the pool freely under WAL
+db_pool = ConnectionPool(DATABASE, timeout=30.0)
+atexit.register(db_pool.close_all)
 
-# Rate limiting storage (in production, use Redis)
-rate_limit_storage = {}
+# Rate limiting: fixed-size sliding-window counters per client, capped and swept.
+# Use RATE_LIMIT_BACKEND=sqlite when running several worker processes so they share one limit.
 RATE_LIMIT_WINDOW = 60  # seconds
 RATE_LIMIT_MAX_REQUESTS = 10  # per window
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+RATE_LIMIT_DATABASE = os.environ.get('RATE_LIMIT_DATABASE', 'rate_limits.db')
+RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', 100000))
+rate_limiter = create_rate_limiter(
+    RATE_LIMIT_BACKEND, RATE_LIMIT_MAX_REQUESTS, RATE_LIMIT_WINDOW,
+    max_keys=RATE_LIMIT_MAX_KEYS, database=RATE_LIMIT_DATABASE
+)
 
 def rate_limit(f):
     """Rate limiting decorator"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
         client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
-        current_time = time.time()
-        
-        # Clean old entries
-        rate_limit_storage[client_ip] = [
-            req_time for req_time in rate_limit_storage.get(client_ip, [])
-            if current_time - req_time < RATE_LIMIT_WINDOW
-        ]
         
-        # Check rate limit
-        if len(rate_limit_storage.get(client_ip, [])) >= RATE_LIMIT_MAX_REQUESTS:
+        if not rate_limiter.hit(client_ip):
             return jsonify({'error': 'Rate limit exceeded. Please try again later.'}), 429
         
-        # Add current request
-        if client_ip not in rate_limit_storage:
-            rate_limit_storage[client_ip] = []
-        rate_limit_storage[client_ip].append(current_time)
-        
         return f(*args, **kwargs)
     return decorated_function
 
-def validate_input(data, max_length=10000):
-    """Validate and sanitize input data"""
-    if not isinstance(data, str):
-        return False, "Invalid data type"
-    
-    if len(data) > max_length:
-        return False, f"Data too long (max {max_length} characters)"
-    
-    # Check for potentially malicious content
-    dangerous_patterns = [
-        r'<script[^>]*>.*?</script>',
-        r'javascript:',
-        r'data:text/html',
-        r'vbscript:',
-        r'onload\s*=',
-        r'onerror\s*='
-    ]
-    
-    for pattern in dangerous_patterns:
-        if re.search(pattern, data, re.IGNORECASE):
-            return False, "Potentially malicious content detected"
-    
-    return True, data
-
 def get_client_info():
     """Get client information for analytics"""
     client_ip = request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
@@ -99,308 +88,667 @@ def get_client_info():
 
 def init_database():
     """Initialize the SQLite database for statistics tracking with enhanced security"""
-    with lock:
-        conn = sqlite3.connect(DATABASE, timeout=30.0)
-        cursor = conn.cursor()
-        
-        # Enable WAL mode for better concurrency
-        cursor.execute('PRAGMA journal_mode=WAL')
-        cursor.execute('PRAGMA synchronous=NORMAL')
-        cursor.execute('PRAGMA cache_size=10000')
-        cursor.execute('PRAGMA temp_store=MEMORY')
-        
-        # Create enhanced usage statistics table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS usage_stats (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                url_count INTEGER NOT NULL CHECK (url_count > 0 AND url_count <= 1000),
-                folder_name TEXT CHECK (length(folder_name) <= 100),
-                conversion_type TEXT DEFAULT 'download' CHECK (conversion_type IN ('download', 'quickadd')),
-                client_ip_hash TEXT,
-                user_agent TEXT,
-                session_id TEXT,
-                processing_time_ms INTEGER,
-                success BOOLEAN DEFAULT 1
-            )
-        ''')
-        
-        # Create daily summary table for better performance
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS daily_stats (
-                date TEXT PRIMARY KEY,
-                total_conversions INTEGER DEFAULT 0,
-                total_urls INTEGER DEFAULT 0,
-                unique_users INTEGER DEFAULT 0,
-                avg_processing_time REAL DEFAULT 0,
-                last_updated DATETIME DEFAULT CURRENT_TIMESTAMP
+    # WAL mode and the other PRAGMAs are applied by the connection pool
+    with lock, db_pool.connection() as conn:
+        create_tables(conn.cursor())
+        conn.commit()
+        
+        # Bring existing databases up to the current schema version
+        apply_migrations(conn, SCHEMA_MIGRATIONS)
+
+def create_tables(cursor):
+    """Create the base statistics tables and indexes (schema version 0)"""
+    # Create enhanced usage statistics table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS usage_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            url_count INTEGER NOT NULL CHECK (url_count > 0 AND url_count <= 1000),
+            folder_name TEXT CHECK (length(folder_name) <= 100),
+            conversion_type TEXT DEFAULT 'download' CHECK (conversion_type IN ('download', 'quickadd')),
+            client_ip_hash TEXT,
+            user_agent TEXT,
+            session_id TEXT,
+            processing_time_ms INTEGER,
+            success BOOLEAN DEFAULT 1
+        )
+    ''')
+    
+    # Create daily summary table for better performance
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            date TEXT PRIMARY KEY,
+            total_conversions INTEGER DEFAULT 0,
+            total_urls INTEGER DEFAULT 0,
+            unique_users INTEGER DEFAULT 0,
+            avg_processing_time REAL DEFAULT 0,
+            last_updated DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Create user sessions table for better analytics
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_sessions (
+            session_id TEXT PRIMARY KEY,
+            first_seen DATETIME DEFAULT CURRENT_TIMESTAMP,
+            last_seen DATETIME DEFAULT CURRENT_TIMESTAMP,
+            total_conversions INTEGER DEFAULT 0,
+            total_urls INTEGER DEFAULT 0,
+            client_ip_hash TEXT,
+            user_agent TEXT
+        )
+    ''')
+    
+    # Create indexes for better performance
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_timestamp ON usage_stats(timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_conversion_type ON usage_stats(conversion_type)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_last_seen ON user_sessions(last_seen)')
+
+def migrate_incremental_daily_stats(cursor):
+    """
+    Schema version 1: keep daily_stats incremental.
+    
+    Adds running processing time sums/counts and a per-day distinct user table,
+    so logging a conversion no longer rescans the whole day, and backfills both
+    from the existing usage_stats rows.
+    """
+    cursor.execute('ALTER TABLE daily_stats ADD COLUMN processing_time_sum INTEGER DEFAULT 0')
+    cursor.execute('ALTER TABLE daily_stats ADD COLUMN processing_time_count INTEGER DEFAULT 0')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_users (
+            date TEXT NOT NULL,
+            client_ip_hash TEXT NOT NULL,
+            PRIMARY KEY (date, client_ip_hash)
+        ) WITHOUT ROWID
+    ''')
+    
+    cursor.execute('''
+        INSERT OR IGNORE INTO daily_users (date, client_ip_hash)
+        SELECT DISTINCT DATE(timestamp), client_ip_hash
+        FROM usage_stats
+        WHERE client_ip_hash IS NOT NULL
+    ''')
+    cursor.execute('''
+        UPDATE daily_stats SET
+            processing_time_sum = COALESCE((
+                SELECT SUM(processing_time_ms) FROM usage_stats WHERE DATE(timestamp) = daily_stats.date
+            ), 0),
+            processing_time_count = (
+                SELECT COUNT(processing_time_ms) FROM usage_stats WHERE DATE(timestamp) = daily_stats.date
+            ),
+            unique_users = (
+                SELECT COUNT(*) FROM daily_users WHERE daily_users.date = daily_stats.date
             )
-        ''')
-        
-        # Create user sessions table for better analytics
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_sessions (
-                session_id TEXT PRIMARY KEY,
-                first_seen DATETIME DEFAULT CURRENT_TIMESTAMP,
-                last_seen DATETIME DEFAULT CURRENT_TIMESTAMP,
-                total_conversions INTEGER DEFAULT 0,
-                total_urls INTEGER DEFAULT 0,
-                client_ip_hash TEXT,
-                user_agent TEXT
+    ''')
+
+def migrate_usage_day_hour(cursor):
+    """
+    Schema version 2: indexed day/hour columns on usage_stats.
+    
+    DATE(timestamp) and strftime('%H', timestamp) cannot use an index, so
+    the UTC day and hour are stored with each row instead and every time
+    range query filters and groups on them.
+    """
+    cursor.execute('ALTER TABLE usage_stats ADD COLUMN day TEXT')
+    cursor.execute('ALTER TABLE usage_stats ADD COLUMN hour INTEGER')
+    cursor.execute('''
+        UPDATE usage_stats
+        SET day = DATE(timestamp), hour = CAST(strftime('%H', timestamp) AS INTEGER)
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_day_hour ON usage_stats(day, hour)')
+
+def migrate_hourly_rollup(cursor):
+    """
+    Schema version 3: pre-rolled hourly_stats table.
+    
+    One row per UTC day, hour and conversion type holds the counters the
+    dashboards need, so they read a few hundred rollup rows instead of
+    re-aggregating usage_stats (which may also be compacted).
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS hourly_stats (
+            day TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            conversion_type TEXT NOT NULL,
+            conversions INTEGER DEFAULT 0,
+            urls INTEGER DEFAULT 0,
+            processing_time_sum INTEGER DEFAULT 0,
+            processing_time_count INTEGER DEFAULT 0,
+            successful INTEGER DEFAULT 0,
+            successful_urls INTEGER DEFAULT 0,
+            failed INTEGER DEFAULT 0,
+            PRIMARY KEY (day, hour, conversion_type)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        INSERT OR REPLACE INTO hourly_stats
+        SELECT
+            day, hour, COALESCE(conversion_type, 'download'),
+            COUNT(*),
+            COALESCE(SUM(url_count), 0),
+            COALESCE(SUM(processing_time_ms), 0),
+            COUNT(processing_time_ms),
+            COUNT(CASE WHEN success = 1 THEN 1 END),
+            COALESCE(SUM(CASE WHEN success = 1 THEN url_count END), 0),
+            COUNT(CASE WHEN success = 0 THEN 1 END)
+        FROM usage_stats
+        GROUP BY day, hour, COALESCE(conversion_type, 'download')
+    ''')
+
+def migrate_usage_url_count_limit(cursor):
+    """
+    Schema version 4: drop the 1000 URL cap on usage_stats.url_count.
+    
+    Uploads can convert hundreds of thousands of URLs in one go. SQLite
+    cannot alter a CHECK constraint, so the table is rebuilt and its
+    indexes and AUTOINCREMENT sequence are carried over.
+    """
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'usage_stats'")
+    row = cursor.fetchone()
+    cursor.execute('''
+        CREATE TABLE usage_stats_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            url_count INTEGER NOT NULL CHECK (url_count > 0),
+            folder_name TEXT CHECK (length(folder_name) <= 100),
+            conversion_type TEXT DEFAULT 'download' CHECK (conversion_type IN ('download', 'quickadd')),
+            client_ip_hash TEXT,
+            user_agent TEXT,
+            session_id TEXT,
+            processing_time_ms INTEGER,
+            success BOOLEAN DEFAULT 1,
+            day TEXT,
+            hour INTEGER
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO usage_stats_new (
+            id, timestamp, url_count, folder_name, conversion_type, client_ip_hash,
+            user_agent, session_id, processing_time_ms, success, day, hour
+        )
+        SELECT
+            id, timestamp, url_count, folder_name, conversion_type, client_ip_hash,
+            user_agent, session_id, processing_time_ms, success, day, hour
+        FROM usage_stats
+    ''')
+    cursor.execute('DROP TABLE usage_stats')
+    cursor.execute('ALTER TABLE usage_stats_new RENAME TO usage_stats')
+    if row is not None:
+        cursor.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'usage_stats'", (row[0],)
+        )
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_timestamp ON usage_stats(timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_conversion_type ON usage_stats(conversion_type)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_day_hour ON usage_stats(day, hour)')
+
+def migrate_folder_rollup(cursor):
+    """
+    Schema version 5: per-folder folder_stats rollup.
+    
+    Successful conversions and their URLs are counted per folder name, so
+    the top folders survive compaction of usage_stats. Rows compacted
+    before this migration ran are not counted.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS folder_stats (
+            folder_name TEXT PRIMARY KEY,
+            conversions INTEGER DEFAULT 0,
+            urls INTEGER DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        INSERT OR REPLACE INTO folder_stats
+        SELECT folder_name, COUNT(*), COALESCE(SUM(url_count), 0)
+        FROM usage_stats
+        WHERE success = 1 AND folder_name IS NOT NULL
+        GROUP BY folder_name
+    ''')
+
+# (version, migration) pairs, applied in order by init_database
+SCHEMA_MIGRATIONS = [
+    (1, migrate_incremental_daily_stats),
+    (2, migrate_usage_day_hour),
+    (3, migrate_hourly_rollup),
+    (4, migrate_usage_url_count_limit),
+    (5, migrate_folder_rollup),
+]
+
+# Admin dashboard queries; they read the hourly_stats rollup, never raw usage rows
+ADMIN_SYSTEM_METRICS_SQL = '''
+    SELECT 
+        (SELECT COALESCE(SUM(conversions), 0) FROM hourly_stats) as total_records,
+        (SELECT printf('%s %02d:00:00', day, hour) FROM hourly_stats
+         ORDER BY day, hour LIMIT 1) as first_record,
+        (SELECT printf('%s %02d:00:00', day, hour) FROM hourly_stats
+         ORDER BY day DESC, hour DESC LIMIT 1) as last_record,
+        (SELECT CAST(SUM(processing_time_sum) AS REAL) / NULLIF(SUM(processing_time_count), 0)
+         FROM hourly_stats) as avg_processing_time,
+        (SELECT COALESCE(SUM(failed), 0) FROM hourly_stats) as failed_conversions
+'''
+
+ADMIN_HOURLY_SQL = '''
+    SELECT 
+        hour,
+        SUM(conversions) as conversions,
+        SUM(urls) as urls,
+        CAST(SUM(processing_time_sum) AS REAL) / NULLIF(SUM(processing_time_count), 0) as avg_time
+    FROM hourly_stats
+    WHERE day = DATE('now')
+    GROUP BY hour
+    ORDER BY hour
+'''
+
+ADMIN_TOP_HOURS_SQL = '''
+    SELECT 
+        hour,
+        SUM(conversions) as conversions
+    FROM hourly_stats
+    WHERE day >= DATE('now', '-7 days')
+    GROUP BY hour
+    ORDER BY conversions DESC
+    LIMIT 5
+'''
+
+INSERT_USAGE_SQL = '''
+    INSERT INTO usage_stats (
+        timestamp, day, hour, url_count, folder_name, conversion_type, 
+        client_ip_hash, user_agent, session_id, 
+        processing_time_ms, success
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+UPSERT_SESSION_SQL = '''
+    INSERT OR REPLACE INTO user_sessions (
+        session_id, first_seen, last_seen, 
+        total_conversions, total_urls, 
+        client_ip_hash, user_agent
+    )
+    VALUES (
+        ?,
+        COALESCE((SELECT first_seen FROM user_sessions WHERE session_id = ?), ?),
+        ?,
+        COALESCE((SELECT total_conversions FROM user_sessions WHERE session_id = ?), 0) + ?,
+        COALESCE((SELECT total_urls FROM user_sessions WHERE session_id = ?), 0) + ?,
+        ?, ?
+    )
+'''
+
+INSERT_DAILY_USER_SQL = '''
+    INSERT OR IGNORE INTO daily_users (date, client_ip_hash) VALUES (?, ?)
+'''
+
+UPSERT_HOURLY_SQL = '''
+    INSERT INTO hourly_stats (
+        day, hour, conversion_type, conversions, urls,
+        processing_time_sum, processing_time_count, successful, successful_urls, failed
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(day, hour, conversion_type) DO UPDATE SET
+        conversions = conversions + excluded.conversions,
+        urls = urls + excluded.urls,
+        processing_time_sum = processing_time_sum + excluded.processing_time_sum,
+        processing_time_count = processing_time_count + excluded.processing_time_count,
+        successful = successful + excluded.successful,
+        successful_urls = successful_urls + excluded.successful_urls,
+        failed = failed + excluded.failed
+'''
+
+UPSERT_FOLDER_SQL = '''
+    INSERT INTO folder_stats (folder_name, conversions, urls)
+    VALUES (?, ?, ?)
+    ON CONFLICT(folder_name) DO UPDATE SET
+        conversions = conversions + excluded.conversions,
+        urls = urls + excluded.urls
+'''
+
+# Running totals only: no rescans of the day's usage_stats rows
+UPSERT_DAILY_SQL = '''
+    INSERT INTO daily_stats (
+        date, total_conversions, total_urls, unique_users, 
+        avg_processing_time, processing_time_sum, processing_time_count, last_updated
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(date) DO UPDATE SET
+        total_conversions = total_conversions + excluded.total_conversions,
+        total_urls = total_urls + excluded.total_urls,
+        unique_users = unique_users + excluded.unique_users,
+        processing_time_sum = processing_time_sum + excluded.processing_time_sum,
+        processing_time_count = processing_time_count + excluded.processing_time_count,
+        avg_processing_time = CASE
+            WHEN processing_time_count + excluded.processing_time_count > 0
+            THEN CAST(processing_time_sum + excluded.processing_time_sum AS REAL)
+                 / (processing_time_count + excluded.processing_time_count)
+            ELSE 0
+        END,
+        last_updated = CURRENT_TIMESTAMP
+'''
+
+def write_conversion_batch(events):
+    """
+    Write a batch of conversion events in a single transaction.
+    
+    Returns the number of events stored; rows rejected by the table's
+    CHECK constraints are skipped without failing the rest of the batch.
+    """
+    stored = []
+    sessions = {}
+    days = {}
+    hours = {}
+    folders = {}
+    
+    with lock, db_pool.transaction() as cursor:
+        for event in events:
+            timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(event.created_at))
+            try:
+                cursor.execute(INSERT_USAGE_SQL, (
+                    timestamp, timestamp[:10], int(timestamp[11:13]), event.url_count, event.folder_name, event.conversion_type,
+                    event.client_ip_hash, event.user_agent, event.session_id,
+                    event.processing_time_ms, event.success
+                ))
+            except sqlite3.IntegrityError as e:
+                print(f"Skipping invalid analytics event: {e}")
+                continue
+            stored.append(event)
+            
+            # Combine all conversions of a session (and of a day) into one upsert
+            session = sessions.setdefault(event.session_id, {
+                'first_seen': timestamp, 'conversions': 0, 'urls': 0
+            })
+            session['last_seen'] = timestamp
+            session['conversions'] += 1
+            session['urls'] += event.url_count
+            session['client_ip_hash'] = event.client_ip_hash
+            session['user_agent'] = event.user_agent
+            
+            date = time.strftime('%Y-%m-%d', time.localtime(event.created_at))
+            day = days.setdefault(date, {'conversions': 0, 'urls': 0, 'new_users': 0, 'time_sum': 0, 'time_count': 0})
+            day['conversions'] += 1
+            day['urls'] += event.url_count
+            if event.processing_time_ms is not None:
+                day['time_sum'] += event.processing_time_ms
+                day['time_count'] += 1
+            if event.client_ip_hash is not None:
+                cursor.execute(INSERT_DAILY_USER_SQL, (date, event.client_ip_hash))
+                day['new_users'] += cursor.rowcount
+            
+            # conversions, urls, time sum, time count, successful, successful urls, failed
+            hour = hours.setdefault(
+                (timestamp[:10], int(timestamp[11:13]), event.conversion_type or 'download'),
+                [0, 0, 0, 0, 0, 0, 0]
             )
-        ''')
+            hour[0] += 1
+            hour[1] += event.url_count
+            if event.processing_time_ms is not None:
+                hour[2] += event.processing_time_ms
+                hour[3] += 1
+            if event.success:
+                hour[4] += 1
+                hour[5] += event.url_count
+            else:
+                hour[6] += 1
+            
+            if event.success and event.folder_name is not None:
+                folder = folders.setdefault(event.folder_name, [0, 0])
+                folder[0] += 1
+                folder[1] += event.url_count
         
-        # Create indexes for better performance
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_timestamp ON usage_stats(timestamp)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_usage_conversion_type ON usage_stats(conversion_type)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_last_seen ON user_sessions(last_seen)')
+        # Update or create user sessions
+        for session_id, session in sessions.items():
+            cursor.execute(UPSERT_SESSION_SQL, (
+                session_id, session_id, session['first_seen'], session['last_seen'],
+                session_id, session['conversions'], session_id, session['urls'],
+                session['client_ip_hash'], session['user_agent']
+            ))
         
-        conn.commit()
-        conn.close()
+        # Update daily stats with enhanced metrics
+        for date, day in days.items():
+            cursor.execute(UPSERT_DAILY_SQL, (
+                date, day['conversions'], day['urls'], day['new_users'],
+                day['time_sum'] / day['time_count'] if day['time_count'] else 0,
+                day['time_sum'], day['time_count']
+            ))
+        
+        # Update the hourly rollup
+        for key, counters in hours.items():
+            cursor.execute(UPSERT_HOURLY_SQL, (*key, *counters))
+        
+        # Update the folder rollup
+        for folder_name, counters in folders.items():
+            cursor.execute(UPSERT_FOLDER_SQL, (folder_name, *counters))
+    
+    # Only committed events reach the live statistics
+    live_stats.record(stored)
+    return len(stored)
 
-def log_conversion(url_count, folder_name, conversion_type='download', processing_time_ms=None, success=True):
-    """Log a conversion to the database with enhanced tracking"""
-    client_info = get_client_info()
-    session_id = request.cookies.get('session_id', secrets.token_hex(16))
+# Raw usage_stats rows older than this are compacted away (0 keeps everything).
+# The hourly_stats, daily_stats and daily_users rollups keep their totals.
+USAGE_RETENTION_DAYS = int(os.environ.get('USAGE_RETENTION_DAYS', 0))
+USAGE_ARCHIVE_DATABASE = os.environ.get('USAGE_ARCHIVE_DATABASE')  # optional SQLite file for compacted rows
+COMPACTION_INTERVAL_SECONDS = int(os.environ.get('COMPACTION_INTERVAL_SECONDS', 3600))
+COMPACTION_BATCH_SIZE = 5000
+
+# Oldest rows first, found through idx_usage_day_hour
+EXPIRED_USAGE_IDS_SQL = '''
+    SELECT id FROM main.usage_stats
+    WHERE day < DATE('now', ?)
+    ORDER BY day, id
+    LIMIT ?
+'''
+
+compaction_stats = {
+    'runs': 0,
+    'deleted': 0,
+    'archived': 0,
+    'last_run': None,
+    'last_run_ms': 0,
+}
+
+def compact_usage_stats(retention_days=None, archive_path=None, batch_size=COMPACTION_BATCH_SIZE):
+    """
+    Delete usage_stats rows older than retention_days, copying them to the
+    archive database first if one is configured.
     
-    with lock:
-        conn = sqlite3.connect(DATABASE, timeout=30.0)
-        cursor = conn.cursor()
-        
+    Rows are removed in batches of batch_size, each in its own short
+    transaction, so the analytics writer is never blocked for long.
+    Returns the number of rows removed.
+    """
+    if retention_days is None:
+        retention_days = USAGE_RETENTION_DAYS
+    if archive_path is None:
+        archive_path = USAGE_ARCHIVE_DATABASE
+    if retention_days <= 0:
+        return 0
+    
+    start_time = time.time()
+    cutoff = f'-{int(retention_days)} days'
+    removed = 0
+    
+    with db_pool.connection() as conn:
+        if archive_path:
+            conn.execute('ATTACH DATABASE ? AS archive', (archive_path,))
+        # Each batch's ids are picked once, so exactly the rows archived are deleted
+        conn.execute('CREATE TEMP TABLE IF NOT EXISTS compaction_batch (id INTEGER PRIMARY KEY)')
         try:
-            # Insert the conversion record with enhanced data
-            cursor.execute('''
-                INSERT INTO usage_stats (
-                    url_count, folder_name, conversion_type, 
-                    client_ip_hash, user_agent, session_id, 
-                    processing_time_ms, success
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                url_count, folder_name, conversion_type,
-                client_info['ip_hash'], client_info['user_agent'], session_id,
-                processing_time_ms, success
-            ))
-            
-            # Update or create user session
-            cursor.execute('''
-                INSERT OR REPLACE INTO user_sessions (
-                    session_id, first_seen, last_seen, 
-                    total_conversions, total_urls, 
-                    client_ip_hash, user_agent
-                )
-                VALUES (
-                    ?,
-                    COALESCE((SELECT first_seen FROM user_sessions WHERE session_id = ?), CURRENT_TIMESTAMP),
-                    CURRENT_TIMESTAMP,
-                    COALESCE((SELECT total_conversions FROM user_sessions WHERE session_id = ?), 0) + 1,
-                    COALESCE((SELECT total_urls FROM user_sessions WHERE session_id = ?), 0) + ?,
-                    ?, ?
-                )
-            ''', (session_id, session_id, session_id, session_id, url_count, 
-                  client_info['ip_hash'], client_info['user_agent']))
-            
-            # Update daily stats with enhanced metrics
-            today = datetime.now().strftime('%Y-%m-%d')
-            cursor.execute('''
-                INSERT OR REPLACE INTO daily_stats (
-                    date, total_conversions, total_urls, unique_users, 
-                    avg_processing_time, last_updated
-                )
-                VALUES (
-                    ?,
-                    COALESCE((SELECT total_conversions FROM daily_stats WHERE date = ?), 0) + 1,
-                    COALESCE((SELECT total_urls FROM daily_stats WHERE date = ?), 0) + ?,
-                    (SELECT COUNT(DISTINCT client_ip_hash) FROM usage_stats WHERE DATE(timestamp) = ?),
-                    COALESCE((SELECT AVG(processing_time_ms) FROM usage_stats WHERE DATE(timestamp) = ? AND processing_time_ms IS NOT NULL), 0),
-                    CURRENT_TIMESTAMP
+            if archive_path:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS archive.usage_stats AS SELECT * FROM main.usage_stats WHERE 0'
                 )
-            ''', (today, today, today, url_count, today, today))
-            
-            conn.commit()
-            
-            # Emit real-time update via WebSocket
-            socketio.emit('stats_update', {
-                'type': 'conversion',
-                'url_count': url_count,
-                'conversion_type': conversion_type,
-                'timestamp': datetime.now().isoformat()
-            })
-            
-        except Exception as e:
-            conn.rollback()
-            print(f"Database error in log_conversion: {e}")
+            while True:
+                with lock:
+                    try:
+                        conn.execute('DELETE FROM temp.compaction_batch')
+                        selected = conn.execute(
+                            f'INSERT INTO temp.compaction_batch {EXPIRED_USAGE_IDS_SQL}', (cutoff, batch_size)
+                        ).rowcount
+                        if archive_path:
+                            conn.execute('''
+                                INSERT INTO archive.usage_stats
+                                SELECT * FROM main.usage_stats WHERE id IN (SELECT id FROM temp.compaction_batch)
+                            ''')
+                        deleted = conn.execute(
+                            'DELETE FROM main.usage_stats WHERE id IN (SELECT id FROM temp.compaction_batch)'
+                        ).rowcount
+                        conn.commit()
+                    except Exception:
+                        conn.rollback()
+                        raise
+                removed += deleted
+                if selected < batch_size:
+                    break
         finally:
-            conn.close()
+            conn.execute('DROP TABLE IF EXISTS temp.compaction_batch')
+            if archive_path:
+                conn.execute('DETACH DATABASE archive')
+    
+    compaction_stats['runs'] += 1
+    compaction_stats['deleted'] += removed
+    if archive_path:
+        compaction_stats['archived'] += removed
+    compaction_stats['last_run'] = datetime.now().isoformat()
+    compaction_stats['last_run_ms'] = int((time.time() - start_time) * 1000)
+    return removed
+
+compaction_task = PeriodicTask(COMPACTION_INTERVAL_SECONDS, compact_usage_stats, name='usage-compaction')
+
+# Idle clients are dropped from the rate limiter once their windows have passed
+rate_limit_sweeper = PeriodicTask(RATE_LIMIT_WINDOW, rate_limiter.sweep, name='rate-limit-sweeper')
+
+# In-memory statistics, updated with every stored batch of conversions
+live_stats = LiveStatsAggregator()
+
+# Conversions are logged through a write-behind queue so requests never wait on SQLite
+analytics_writer = AnalyticsWriter(
+    write_conversion_batch,
+    max_batch=int(os.environ.get('ANALYTICS_BATCH_SIZE', 200)),
+    flush_interval_ms=int(os.environ.get('ANALYTICS_FLUSH_INTERVAL_MS', 250)),
+    max_queue=int(os.environ.get('ANALYTICS_QUEUE_SIZE', 10000))
+)
+
+def get_request_client():
+    """Client details and session id for analytics, captured while the request is available"""
+    client_info = get_client_info()
+    client_info['session_id'] = request.cookies.get('session_id', secrets.token_hex(16))
+    return client_info
+
+def log_conversion(url_count, folder_name, conversion_type='download', processing_time_ms=None, success=True,
+                   client=None):
+    """
+    Queue a conversion for logging to the database with enhanced tracking.
+    
+    Outside a request (e.g. in a background job) pass the client captured
+    earlier with get_request_client().
+    """
+    log_conversions([(url_count, folder_name)], conversion_type, processing_time_ms, success, client)
+
+def log_conversions(folders, conversion_type='download', processing_time_ms=None, success=True, client=None):
+    """
+    Queue the (url_count, folder_name) conversions of one request together,
+    so they are written in a single transaction. The processing time is
+    shared out between them.
+    """
+    if client is None:
+        client = get_request_client()
+    
+    created_at = time.time()
+    folder_time_ms = processing_time_ms // len(folders) if processing_time_ms is not None else None
+    analytics_writer.submit_many([
+        ConversionEvent(
+            url_count, folder_name, conversion_type,
+            client['ip_hash'], client['user_agent'], client['session_id'],
+            folder_time_ms, success, created_at
+        )
+        for url_count, folder_name in folders
+    ])
+    
+    # Emit real-time update via WebSocket
+    socketio.emit('stats_update', {
+        'type': 'conversion',
+        'url_count': sum(url_count for url_count, folder_name in folders),
+        'conversion_type': conversion_type,
+        'timestamp': datetime.now().isoformat()
+    })
 
 def get_live_stats():
-    """Get comprehensive live statistics from the database"""
-    with lock:
-        conn = sqlite3.connect(DATABASE, timeout=30.0)
-        cursor = conn.cursor()
-        
-        try:
-            # Get total stats with enhanced metrics
-            cursor.execute('''
-                SELECT 
-                    COUNT(*) as total_conversions,
-                    COALESCE(SUM(url_count), 0) as total_urls,
-                    COUNT(DISTINCT client_ip_hash) as unique_users,
-                    COALESCE(AVG(processing_time_ms), 0) as avg_processing_time,
-                    COUNT(CASE WHEN success = 1 THEN 1 END) as successful_conversions
-                FROM usage_stats
-            ''')
-            total_stats = cursor.fetchone()
-            
-            # Get today's stats
-            today = datetime.now().strftime('%Y-%m-%d')
-            cursor.execute('''
-                SELECT total_conversions, total_urls, unique_users, avg_processing_time
-                FROM daily_stats
-                WHERE date = ?
-            ''', (today,))
-            today_stats = cursor.fetchone()
-            
-            # Get hourly stats for today
-            cursor.execute('''
-                SELECT 
-                    strftime('%H', timestamp) as hour,
-                    COUNT(*) as conversions,
-                    SUM(url_count) as urls
-                FROM usage_stats
-                WHERE DATE(timestamp) = ?
-                GROUP BY strftime('%H', timestamp)
-                ORDER BY hour
-            ''', (today,))
-            hourly_stats = cursor.fetchall()
-            
-            # Get recent activity (last 15 conversions)
-            cursor.execute('''
-                SELECT timestamp, url_count, folder_name, conversion_type, processing_time_ms
-                FROM usage_stats
-                WHERE success = 1
-                ORDER BY timestamp DESC
-                LIMIT 15
-            ''')
-            recent_activity = cursor.fetchall()
-            
-            # Get daily stats for the last 14 days
-            cursor.execute('''
-                SELECT date, total_conversions, total_urls, unique_users
-                FROM daily_stats
-                ORDER BY date DESC
-                LIMIT 14
-            ''')
-            daily_stats = cursor.fetchall()
-            
-            # Get conversion type breakdown
-            cursor.execute('''
-                SELECT conversion_type, COUNT(*) as count, SUM(url_count) as total_urls
-                FROM usage_stats
-                WHERE success = 1
-                GROUP BY conversion_type
-            ''')
-            conversion_breakdown = cursor.fetchall()
-            
-            # Get top folder names
-            cursor.execute('''
-                SELECT folder_name, COUNT(*) as count, SUM(url_count) as total_urls
-                FROM usage_stats
-                WHERE success = 1 AND folder_name IS NOT NULL
-                GROUP BY folder_name
-                ORDER BY count DESC
-                LIMIT 10
-            ''')
-            top_folders = cursor.fetchall()
-            
-            # Get active sessions (last 24 hours)
-            cursor.execute('''
-                SELECT COUNT(DISTINCT session_id) as active_sessions
-                FROM user_sessions
-                WHERE last_seen > datetime('now', '-24 hours')
-            ''')
-            active_sessions = cursor.fetchone()
-            
-            conn.close()
-            
-            return {
-                'total_conversions': total_stats[0] or 0,
-                'total_urls': total_stats[1] or 0,
-                'unique_users': total_stats[2] or 0,
-                'avg_processing_time': round(total_stats[3] or 0, 2),
-                'success_rate': round((total_stats[4] or 0) / max(total_stats[0] or 1, 1) * 100, 1),
-                'today_conversions': today_stats[0] if today_stats else 0,
-                'today_urls': today_stats[1] if today_stats else 0,
-                'today_unique_users': today_stats[2] if today_stats else 0,
-                'today_avg_processing_time': round(today_stats[3] or 0, 2),
-                'active_sessions': active_sessions[0] if active_sessions else 0,
-                'hourly_stats': [
-                    {
-                        'hour': int(stat[0]),
-                        'conversions': stat[1],
-                        'urls': stat[2]
-                    }
-                    for stat in hourly_stats
-                ],
-                'recent_activity': [
-                    {
-                        'timestamp': activity[0],
-                        'url_count': activity[1],
-                        'folder_name': activity[2],
-                        'conversion_type': activity[3],
-                        'processing_time_ms': activity[4]
-                    }
-                    for activity in recent_activity
-                ],
-                'daily_stats': [
-                    {
-                        'date': stat[0],
-                        'conversions': stat[1],
-                        'urls': stat[2],
-                        'unique_users': stat[3]
-                    }
-                    for stat in daily_stats
-                ],
-                'conversion_breakdown': [
-                    {
-                        'type': breakdown[0],
-                        'count': breakdown[1],
-                        'total_urls': breakdown[2]
-                    }
-                    for breakdown in conversion_breakdown
-                ],
-                'top_folders': [
-                    {
-                        'name': folder[0],
-                        'count': folder[1],
-                        'total_urls': folder[2]
-                    }
-                    for folder in top_folders
-                ],
-                'last_updated': datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            print(f"Error getting live stats: {e}")
-            conn.close()
-            return {
-                'total_conversions': 0,
-                'total_urls': 0,
-                'unique_users': 0,
-                'avg_processing_time': 0,
-                'success_rate': 0,
-                'today_conversions': 0,
-                'today_urls': 0,
-                'today_unique_users': 0,
-                'today_avg_processing_time': 0,
-                'active_sessions': 0,
-                'hourly_stats': [],
-                'recent_activity': [],
-                'daily_stats': [],
-                'conversion_breakdown': [],
-                'top_folders': [],
-                'last_updated': datetime.now().isoformat()
-            }
+    """Get comprehensive live statistics from the in-memory aggregates"""
+    return live_stats.snapshot()
+
+# Generated bookmark files live in the artifact store until they expire or the quota evicts them
+ARTIFACT_DIR = os.environ.get('ARTIFACT_DIR', os.path.join(tempfile.gettempdir(), 'bookmark-converter-artifacts'))
+ARTIFACT_SWEEP_INTERVAL_SECONDS = int(os.environ.get('ARTIFACT_SWEEP_INTERVAL_SECONDS', 60))
+artifact_store = ArtifactStore(
+    ARTIFACT_DIR,
+    max_bytes=int(os.environ.get('ARTIFACT_MAX_BYTES', 500 * 1024 * 1024)),
+    ttl_seconds=int(os.environ.get('ARTIFACT_TTL_SECONDS', 6 * 60 * 60)),
+    memory_threshold=int(os.environ.get('ARTIFACT_MEMORY_THRESHOLD', 64 * 1024)),
+    memory_budget=int(os.environ.get('ARTIFACT_MEMORY_BUDGET', 32 * 1024 * 1024))
+)
+artifact_sweeper = PeriodicTask(ARTIFACT_SWEEP_INTERVAL_SECONDS, artifact_store.sweep, name='artifact-sweeper')
+
+# /convert results shared between requests for identical URL lists
+result_cache = ResultCache(artifact_store, max_entries=int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', 1000)))
+
+# Background conversion jobs for large lists
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', 100))
+JOB_MAX_LENGTH = int(os.environ.get('JOB_MAX_LENGTH', 5000000))  # characters per job
+JOB_PROGRESS_INTERVAL = 5000  # lines between progress updates
+
+# /convert/batch limits: folders per request and characters across all their URL lists
+BATCH_MAX_FOLDERS = int(os.environ.get('BATCH_MAX_FOLDERS', 100))
+BATCH_MAX_LENGTH = int(os.environ.get('BATCH_MAX_LENGTH', 1000000))
+
+# Converted files up to this size are built in memory, bigger ones in a temporary file
+CONVERT_SPOOL_MEMORY = int(os.environ.get('CONVERT_SPOOL_MEMORY', 1024 * 1024))
+
+def run_conversion_job(job):
+    """Write a job's bookmark file, pushing progress to the job's room as it goes"""
+    def tracked_lines():
+        for line_number, line in enumerate(job.urls_text.split('\n'), 1):
+            yield line
+            if line_number % JOB_PROGRESS_INTERVAL == 0:
+                job.processed_lines = line_number
+                job.url_count = stream.url_count
+                socketio.emit('job_progress', job.to_dict(), to=job.id)
+                socketio.sleep(0)  # let other requests and jobs run between slices
+    
+    stream = BookmarkHTMLStream(normalize_lines(tracked_lines()), job.folder_name)
+    with artifact_store.create() as (artifact_id, f):
+        url_count = stream.write_to(f)
+    
+    job.processed_lines = job.total_lines
+    job.url_count = url_count
+    if url_count == 0:
+        artifact_store.delete(artifact_id)
+        raise ValueError('No valid URLs found in the provided text')
+    job.result_id = artifact_id
+
+def job_status(job):
+    """Job status for the API and SocketIO events"""
+    status = job.to_dict()
+    if job.status == 'done':
+        status['download_url'] = f'/jobs/{job.id}/download'
+    return status
+
+def finish_conversion_job(job):
+    """Log a finished job and tell its room"""
+    status = job_status(job)
+    if job.status == 'done':
+        log_conversion(job.url_count, job.folder_name, 'download', status['processing_time_ms'], True,
+                       client=job.context)
+        socketio.emit('job_done', status, to=job.id)
+    else:
+        log_conversion(0, 'Error', 'download', status['processing_time_ms'], False, client=job.context)
+        socketio.emit('job_failed', status, to=job.id)
+
+job_queue = JobQueue(
+    run_conversion_job,
+    workers=JOB_WORKERS,
+    max_queue=JOB_QUEUE_SIZE,
+    start_task=socketio.start_background_task,
+    create_queue=socketio.server.eio.create_queue,
+    on_finished=finish_conversion_job
+)
 
 # Initialize database on startup
 init_database()
@@ -409,17 +757,13 @@ def add_sample_data():
     """Add some sample data to demonstrate live statistics"""
     try:
         # Check if we already have data
-        with lock:
-            conn = sqlite3.connect(DATABASE, timeout=30.0)
-            cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(*) FROM usage_stats')
-            count = cursor.fetchone()[0]
-            conn.close()
+        with db_pool.connection() as conn:
+            count = conn.execute('SELECT COUNT(*) FROM usage_stats').fetchone()[0]
             
         if count > 0:
             return  # Already has data
         
-        # Add sample conversions directly to database (without request context)
+        # Sample conversions
         sample_conversions = [
             (15, "Job Sites", "download"),
             (8, "Tech Resources", "quickadd"),
@@ -433,45 +777,17 @@ def add_sample_data():
             (9, "Social Media", "quickadd"),
         ]
         
-        with lock:
-            conn = sqlite3.connect(DATABASE, timeout=30.0)
-            cursor = conn.cursor()
-            
-            for url_count, folder_name, conversion_type in sample_conversions:
-                # Insert directly without request context
-                cursor.execute('''
-                    INSERT INTO usage_stats (
-                        url_count, folder_name, conversion_type, 
-                        client_ip_hash, user_agent, session_id, 
-                        processing_time_ms, success
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    url_count, folder_name, conversion_type,
-                    'sample_data', 'Sample Data Generator', 'sample_session',
-                    150, True
-                ))
-                
-                # Update daily stats
-                today = datetime.now().strftime('%Y-%m-%d')
-                cursor.execute('''
-                    INSERT OR REPLACE INTO daily_stats (
-                        date, total_conversions, total_urls, unique_users, 
-                        avg_processing_time, last_updated
-                    )
-                    VALUES (
-                        ?,
-                        COALESCE((SELECT total_conversions FROM daily_stats WHERE date = ?), 0) + 1,
-                        COALESCE((SELECT total_urls FROM daily_stats WHERE date = ?), 0) + ?,
-                        1,
-                        150.0,
-                        CURRENT_TIMESTAMP
-                    )
-                ''', (today, today, today, url_count))
-            
-            conn.commit()
-            conn.close()
-            
+        # Write them through the normal analytics path (without request context)
+        now = time.time()
+        write_conversion_batch([
+            ConversionEvent(
+                url_count, folder_name, conversion_type,
+                'sample_data', 'Sample Data Generator', 'sample_session',
+                150, True, now
+            )
+            for url_count, folder_name, conversion_type in sample_conversions
+        ])
+        
         print("Sample data added to demonstrate live statistics")
     except Exception as e:
         print(f"Error adding sample data: {e}")
@@ -479,90 +795,51 @@ def add_sample_data():
 # Add sample data for demonstration
 add_sample_data()
 
-def clean_and_process_urls(text):
+# Load the live statistics once; from here on they are updated in memory
+with db_pool.connection() as conn:
+    live_stats.seed(conn.cursor())
+
+# Start writing queued analytics and flush whatever is left on shutdown
+analytics_writer.start()
+atexit.register(analytics_writer.stop)
+
+rate_limit_sweeper.start()
+atexit.register(rate_limit_sweeper.stop)
+
+job_queue.start()
+
+artifact_sweeper.start()
+atexit.register(artifact_sweeper.stop)
+
+# Compact old usage rows in the background when a retention period is set
+if USAGE_RETENTION_DAYS > 0:
+    compaction_task.start()
+    atexit.register(compaction_task.stop)
+
+def clean_and_process_urls(text, dedupe=False):
     """
-    Smart URL processing: clean up messy text and convert to proper URLs
+    Smart URL processing: clean up messy text and convert to proper URLs,
+    optionally leaving out repeated URLs
     """
-    import re
-    
-    # Split by lines and process each line
-    lines = text.split('\n')
-    processed_urls = []
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Remove common prefixes and formatting
-        line = re.sub(r'^[→\-\*\•\d+\.\)]\s*', '', line)  # Remove arrows, bullets, numbers
-        line = re.sub(r'^[A-Za-z\s]+\(', '', line)  # Remove text before parentheses
-        line = re.sub(r'\)$', '', line)  # Remove trailing parentheses
-        
-        # Extract domain from various formats
-        # Pattern 1: Already has http/https
-        if re.match(r'https?://', line):
-            processed_urls.append(line)
-            continue
-            
-        # Pattern 2: Domain with path (e.g., "example.com/path")
-        if re.match(r'^[a-zA-Z0-9][a-zA-Z0-9\-\.]*\.[a-zA-Z]{2,}', line):
-            if not line.startswith('http'):
-                line = 'https://' + line
-            processed_urls.append(line)
-            continue
-            
-        # Pattern 3: Just domain name (e.g., "example.com")
-        if re.match(r'^[a-zA-Z0-9][a-zA-Z0-9\-\.]*\.[a-zA-Z]{2,}$', line):
-            line = 'https://' + line
-            processed_urls.append(line)
-            continue
-    
-    return processed_urls
+    urls = normalize_text(text)
+    if dedupe:
+        urls = list(UrlDeduplicator().filter(urls))
+    return urls
+
+def is_enabled(value):
+    """Whether a JSON, form or query string option is switched on"""
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
 
 def txt_to_bookmarks_html(urls_text, folder_name="Imported Bookmarks"):
     """
     Convert URLs text to HTML bookmarks format with smart processing
     """
-    html_template = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
-<!-- This is an automatically generated file.
-     It will be read and overwritten.
-     DO NOT EDIT! -->
-<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
-<TITLE>Bookmarks</TITLE>
-<H1>Bookmarks</H1>
-<DL><p>
-    <DT><H3>{folder_name}</H3>
-    <DL><p>
-{bookmark_items}
-    </DL><p>
-</DL><p>"""
-    
-    bookmark_items = []
-    
-    # Use smart URL processing
-    processed_urls = clean_and_process_urls(urls_text)
-    
-    for url in processed_urls:
-        if url and (url.startswith('http://') or url.startswith('https://')):
-            # Extract domain name for bookmark title
-            try:
-                from urllib.parse import urlparse
-                parsed = urlparse(url)
-                title = parsed.netloc.replace('www.', '') or url
-            except:
-                title = url
-            
-            bookmark_item = f'        <DT><A HREF="{url}">{title}</A>'
-            bookmark_items.append(bookmark_item)
-    
-    # Generate final HTML
-    final_html = html_template.format(
-        folder_name=folder_name,
-        bookmark_items='\n'.join(bookmark_items)
-    )
+    stream = BookmarkHTMLStream(normalize_lines(urls_text.split('\n')), folder_name)
+    final_html = ''.join(stream)
     
-    return final_html, len(bookmark_items)
+    return final_html, stream.url_count
 
 @app.route('/')
 def index():
@@ -581,6 +858,7 @@ def convert():
         data = request.get_json()
         urls_text = data.get('urls', '')
         folder_name = data.get('folder_name', 'Imported Bookmarks')
+        dedupe = UrlDeduplicator() if is_enabled(data.get('dedupe')) else None
         
         # Validate input
         is_valid, validation_result = validate_input(urls_text)
@@ -594,15 +872,27 @@ def convert():
         if not urls_text.strip():
             return jsonify({'error': 'Please provide some URLs'}), 400
         
-        html_content, url_count = txt_to_bookmarks_html(urls_text, folder_name)
-        
-        if url_count == 0:
-            return jsonify({'error': 'No valid URLs found in the provided text'}), 400
+        # Identical lists (after normalization) reuse the file generated last time
+        urls = normalize_text(urls_text)
+        if dedupe is not None:
+            urls = list(dedupe.filter(urls))
+        key = cache_key(urls, folder_name)
+        artifact_id = result_cache.get(key)
+        cached = artifact_id is not None
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as f:
-            f.write(html_content)
-            temp_file = f.name
+        if cached:
+            url_count = sum(1 for url in urls if url.startswith(('http://', 'https://')))
+        else:
+            # Stream the bookmark file straight into the artifact store
+            stream = BookmarkHTMLStream(urls, folder_name)
+            with artifact_store.create() as (artifact_id, f):
+                url_count = stream.write_to(f)
+            
+            if url_count == 0:
+                artifact_store.delete(artifact_id)
+                return jsonify({'error': 'No valid URLs found in the provided text'}), 400
+            
+            result_cache.add(key, artifact_id)
         
         # Calculate processing time
         processing_time_ms = int((time.time() - start_time) * 1000)
@@ -610,23 +900,372 @@ def convert():
         # Log usage for analytics
         log_conversion(url_count, folder_name, 'download', processing_time_ms, True)
         
+        result = {
+            'success': True,
+            'url_count': url_count,
+            'download_url': f'/download/{artifact_store.filename(artifact_id)}',
+            'processing_time_ms': processing_time_ms,
+            'cached': cached
+        }
+        if dedupe is not None:
+            result['duplicates_removed'] = dedupe.duplicates
+        return jsonify(result)
+    
+    except QuotaExceeded as e:
+        return jsonify({'error': str(e)}), 400
+        
+    except Exception as e:
+        processing_time_ms = int((time.time() - start_time) * 1000)
+        log_conversion(0, 'Error', 'download', processing_time_ms, False)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/convert/batch', methods=['POST'])
+@rate_limit
+def convert_batch():
+    """
+    Convert several URL lists into one bookmark file with a folder for each.
+    
+    Expects {"folders": [{"folder_name": ..., "urls": ...}, ...]}; the whole
+    batch costs one rate limit hit, one file and one analytics transaction.
+    With "dedupe": true, repeated URLs are left out of each folder.
+    """
+    start_time = time.time()
+    try:
+        data = request.get_json()
+        folders = data.get('folders')
+        if not isinstance(folders, list) or not folders:
+            return jsonify({'error': 'Please provide a list of folders'}), 400
+        if len(folders) > BATCH_MAX_FOLDERS:
+            return jsonify({'error': f'Too many folders (max {BATCH_MAX_FOLDERS})'}), 400
+        dedupe = is_enabled(data.get('dedupe'))
+        
+        groups = []
+        dedupers = []
+        total_length = 0
+        for folder in folders:
+            if not isinstance(folder, dict):
+                return jsonify({'error': 'Each folder must be an object with folder_name and urls'}), 400
+            urls_text = folder.get('urls', '')
+            folder_name = folder.get('folder_name', 'Imported Bookmarks')
+            
+            is_valid, validation_result = validate_input(urls_text, max_length=BATCH_MAX_LENGTH)
+            if not is_valid:
+                return jsonify({'error': validation_result}), 400
+            
+            is_valid, validation_result = validate_input(folder_name, max_length=100)
+            if not is_valid:
+                return jsonify({'error': validation_result}), 400
+            
+            total_length += len(urls_text)
+            if total_length > BATCH_MAX_LENGTH:
+                return jsonify({'error': f'Batch too long (max {BATCH_MAX_LENGTH} characters)'}), 400
+            urls = normalize_lines(urls_text.split('\n'))
+            if dedupe:
+                dedupers.append(UrlDeduplicator())
+                urls = dedupers[-1].filter(urls)
+            groups.append((folder_name, urls))
+        
+        stream = BookmarkFoldersHTMLStream(groups)
+        with artifact_store.create() as (artifact_id, f):
+            url_count = stream.write_to(f)
+        
+        if url_count == 0:
+            artifact_store.delete(artifact_id)
+            return jsonify({'error': 'No valid URLs found in the provided folders'}), 400
+        
+        processing_time_ms = int((time.time() - start_time) * 1000)
+        counts = [(count, folder_name) for (folder_name, urls), count in zip(groups, stream.url_counts)]
+        log_conversions([(count, folder_name) for count, folder_name in counts if count > 0],
+                        'download', processing_time_ms, True)
+        
+        results = [{'folder_name': folder_name, 'url_count': count} for count, folder_name in counts]
+        for folder_result, deduper in zip(results, dedupers):
+            folder_result['duplicates_removed'] = deduper.duplicates
+        
         return jsonify({
             'success': True,
             'url_count': url_count,
-            'download_url': f'/download/{os.path.basename(temp_file)}',
+            'folders': results,
+            'download_url': f'/download/{artifact_store.filename(artifact_id)}',
             'processing_time_ms': processing_time_ms
         })
+    
+    except QuotaExceeded as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except Exception as e:
+        processing_time_ms = int((time.time() - start_time) * 1000)
+        log_conversion(0, 'Error', 'download', processing_time_ms, False)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/convert/upload', methods=['POST'])
+@rate_limit
+def convert_upload():
+    """
+    Convert a URL list of any size, sent as a multipart file upload ("file")
+    or as a raw text/plain body. The body is read, validated and converted
+    chunk by chunk, so memory use does not grow with the upload.
+    """
+    start_time = time.time()
+    try:
+        if request.mimetype == 'multipart/form-data':
+            upload = request.files.get('file')
+            if upload is None:
+                return jsonify({'error': 'Please upload a file'}), 400
+            body = upload.stream
+            params = request.form
+        else:
+            body = request.stream
+            params = request.args
+        folder_name = params.get('folder_name', 'Imported Bookmarks')
+        dedupe = UrlDeduplicator() if is_enabled(params.get('dedupe')) else None
+        
+        is_valid, validation_result = validate_input(folder_name, max_length=100)
+        if not is_valid:
+            return jsonify({'error': validation_result}), 400
+        
+        # Lines are validated and normalized as they arrive and written straight to disk
+        lines = iter_validated_lines(iter_text_chunks(body))
+        urls = normalize_lines(lines)
+        if dedupe is not None:
+            urls = dedupe.filter(urls)
+        stream = BookmarkHTMLStream(urls, folder_name)
+        with artifact_store.create() as (artifact_id, f):
+            url_count = stream.write_to(f)
+        
+        if url_count == 0:
+            artifact_store.delete(artifact_id)
+            return jsonify({'error': 'No valid URLs found in the uploaded text'}), 400
         
+        processing_time_ms = int((time.time() - start_time) * 1000)
+        log_conversion(url_count, folder_name, 'download', processing_time_ms, True)
+        
+        result = {
+            'success': True,
+            'url_count': url_count,
+            'download_url': f'/download/{artifact_store.filename(artifact_id)}',
+            'processing_time_ms': processing_time_ms
+        }
+        if dedupe is not None:
+            result['duplicates_removed'] = dedupe.duplicates
+        return jsonify(result)
+    
+    except (UploadRejected, QuotaExceeded) as e:
+        return jsonify({'error': str(e)}), 400
+    
     except Exception as e:
         processing_time_ms = int((time.time() - start_time) * 1000)
         log_conversion(0, 'Error', 'download', processing_time_ms, False)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/convert/file', methods=['POST'])
+@rate_limit
+def convert_file():
+    """
+    Convert a bookmark file between formats (txt, html, json, csv), given
+    as ?from=...&to=... (or form fields) with the file sent like
+    /convert/upload. Records stream from the reader to the writer one at a
+    time and the converted file is sent straight back.
+    """
+    start_time = time.time()
+    try:
+        if request.mimetype == 'multipart/form-data':
+            upload = request.files.get('file')
+            if upload is None:
+                return jsonify({'error': 'Please upload a file'}), 400
+            body = upload.stream
+            params = request.form
+        else:
+            body = request.stream
+            params = request.args
+        from_format = params.get('from', 'txt')
+        to_format = params.get('to', 'html')
+        folder_name = params.get('folder_name', 'Imported Bookmarks')
+        dedupe = UrlDeduplicator() if is_enabled(params.get('dedupe')) else None
+        
+        for file_format in (from_format, to_format):
+            if file_format not in FORMATS:
+                return jsonify({'error': f'Unknown format {file_format!r} (use {", ".join(FORMATS)})'}), 400
+        
+        is_valid, validation_result = validate_input(folder_name, max_length=100)
+        if not is_valid:
+            return jsonify({'error': validation_result}), 400
+        
+        # Text lists get the same smart processing as the other endpoints
+        chunks = iter_text_chunks(body)
+        if from_format == 'txt':
+            source = normalize_lines(iter_validated_lines(chunks))
+            writer = convert_records(source, from_format, to_format, dedupe=dedupe, folder_name=folder_name)
+        else:
+            # The raw text and the decoded records are both checked
+            writer = convert_records(ChunkReader(iter_validated_chunks(chunks)), from_format, to_format,
+                                     dedupe=dedupe, validate=iter_validated_records)
+        
+        target = FORMATS[to_format]
+        output = tempfile.SpooledTemporaryFile(CONVERT_SPOOL_MEMORY)
+        try:
+            text = io.TextIOWrapper(output, encoding='utf-8', newline='' if to_format == 'csv' else None)
+            url_count = writer.write_to(text)
+            text.detach()
+        except Exception:
+            output.close()
+            raise
+        
+        if url_count == 0:
+            output.close()
+            return jsonify({'error': 'No bookmarks found in the uploaded file'}), 400
+        
+        processing_time_ms = int((time.time() - start_time) * 1000)
+        log_conversion(url_count, folder_name, 'download', processing_time_ms, True)
+        
+        output.seek(0)
+        response = send_file(output, mimetype=target.mimetype, as_attachment=True,
+                             download_name='bookmarks' + target.extension)
+        response.headers['X-Bookmark-Count'] = str(url_count)
+        if dedupe is not None:
+            response.headers['X-Duplicates-Removed'] = str(dedupe.duplicates)
+        return response
+    
+    except UploadRejected as e:
+        return jsonify({'error': str(e)}), 400
+    
+    except (ValueError, csv.Error) as e:
+        return jsonify({'error': f'Could not read the uploaded file: {e}'}), 400
+    
+    except Exception as e:
+        processing_time_ms = int((time.time() - start_time) * 1000)
+        log_conversion(0, 'Error', 'download', processing_time_ms, False)
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs', methods=['POST'])
+@rate_limit
+def create_job():
+    """Queue a large conversion and return its job id straight away"""
+    try:
+        data = request.get_json()
+        urls_text = data.get('urls', '')
+        folder_name = data.get('folder_name', 'Imported Bookmarks')
+        
+        is_valid, validation_result = validate_input(urls_text, max_length=JOB_MAX_LENGTH)
+        if not is_valid:
+            return jsonify({'error': validation_result}), 400
+        
+        is_valid, validation_result = validate_input(folder_name, max_length=100)
+        if not is_valid:
+            return jsonify({'error': validation_result}), 400
+        
+        if not urls_text.strip():
+            return jsonify({'error': 'Please provide some URLs'}), 400
+        
+        job = job_queue.submit(urls_text, folder_name, context=get_request_client())
+        if job is None:
+            return jsonify({'error': 'Too many conversions queued. Please try again later.'}), 503
+        
+        status = job_status(job)
+        status['status_url'] = f'/jobs/{job.id}'
+        return jsonify(status), 202
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """Progress and result of a conversion job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job_status(job))
+
+@app.route('/jobs/<job_id>/download')
+def download_job(job_id):
+    """Download the bookmark file of a finished job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job.status != 'done':
+        return jsonify({'error': f'Job is {job.status}'}), 409
+    variant = artifact_store.get(job.result_id, accepted_encodings())
+    if variant is None:
+        return jsonify({'error': 'File not found'}), 404
+    return artifact_response(variant)
+
+@app.route('/convert/stream', methods=['POST'])
+@rate_limit
+def convert_stream():
+    """Convert URLs and stream the bookmark file straight back to the client"""
+    start_time = time.time()
+    try:
+        data = request.get_json()
+        urls_text = data.get('urls', '')
+        folder_name = data.get('folder_name', 'Imported Bookmarks')
+        
+        # Validate input
+        is_valid, validation_result = validate_input(urls_text)
+        if not is_valid:
+            return jsonify({'error': validation_result}), 400
+        
+        is_valid, validation_result = validate_input(folder_name, max_length=100)
+        if not is_valid:
+            return jsonify({'error': validation_result}), 400
+        
+        if not urls_text.strip():
+            return jsonify({'error': 'Please provide some URLs'}), 400
+        
+        # Peek at the first bookmark so an empty result can still get a proper error
+        urls = (url for url in normalize_lines(urls_text.split('\n'))
+                if url.startswith(('http://', 'https://')))
+        if is_enabled(data.get('dedupe')):
+            urls = UrlDeduplicator().filter(urls)
+        first_url = next(urls, None)
+        if first_url is None:
+            return jsonify({'error': 'No valid URLs found in the provided text'}), 400
+        
+        stream = BookmarkHTMLStream(chain([first_url], urls), folder_name)
+        
+        def generate():
+            yield from stream
+            processing_time_ms = int((time.time() - start_time) * 1000)
+            log_conversion(stream.url_count, folder_name, 'download', processing_time_ms, True)
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/html',
+            headers={'Content-Disposition': 'attachment; filename=bookmarks.html'}
+        )
+        
+    except Exception as e:
+        processing_time_ms = int((time.time() - start_time) * 1000)
+        log_conversion(0, 'Error', 'download', processing_time_ms, False)
+        return jsonify({'error': str(e)}), 500
+
+def accepted_encodings():
+    """Content encodings the client accepts, in our order of preference"""
+    return [encoding for encoding in ('br', 'gzip') if request.accept_encodings[encoding]]
+
+def artifact_response(variant):
+    """
+    Send a stored artifact variant as bookmarks.html. Small artifacts come
+    straight from memory; ETag/If-None-Match and Range requests are handled
+    against the encoded bytes.
+    """
+    body = io.BytesIO(variant.data) if variant.data is not None else variant.path
+    response = send_file(
+        body, mimetype='text/html', as_attachment=True, download_name='bookmarks.html',
+        etag=variant.etag, conditional=True
+    )
+    if variant.encoding != 'identity':
+        response.headers['Content-Encoding'] = variant.encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
 @app.route('/download/<filename>')
 def download_file(filename):
+    # Only artifacts in the store's index can be served, so no filesystem lookup for unknown names
+    variant = artifact_store.get_by_filename(filename, accepted_encodings())
+    if variant is None:
+        return jsonify({'error': 'File not found'}), 404
     try:
-        file_path = os.path.join(tempfile.gettempdir(), filename)
-        return send_file(file_path, as_attachment=True, download_name='bookmarks.html')
+        return artifact_response(variant)
     except Exception as e:
         return jsonify({'error': 'File not found'}), 404
 
@@ -652,24 +1291,11 @@ def add_to_browser():
         if not urls_text.strip():
             return jsonify({'error': 'Please provide some URLs'}), 400
         
-        # Process URLs
-        processed_urls = clean_and_process_urls(urls_text)
-        
-        # Create bookmark data for JavaScript
-        bookmarks_data = []
-        for url in processed_urls:
-            if url and (url.startswith('http://') or url.startswith('https://')):
-                try:
-                    from urllib.parse import urlparse
-                    parsed = urlparse(url)
-                    title = parsed.netloc.replace('www.', '') or url
-                except:
-                    title = url
-                
-                bookmarks_data.append({
-                    'title': title,
-                    'url': url
-                })
+        # Process URLs and create bookmark data for JavaScript
+        bookmarks_data = [
+            {'title': title, 'url': url}
+            for title, url in iter_bookmarks(normalize_lines(urls_text.split('\n')))
+        ]
         
         if len(bookmarks_data) == 0:
             return jsonify({'error': 'No valid URLs found in the provided text'}), 400
@@ -740,6 +1366,16 @@ def handle_stats_request():
     except Exception as e:
         emit('error', {'message': 'Failed to fetch statistics'})
 
+@socketio.on('join_job')
+def handle_join_job(data):
+    """Subscribe to progress events for a conversion job"""
+    job = job_queue.get((data or {}).get('job_id'))
+    if job is None:
+        emit('error', {'message': 'Job not found'})
+        return
+    join_room(job.id)
+    emit('job_progress', job_status(job))
+
 @app.route('/admin')
 def admin_dashboard():
     """Admin dashboard for monitoring statistics"""
@@ -747,50 +1383,20 @@ def admin_dashboard():
         stats = get_live_stats()
         
         # Get additional admin data
-        with lock:
-            conn = sqlite3.connect(DATABASE, timeout=30.0)
+        with db_pool.connection() as conn:
             cursor = conn.cursor()
             
             # Get system health metrics
-            cursor.execute('''
-                SELECT 
-                    COUNT(*) as total_records,
-                    MIN(timestamp) as first_record,
-                    MAX(timestamp) as last_record,
-                    AVG(processing_time_ms) as avg_processing_time,
-                    COUNT(CASE WHEN success = 0 THEN 1 END) as failed_conversions
-                FROM usage_stats
-            ''')
+            cursor.execute(ADMIN_SYSTEM_METRICS_SQL)
             system_metrics = cursor.fetchone()
             
             # Get hourly distribution for today
-            cursor.execute('''
-                SELECT 
-                    strftime('%H', timestamp) as hour,
-                    COUNT(*) as conversions,
-                    SUM(url_count) as urls,
-                    AVG(processing_time_ms) as avg_time
-                FROM usage_stats
-                WHERE DATE(timestamp) = DATE('now')
-                GROUP BY strftime('%H', timestamp)
-                ORDER BY hour
-            ''')
+            cursor.execute(ADMIN_HOURLY_SQL)
             hourly_data = cursor.fetchall()
             
             # Get top performing hours
-            cursor.execute('''
-                SELECT 
-                    strftime('%H', timestamp) as hour,
-                    COUNT(*) as conversions
-                FROM usage_stats
-                WHERE DATE(timestamp) >= DATE('now', '-7 days')
-                GROUP BY strftime('%H', timestamp)
-                ORDER BY conversions DESC
-                LIMIT 5
-            ''')
+            cursor.execute(ADMIN_TOP_HOURS_SQL)
             top_hours = cursor.fetchall()
-            
-            conn.close()
         
         admin_data = {
             'system_metrics': {
@@ -824,15 +1430,31 @@ def admin_dashboard():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/metrics')
+def metrics():
+    """Internal counters for monitoring"""
+    return jsonify({
+        'analytics_queue': analytics_writer.metrics(),
+        'rate_limiter': rate_limiter.metrics(),
+        'jobs': job_queue.metrics(),
+        'result_cache': result_cache.metrics(),
+        'artifacts': artifact_store.metrics(),
+        'compaction': dict(compaction_stats, retention_days=USAGE_RETENTION_DAYS),
+        'timestamp': datetime.now().isoformat()
+    })
+
 @app.route('/health')
 def health_check():
     """Health check endpoint"""
     try:
-        # Test database connection
+        # The statistics come from memory, so check the database itself with a query
         stats = get_live_stats()
+        with db_pool.connection() as conn:
+            conn.execute('SELECT 1').fetchone()
         return jsonify({
             'status': 'healthy',
             'database': 'connected',
+            'total_conversions': stats['total_conversions'],
             'timestamp': datetime.now().isoformat()
         })
     except Exception as e:
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Artifact Store
+Owns the generated bookmark files served by /download: each one gets a
+random id and lives in a dedicated directory, an in-memory index answers
+"does it exist" without touching the disk, and old or excess files are
+removed by a TTL sweep and a disk quota.
+
+Several worker processes may share one directory: an id missing from a
+process's index is looked up on disk (and indexed) before it counts as a
+miss, and partial files are only cleaned up once they are older than the
+TTL, since another process may still be writing them.
+
+Artifacts never change once written, so they are compressed once when they
+are stored (gzip, plus brotli when the brotli package is installed) and
+small ones are also kept in memory, ready to be sent as they are.
+"""
+
+import gzip
+import io
+import os
+import re
+import secrets
+import shutil
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+try:
+    import brotli
+except ImportError:  # optional; without it only gzip variants are made
+    brotli = None
+
+ARTIFACT_SUFFIX = '.html'
+PARTIAL_SUFFIX = '.partial'
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# What secrets.token_urlsafe(16) produces; anything else is never looked up on disk
+_ARTIFACT_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{22}')
+
+# Suffix added to the artifact file name for each stored content encoding
+ENCODING_SUFFIXES = {'identity': '', 'gzip': '.gz'}
+if brotli is not None:
+    ENCODING_SUFFIXES['br'] = '.br'
+
+# One stored representation of an artifact; data is set when it is held in memory
+Variant = namedtuple('Variant', ['etag', 'encoding', 'path', 'data', 'size'])
+
+
+class QuotaExceeded(OSError):
+    """A single artifact is larger than the whole store quota"""
+
+
+class _QuotaWriter(io.RawIOBase):
+    """Binary file writer that fails once more than max_bytes have been written"""
+
+    def __init__(self, raw, max_bytes):
+        self.raw = raw
+        self.max_bytes = max_bytes
+        self.bytes_written = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.bytes_written += len(data)
+        if self.bytes_written > self.max_bytes:
+            raise QuotaExceeded(f"Result is larger than the {self.max_bytes} byte storage quota")
+        return self.raw.write(data)
+
+    def close(self):
+        try:
+            self.raw.close()
+        finally:
+            super().close()
+
+
+class _Artifact:
+    """Index entry for one stored artifact: byte size and (optional) contents per encoding"""
+
+    __slots__ = ('sizes', 'data', 'last_used')
+
+    def __init__(self, sizes, last_used, data=None):
+        self.sizes = sizes
+        self.data = data
+        self.last_used = last_used
+
+    @property
+    def size(self):
+        return sum(self.sizes.values())
+
+    @property
+    def memory_size(self):
+        return sum(map(len, self.data.values())) if self.data else 0
+
+
+def _compress_file(source_path, encoding, target_path):
+    """Write a compressed copy of source_path without reading it all into memory"""
+    with open(source_path, 'rb') as source:
+        if encoding == 'gzip':
+            with gzip.GzipFile(target_path, 'wb', compresslevel=GZIP_LEVEL, mtime=0) as target:
+                shutil.copyfileobj(source, target, COPY_CHUNK_SIZE)
+        else:
+            compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            with open(target_path, 'wb') as target:
+                for chunk in iter(lambda: source.read(COPY_CHUNK_SIZE), b''):
+                    target.write(compressor.process(chunk))
+                target.write(compressor.finish())
+
+
+def _compress_bytes(data, encoding):
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return brotli.compress(data, quality=BROTLI_QUALITY)
+
+
+class ArtifactStore:
+    """
+    Directory of generated files with a byte quota and a time-to-live.
+
+    Artifacts are kept in least-recently-used order: the quota evicts from
+    the cold end when a new artifact is added, and sweep() removes anything
+    not used for ttl_seconds. Artifacts of up to memory_threshold bytes are
+    also held in memory while the memory_budget allows.
+    """
+
+    def __init__(self, directory, max_bytes=500 * 1024 * 1024, ttl_seconds=6 * 60 * 60,
+                 memory_threshold=64 * 1024, memory_budget=32 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.memory_threshold = memory_threshold
+        self.memory_budget = memory_budget
+        self._artifacts = OrderedDict()  # artifact id -> _Artifact
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """
+        Index files left by a previous run or other processes (least recently
+        modified first) and drop partial writes abandoned for over the TTL
+        """
+        found = []
+        stale = time.time() - self.ttl_seconds
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if name.endswith(PARTIAL_SUFFIX):
+                    if os.path.getmtime(path) < stale:
+                        os.remove(path)
+                elif name.endswith(ARTIFACT_SUFFIX):
+                    artifact_id = name[:-len(ARTIFACT_SUFFIX)]
+                    found.append((os.path.getmtime(path), artifact_id, self._stat_sizes(artifact_id)))
+            except OSError:
+                pass  # removed by another process meanwhile
+        with self._lock:
+            for mtime, artifact_id, sizes in sorted(found):
+                artifact = self._artifacts[artifact_id] = _Artifact(sizes, mtime)
+                self.total_bytes += artifact.size
+            self._enforce_quota()
+
+    def _stat_sizes(self, artifact_id):
+        """Byte size of each stored encoding of an artifact, from the disk"""
+        sizes = {}
+        for encoding in ENCODING_SUFFIXES:
+            try:
+                sizes[encoding] = os.path.getsize(self._path(artifact_id, encoding))
+            except OSError:
+                pass
+        return sizes
+
+    def _find(self, artifact_id):
+        """
+        Index entry for an artifact (lock held). One written by another
+        process is picked up from the disk and indexed.
+        """
+        artifact = self._artifacts.get(artifact_id)
+        if artifact is not None or not _ARTIFACT_ID_PATTERN.fullmatch(artifact_id):
+            return artifact
+        sizes = self._stat_sizes(artifact_id)
+        if 'identity' not in sizes:
+            return None
+        artifact = self._artifacts[artifact_id] = _Artifact(sizes, time.time())
+        self.total_bytes += artifact.size
+        return artifact
+
+    def filename(self, artifact_id):
+        return artifact_id + ARTIFACT_SUFFIX
+
+    def _path(self, artifact_id, encoding='identity'):
+        return os.path.join(self.directory, self.filename(artifact_id) + ENCODING_SUFFIXES[encoding])
+
+    @contextmanager
+    def create(self):
+        """
+        Write a new artifact.
+
+        Yields (artifact_id, file) where file is open for text writing; the
+        artifact becomes visible only when the block finishes without error.
+        Writes fail with QuotaExceeded as soon as the file outgrows the
+        whole quota, so an unbounded input cannot fill the disk.
+        """
+        artifact_id = secrets.token_urlsafe(16)
+        partial_path = os.path.join(self.directory, artifact_id + PARTIAL_SUFFIX)
+        try:
+            raw = _QuotaWriter(open(partial_path, 'wb', buffering=0), self.max_bytes)
+            with io.TextIOWrapper(io.BufferedWriter(raw), encoding='utf-8') as file:
+                yield artifact_id, file
+            self._add(artifact_id, partial_path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+
+    def _add(self, artifact_id, partial_path):
+        size = os.path.getsize(partial_path)
+        if size > self.max_bytes:
+            raise QuotaExceeded(f"Result is larger than the {self.max_bytes} byte storage quota")
+
+        # Compress once now; every download after this just picks a variant
+        sizes = {'identity': size}
+        data = None
+        if size <= self.memory_threshold:
+            with open(partial_path, 'rb') as file:
+                data = {'identity': file.read()}
+        try:
+            for encoding in ENCODING_SUFFIXES:
+                if encoding == 'identity':
+                    continue
+                path = self._path(artifact_id, encoding)
+                if data is not None:
+                    data[encoding] = _compress_bytes(data['identity'], encoding)
+                    with open(path, 'wb') as file:
+                        file.write(data[encoding])
+                else:
+                    _compress_file(partial_path, encoding, path)
+                sizes[encoding] = os.path.getsize(path)
+            os.replace(partial_path, self._path(artifact_id))
+        except BaseException:
+            self._remove_files(artifact_id, sizes)
+            raise
+
+        with self._lock:
+            artifact = _Artifact(sizes, time.time())
+            if data is not None and self.memory_bytes + sum(map(len, data.values())) <= self.memory_budget:
+                artifact.data = data
+                self.memory_bytes += artifact.memory_size
+            self._artifacts[artifact_id] = artifact
+            self.total_bytes += artifact.size
+            self._enforce_quota()
+
+    def get(self, artifact_id, accepted_encodings=()):
+        """
+        Look up an artifact for sending, marking it used.
+
+        Returns the Variant for the first of accepted_encodings that is
+        stored (falling back to the uncompressed file), or None if the
+        artifact does not exist.
+        """
+        with self._lock:
+            artifact = self._find(artifact_id)
+            if artifact is None:
+                self.misses += 1
+                return None
+            artifact.last_used = time.time()
+            self._artifacts.move_to_end(artifact_id)
+            self.hits += 1
+
+            encoding = next((encoding for encoding in accepted_encodings if encoding in artifact.sizes), 'identity')
+            data = artifact.data[encoding] if artifact.data else None
+            return Variant(
+                f'{artifact_id}.{encoding}', encoding, self._path(artifact_id, encoding), data,
+                artifact.sizes[encoding]
+            )
+
+    def get_by_filename(self, filename, accepted_encodings=()):
+        """Like get(), for a download file name ("<id>.html")"""
+        if not filename.endswith(ARTIFACT_SUFFIX):
+            self.misses += 1
+            return None
+        return self.get(filename[:-len(ARTIFACT_SUFFIX)], accepted_encodings)
+
+    def exists(self, artifact_id):
+        """True if the artifact is stored (does not count as a use)"""
+        with self._lock:
+            return self._find(artifact_id) is not None
+
+    def delete(self, artifact_id):
+        """Remove an artifact"""
+        with self._lock:
+            artifact = self._artifacts.pop(artifact_id, None)
+            if artifact is not None:
+                self._forget(artifact)
+        if artifact is not None:
+            self._remove_files(artifact_id, artifact.sizes)
+
+    def _forget(self, artifact):
+        """Take a removed artifact out of the byte counters (lock held)"""
+        self.total_bytes -= artifact.size
+        self.memory_bytes -= artifact.memory_size
+
+    def _enforce_quota(self):
+        """Evict least recently used artifacts until the store is within its quota (lock held)"""
+        while self.total_bytes > self.max_bytes and len(self._artifacts) > 1:
+            artifact_id, artifact = self._artifacts.popitem(last=False)
+            self._forget(artifact)
+            self.evictions += 1
+            self._remove_files(artifact_id, artifact.sizes)
+
+    def _remove_files(self, artifact_id, encodings):
+        for encoding in encodings:
+            try:
+                os.remove(self._path(artifact_id, encoding))
+            except OSError as e:
+                print(f"Error removing artifact {artifact_id}: {e}")
+
+    def sweep(self, now=None):
+        """Remove artifacts unused for ttl_seconds; returns how many were removed"""
+        if now is None:
+            now = time.time()
+        cutoff = now - self.ttl_seconds
+        expired = []
+        with self._lock:
+            # Least recently used first, so stop at the first one still fresh
+            while self._artifacts:
+                artifact_id, artifact = next(iter(self._artifacts.items()))
+                if artifact.last_used > cutoff:
+                    break
+                del self._artifacts[artifact_id]
+                self._forget(artifact)
+                expired.append((artifact_id, artifact.sizes))
+            self.expired += len(expired)
+        for artifact_id, encodings in expired:
+            self._remove_files(artifact_id, encodings)
+        return len(expired)
+
+    def metrics(self):
+        """Counters for monitoring: stored bytes, lookups and removals"""
+        return {
+            'artifacts': len(self._artifacts),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'memory_bytes': self.memory_bytes,
+            'memory_budget': self.memory_budget,
+            'encodings': sorted(ENCODING_SUFFIXES),
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expired': self.expired,
+        }
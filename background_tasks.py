@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Background Tasks
+A small helper for maintenance jobs (compaction, cleanup sweeps) that run
+every few seconds or minutes on a daemon thread.
+"""
+
+import threading
+
+
+class PeriodicTask:
+    """Call func() every interval seconds on a daemon thread until stopped"""
+
+    def __init__(self, interval, func, name='periodic-task'):
+        self.interval = interval
+        self.func = func
+        self.name = name
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.func()
+            except Exception as e:
+                print(f"Error in background task {self.name}: {e}")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+CSV Import/Export Benchmark
+Writes a generated Name,URL,Folder CSV whose rows name their folders in
+random order, then times reading it, grouping it by folder in memory and
+with the external sort (small sort buffer, runs spilled to disk), and
+exporting it again. Reports rows per second and the peak memory allocated.
+
+Usage: python benchmarks/bench_csv.py [row_count ...]
+Example: python benchmarks/bench_csv.py 1000000 3000000
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bookmark_formats import CSVWriter, NetscapeHTMLWriter, read_csv
+from folder_sort import GroupByFolder
+
+SPILL_ROWS = 50000  # sort buffer for the external sort runs
+
+
+def generate_records(count, seed=1):
+    """Links in random order over 1000 folders two levels deep"""
+    rng = random.Random(seed)
+    folders = [(f'Folder {n // 10}', f'Topic {n % 10}') for n in range(1000)]
+    for n in range(count):
+        yield rng.choice(folders), f'Site {n}', f'https://site{n}.example.com/page?id={n}'
+
+
+def read_rows(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        return sum(1 for _ in read_csv(file))
+
+
+def group_in_memory(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        return sum(1 for _ in GroupByFolder(read_csv(file)))
+
+
+def group_external(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        return sum(1 for _ in GroupByFolder(read_csv(file), max_rows=SPILL_ROWS))
+
+
+def csv_to_html(path):
+    with open(path, encoding='utf-8', newline='') as file, open(os.devnull, 'w', encoding='utf-8') as out:
+        return NetscapeHTMLWriter(GroupByFolder(read_csv(file), max_rows=SPILL_ROWS)).write_to(out)
+
+
+def export_csv(path):
+    with open(path, encoding='utf-8', newline='') as file, open(os.devnull, 'w', encoding='utf-8', newline='') as out:
+        return CSVWriter(read_csv(file)).write_to(out)
+
+
+def measure(run, path):
+    """Time a run, then measure peak allocations on a second run (tracing slows everything down)"""
+    start = time.perf_counter()
+    rows = run(path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    run(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rows, elapsed, peak
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000000, 3000000]
+    steps = [
+        ('read', read_rows),
+        ('group in memory', group_in_memory),
+        ('group external sort', group_external),
+        ('csv -> html', csv_to_html),
+        ('csv -> csv', export_csv),
+    ]
+
+    print(f"{'rows':>9} {'file MB':>8} {'step':>20} {'seconds':>8} {'rows/s':>10} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            path = os.path.join(directory, f'bookmarks-{size}.csv')
+            with open(path, 'w', encoding='utf-8', newline='') as file:
+                CSVWriter(generate_records(size)).write_to(file)
+            file_mb = os.path.getsize(path) / 1e6
+
+            for label, run in steps:
+                rows, elapsed, peak = measure(run, path)
+                if rows != size:
+                    print(f"{label} produced {rows} of {size} rows!")
+                    sys.exit(1)
+                print(f"{size:>9} {file_mb:>8.1f} {label:>20} {elapsed:>8.2f} "
+                      f"{size / elapsed:>10.0f} {peak / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
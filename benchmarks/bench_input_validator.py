@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Input Validator Benchmark
+Compares the original one-regex-per-rule validate_input loop against the
+single-pass compiled validator on clean and malicious payloads.
+
+Usage: python benchmarks/bench_input_validator.py [payload_length ...]
+Example: python benchmarks/bench_input_validator.py 100 1000 10000
+"""
+
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_url_normalizer import generate_text
+from input_validator import validate_input
+from test_input_validator import legacy_validate_input
+
+
+def make_payloads(length):
+    """A clean URL list, and the same list with an event handler at the very end"""
+    clean = generate_text(length // 10 + 1)[:length]
+    malicious = clean[:length - 20] + '<img onerror=x>'
+    return [('clean', clean), ('malicious at end', malicious)]
+
+
+def time_calls(func, payload, repeat):
+    # Rejections are logged; keep that out of the terminal (but in the timings)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = func(payload)
+        elapsed = time.perf_counter() - start
+    return elapsed / repeat, result
+
+
+def main():
+    lengths = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000]
+
+    print(f"{'chars':>7} {'payload':>18} {'legacy us':>10} {'single-pass us':>15} {'speedup':>9}")
+    for length in lengths:
+        repeat = max(10, 2000000 // length)
+        for label, payload in make_payloads(length):
+            legacy_time, legacy_result = time_calls(legacy_validate_input, payload, repeat)
+            new_time, new_result = time_calls(validate_input, payload, repeat)
+
+            if legacy_result != new_result:
+                print(f"Verdict mismatch for {label} payload of {length} characters!")
+                sys.exit(1)
+
+            print(f"{length:>7} {label:>18} {legacy_time * 1e6:>10.1f} "
+                  f"{new_time * 1e6:>15.1f} {legacy_time / new_time:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Netscape Parser Benchmark
+Parses a generated Netscape bookmark file with the incremental parser, with
+a whole-document html.parser handler (the usual stdlib approach) and, when
+it is installed, with BeautifulSoup. Reports links per second and the peak
+memory allocated while parsing.
+
+Usage: python benchmarks/bench_netscape_parser.py [link_count ...]
+Example: python benchmarks/bench_netscape_parser.py 100000 1000000
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from html.parser import HTMLParser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bookmark_formats import NetscapeHTMLWriter
+from netscape_parser import read_netscape_html
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+
+def generate_records(count):
+    """Links spread over 100 folders of 10 subfolders each"""
+    for n in range(count):
+        yield (f'Folder {n // 10000 % 100}', f'Topic {n // 1000 % 10}'), f'Site {n}', f'https://site{n}.example.com/page?id={n}'
+
+
+class _DocumentHandler(HTMLParser):
+    """Collects every link of a whole document with html.parser"""
+
+    def __init__(self):
+        super().__init__()
+        self.links = []
+        self.href = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            self.href = dict(attrs).get('href')
+
+    def handle_data(self, data):
+        if self.href is not None:
+            self.links.append((data, self.href))
+            self.href = None
+
+
+def parse_streaming(path):
+    with open(path, encoding='utf-8') as file:
+        return sum(1 for _ in read_netscape_html(file))
+
+
+def parse_html_parser(path):
+    with open(path, encoding='utf-8') as file:
+        handler = _DocumentHandler()
+        handler.feed(file.read())
+        handler.close()
+    return len(handler.links)
+
+
+def parse_beautifulsoup(path):
+    with open(path, encoding='utf-8') as file:
+        soup = BeautifulSoup(file.read(), 'html.parser')
+    return sum(1 for link in soup.find_all('a', href=True) if link.get_text())
+
+
+def measure(parse, path):
+    """Time a run, then measure peak allocations on a second run (tracing slows everything down)"""
+    start = time.perf_counter()
+    links = parse(path)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    parse(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return links, elapsed, peak
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100000, 1000000]
+    parsers = [('incremental', parse_streaming), ('html.parser document', parse_html_parser)]
+    if BeautifulSoup is not None:
+        parsers.append(('BeautifulSoup', parse_beautifulsoup))
+    else:
+        print("BeautifulSoup is not installed; skipping it")
+
+    print(f"{'links':>9} {'file MB':>8} {'parser':>22} {'seconds':>8} {'links/s':>10} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            path = os.path.join(directory, f'bookmarks-{size}.html')
+            with open(path, 'w', encoding='utf-8') as file:
+                NetscapeHTMLWriter(generate_records(size)).write_to(file)
+            file_mb = os.path.getsize(path) / 1e6
+
+            for label, parse in parsers:
+                links, elapsed, peak = measure(parse, path)
+                if links != size:
+                    print(f"{label} found {links} of {size} links!")
+                    sys.exit(1)
+                print(f"{size:>9} {file_mb:>8.1f} {label:>22} {elapsed:>8.2f} "
+                      f"{size / elapsed:>10.0f} {peak / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
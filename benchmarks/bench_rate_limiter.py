@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Benchmark
+Compares the original dict-of-timestamp-lists rate limiting against the
+sliding-window limiter for many distinct client IPs (time per check and
+memory held once every IP has been seen) and for a few busy clients,
+including the shared SQLite backend.
+
+Usage: python benchmarks/bench_rate_limiter.py [ip_count ...]
+Example: python benchmarks/bench_rate_limiter.py 100000 1000000
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import SQLiteRateLimiter, SlidingWindowRateLimiter
+
+WINDOW = 60
+LIMIT = 10
+
+
+def legacy_hit(storage, client_ip, current_time):
+    """The rate_limit decorator's original bookkeeping"""
+    storage[client_ip] = [
+        req_time for req_time in storage.get(client_ip, [])
+        if current_time - req_time < WINDOW
+    ]
+    if len(storage.get(client_ip, [])) >= LIMIT:
+        return False
+    if client_ip not in storage:
+        storage[client_ip] = []
+    storage[client_ip].append(current_time)
+    return True
+
+
+def generate_ips(count):
+    return [f'{n >> 24 & 255}.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}' for n in range(count)]
+
+
+def run(check, ips, passes=2, trace=False):
+    """Hit every IP passes times; returns seconds taken, or bytes still held when tracing"""
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    now = 1000.0
+    for _ in range(passes):
+        for ip in ips:
+            check(ip, now)
+        now += 1.0
+    elapsed = time.perf_counter() - start
+    if trace:
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return held
+    return elapsed
+
+
+def measure(make_check, ips, passes=2):
+    """Time a fresh run, then measure memory on a second fresh run (tracing slows everything down)"""
+    check, size = make_check()
+    ns = run(check, ips, passes) / (len(ips) * passes) * 1e9
+    held = run(make_check()[0], ips, passes, trace=True)
+    return ns, held, size()
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100000, 1000000]
+
+    print(f"{'ips':>9} {'limiter':>22} {'ns/check':>9} {'MB held':>9} {'keys':>9}")
+    for size in sizes:
+        ips = generate_ips(size)
+
+        def legacy():
+            storage = {}
+            return (lambda ip, now: legacy_hit(storage, ip, now)), storage.__len__
+
+        ns, held, keys = measure(legacy, ips)
+        print(f"{size:>9} {'legacy dict of lists':>22} {ns:>9.0f} {held / 1e6:>9.1f} {keys:>9}")
+
+        for label, max_keys in (('sliding, uncapped', size), ('sliding, 100k cap', 100000)):
+            limiters = []
+
+            def sliding():
+                limiters.append(SlidingWindowRateLimiter(LIMIT, WINDOW, max_keys=max_keys))
+                return limiters[-1].hit, limiters[-1].__len__
+
+            ns, held, keys = measure(sliding, ips)
+            print(f"{size:>9} {label:>22} {ns:>9.0f} {held / 1e6:>9.1f} {keys:>9}")
+
+            sweep_start = time.perf_counter()
+            removed = limiters[-1].sweep(now=1000.0 + 3 * WINDOW)
+            print(f"{'':>9} {'sweep after idle':>22} {(time.perf_counter() - sweep_start) * 1000:>8.0f}ms"
+                  f" removed {removed}")
+
+    # A few busy clients hitting the limit over and over
+    busy = generate_ips(10000)
+    storage = {}
+    legacy_ns = run(lambda ip, now: legacy_hit(storage, ip, now), busy, passes=20) / (len(busy) * 20) * 1e9
+    limiter = SlidingWindowRateLimiter(LIMIT, WINDOW)
+    sliding_ns = run(limiter.hit, busy, passes=20) / (len(busy) * 20) * 1e9
+    with tempfile.TemporaryDirectory() as directory:
+        limiter = SQLiteRateLimiter(LIMIT, WINDOW, os.path.join(directory, 'limits.db'))
+        sqlite_ns = run(limiter.hit, busy, passes=20) / (len(busy) * 20) * 1e9
+    print(f"\n10000 busy clients x 20 requests: legacy {legacy_ns:.0f} ns/check, "
+          f"sliding {sliding_ns:.0f} ns/check, shared sqlite {sqlite_ns:.0f} ns/check")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+URL Deduplication Benchmark
+Deduplicates a generated URL list (one URL in five repeats an earlier one,
+spelled differently) with the exact set and with the Bloom filter fallback.
+Reports URLs per second, duplicates found and the peak memory allocated.
+
+Usage: python benchmarks/bench_url_dedup.py [url_count ...]
+Example: python benchmarks/bench_url_dedup.py 1000000 3000000
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from url_dedup import UrlDeduplicator
+
+
+def generate_urls(count, seed=1):
+    rng = random.Random(seed)
+    for n in range(count):
+        if n and rng.random() < 0.2:
+            yield f'https://WWW.site{rng.randrange(n)}.example.com:443/page/'
+        else:
+            yield f'https://site{n}.example.com/page'
+
+
+def run(count, max_exact):
+    dedupe = UrlDeduplicator(max_exact=max_exact, bloom_capacity=count)
+    kept = sum(1 for _ in dedupe.filter(generate_urls(count)))
+    return kept, dedupe
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000000, 3000000]
+
+    print(f"{'urls':>9} {'mode':>8} {'seconds':>8} {'urls/s':>10} {'duplicates':>11} {'peak MB':>8}")
+    for size in sizes:
+        for label, max_exact in (('exact', size), ('bloom', 1)):
+            start = time.perf_counter()
+            kept, dedupe = run(size, max_exact)
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()
+            run(size, max_exact)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{size:>9} {label:>8} {elapsed:>8.2f} {size / elapsed:>10.0f} "
+                  f"{dedupe.duplicates:>11} {peak / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
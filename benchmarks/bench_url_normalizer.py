@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+URL Normalizer Benchmark
+Compares the original per-line regex chain against the compiled single-pass
+normalizer on generated inputs.
+
+Usage: python benchmarks/bench_url_normalizer.py [line_count ...]
+Example: python benchmarks/bench_url_normalizer.py 10000 100000 1000000
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test_url_normalizer import legacy_clean_and_process_urls
+from url_normalizer import normalize_text
+
+LINE_TEMPLATES = [
+    'https://{host}.com/jobs/{n}',
+    'http://www.{host}.org',
+    '→ {host}.io/path/{n}',
+    '- {host}.net',
+    '{n}. {host}.com',
+    'Job Board ({host}.co)',
+    '{host}.dev/{n}',
+    'not a url {n}',
+    '',
+]
+
+
+def generate_text(line_count, seed=42):
+    """Generate a realistic mix of pasted lines"""
+    rng = random.Random(seed)
+    hosts = ['github', 'indeed', 'linkedin', 'remote', 'stack', 'python', 'news']
+    return '\n'.join(
+        rng.choice(LINE_TEMPLATES).format(host=rng.choice(hosts), n=rng.randint(1, 99999))
+        for _ in range(line_count)
+    )
+
+
+def time_call(func, text):
+    start = time.perf_counter()
+    result = func(text)
+    return time.perf_counter() - start, result
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000]
+
+    print(f"{'lines':>10} {'legacy ns/line':>16} {'compiled ns/line':>18} {'speedup':>9}")
+    for size in sizes:
+        text = generate_text(size)
+        legacy_time, legacy_result = time_call(legacy_clean_and_process_urls, text)
+        new_time, new_result = time_call(normalize_text, text)
+
+        if legacy_result != new_result:
+            print(f"Output mismatch at {size} lines!")
+            sys.exit(1)
+
+        print(f"{size:>10} {legacy_time / size * 1e9:>16.0f} "
+              f"{new_time / size * 1e9:>18.0f} {legacy_time / new_time:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
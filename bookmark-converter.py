@@ -2,79 +2,262 @@
 """
 Text to HTML Bookmarks Converter
 Converts a plain text file containing URLs (one per line) to HTML bookmarks format
-that can be imported into any modern browser.
+that can be imported into any modern browser. With --from/--to it converts
+between any of the bookmark formats: txt, html (Netscape), json (Chrome) and csv.
+
+Input is read and output is written incrementally, so files of any size convert
+in constant memory. Use - for the input or output file to read from stdin or
+write to stdout, e.g.:
+
+    zcat urls.txt.gz | python bookmark-converter.py - - > bookmarks.html
+    python bookmark-converter.py --from json --to csv Bookmarks bookmarks.csv
 """
 
-def txt_to_bookmarks_html(txt_file_path, output_html_path="bookmarks.html"):
+import argparse
+import io
+import os
+import sys
+import time
+
+from bookmark_formats import FORMATS, convert
+from bookmark_writer import BookmarkHTMLStream
+from parallel_converter import DEFAULT_CHUNK_SIZE, ParallelBookmarkHTMLStream
+from url_dedup import DEDUPE_MAX_EXACT, UrlDeduplicator
+
+BUFFER_SIZE = 1024 * 1024  # 1 MB read/write buffers
+
+class _ByteCountingReader(io.RawIOBase):
+    """Raw reader wrapper that counts the bytes read from the underlying stream"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self.raw.seekable()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self.raw.seek(offset, whence)
+
+    def tell(self):
+        return self.raw.tell()
+
+    def readinto(self, buffer):
+        count = self.raw.readinto(buffer)
+        if count:
+            self.bytes_read += count
+        return count
+
+def open_input(path, newline=None):
+    """Open a file (or stdin for -) for buffered, byte-counted text reading"""
+    raw = sys.stdin.buffer if path == '-' else open(path, 'rb', buffering=0)
+    counter = _ByteCountingReader(raw)
+    reader = io.TextIOWrapper(io.BufferedReader(counter, BUFFER_SIZE), encoding='utf-8', newline=newline)
+    return reader, counter
+
+def open_output(path, newline=None):
+    """Open a file (or stdout for -) for buffered text writing"""
+    if path == '-':
+        return io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline=newline, write_through=False)
+    return open(path, 'w', encoding='utf-8', newline=newline, buffering=BUFFER_SIZE)
+
+def txt_to_bookmarks_html(txt_file_path, output_html_path="bookmarks.html", workers=1,
+                          chunk_size=DEFAULT_CHUNK_SIZE, dedupe=None):
     """
     Convert a text file containing URLs to HTML bookmarks format
-    
+
+    Args:
+        txt_file_path: Path to text file with URLs (one per line), or - for stdin
+        output_html_path: Path for output HTML file, or - for stdout
+        workers: Number of worker processes; more than 1 needs a regular input file
+        chunk_size: Bytes of input handed to a worker process at a time
+        dedupe: Optional UrlDeduplicator; repeated URLs are left out (serial mode only)
+    """
+    # Keep stdout clean for the bookmark file when it is used as the output
+    log = sys.stderr if output_html_path == '-' else sys.stdout
+    line_count = 0
+
+    def stripped_lines(file):
+        nonlocal line_count
+        for line in file:
+            line_count += 1
+            yield line.strip()
+
+    if workers > 1:
+        return _parallel_txt_to_bookmarks_html(txt_file_path, output_html_path, workers, chunk_size)
+
+    try:
+        start_time = time.perf_counter()
+        reader, counter = open_input(txt_file_path)
+        try:
+            output_file = open_output(output_html_path)
+            try:
+                lines = stripped_lines(reader)
+                if dedupe is not None:
+                    lines = dedupe.filter(lines)
+                url_count = BookmarkHTMLStream(lines).write_to(output_file)
+            finally:
+                if output_html_path == '-':
+                    output_file.flush()
+                    output_file.detach()
+                else:
+                    output_file.close()
+        finally:
+            if txt_file_path == '-':
+                reader.detach()
+            else:
+                reader.close()
+                counter.raw.close()
+        elapsed = max(time.perf_counter() - start_time, 1e-9)
+
+        report_conversion(url_count, output_html_path, line_count, counter.bytes_read, elapsed, log)
+        if dedupe is not None:
+            print(dedupe.summary(), file=log)
+        return True
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return False
+
+def _parallel_txt_to_bookmarks_html(txt_file_path, output_html_path, workers, chunk_size):
+    """Convert a regular file using a pool of worker processes"""
+    log = sys.stderr if output_html_path == '-' else sys.stdout
+
+    if txt_file_path == '-':
+        print("Error: --workers needs a regular input file, not stdin", file=sys.stderr)
+        return False
+
+    try:
+        start_time = time.perf_counter()
+        stream = ParallelBookmarkHTMLStream(txt_file_path, workers, chunk_size=chunk_size)
+        output_file = open_output(output_html_path)
+        try:
+            url_count = stream.write_to(output_file)
+        finally:
+            if output_html_path == '-':
+                output_file.flush()
+                output_file.detach()
+            else:
+                output_file.close()
+        elapsed = max(time.perf_counter() - start_time, 1e-9)
+
+        report_conversion(url_count, output_html_path, stream.line_count,
+                          os.path.getsize(txt_file_path), elapsed, log)
+        return True
+
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return False
+
+def convert_bookmarks(input_path, output_path, from_format, to_format, dedupe=None):
+    """
+    Convert a bookmark file between any two formats in FORMATS
+
     Args:
-        txt_file_path: Path to text file with URLs (one per line)
-        output_html_path: Path for output HTML file
+        input_path: Path to the input file, or - for stdin
+        output_path: Path for the output file, or - for stdout
+        from_format: Format of the input (txt, html, json or csv)
+        to_format: Format to write
+        dedupe: Optional UrlDeduplicator; bookmarks with repeated URLs are left out
     """
-    
-    html_template = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
-<!-- This is an automatically generated file.
-     It will be read and overwritten.
-     DO NOT EDIT! -->
-<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
-<TITLE>Bookmarks</TITLE>
-<H1>Bookmarks</H1>
-<DL><p>
-    <DT><H3>Imported Bookmarks</H3>
-    <DL><p>
-{bookmark_items}
-    </DL><p>
-</DL><p>"""
-    
-    bookmark_items = []
-    
+    log = sys.stderr if output_path == '-' else sys.stdout
+    # The csv module does its own newline handling
+    input_newline = '' if from_format == 'csv' else None
+    output_newline = '' if to_format == 'csv' else None
+
     try:
-        with open(txt_file_path, 'r', encoding='utf-8') as file:
-            lines = file.readlines()
-            
-        for line in lines:
-            url = line.strip()
-            if url and (url.startswith('http://') or url.startswith('https://')):
-                # Extract domain name for bookmark title
-                try:
-                    from urllib.parse import urlparse
-                    parsed = urlparse(url)
-                    title = parsed.netloc.replace('www.', '') or url
-                except:
-                    title = url
-                
-                bookmark_item = f'        <DT><A HREF="{url}">{title}</A>'
-                bookmark_items.append(bookmark_item)
-        
-        # Generate final HTML
-        final_html = html_template.format(bookmark_items='\n'.join(bookmark_items))
-        
-        # Write to output file
-        with open(output_html_path, 'w', encoding='utf-8') as output_file:
-            output_file.write(final_html)
-            
-        print(f"Successfully converted {len(bookmark_items)} URLs to {output_html_path}")
-        print("You can now import this HTML file into your browser.")
+        start_time = time.perf_counter()
+        reader, counter = open_input(input_path, input_newline)
+        try:
+            output_file = open_output(output_path, output_newline)
+            try:
+                url_count = convert(reader, from_format, to_format, dedupe=dedupe).write_to(output_file)
+            finally:
+                if output_path == '-':
+                    output_file.flush()
+                    output_file.detach()
+                else:
+                    output_file.close()
+        finally:
+            if input_path == '-':
+                reader.detach()
+            else:
+                reader.close()
+                counter.raw.close()
+        elapsed = max(time.perf_counter() - start_time, 1e-9)
+
+        # JSON input is read twice, so count the file once rather than the bytes read
+        byte_count = counter.bytes_read if input_path == '-' else os.path.getsize(input_path)
+        output_name = 'stdout' if output_path == '-' else output_path
+        megabytes = byte_count / (1024 * 1024)
+        print(f"Successfully converted {url_count} bookmarks from {from_format} to {to_format} ({output_name})",
+              file=log)
+        print(f"Read {megabytes:.2f} MB in {elapsed:.2f}s: "
+              f"{url_count / elapsed:,.0f} rows/s, {megabytes / elapsed:.2f} MB/s", file=log)
+        if dedupe is not None:
+            print(dedupe.summary(), file=log)
         return True
-        
+
     except Exception as e:
-        print(f"Error: {e}")
+        print(f"Error: {e}", file=sys.stderr)
         return False
 
+def report_conversion(url_count, output_html_path, line_count, byte_count, elapsed, log):
+    """Print the conversion summary and throughput"""
+    output_name = 'stdout' if output_html_path == '-' else output_html_path
+    megabytes = byte_count / (1024 * 1024)
+    print(f"Successfully converted {url_count} URLs to {output_name}", file=log)
+    print(f"Processed {line_count} lines ({megabytes:.2f} MB) in {elapsed:.2f}s: "
+          f"{line_count / elapsed:,.0f} lines/s, {megabytes / elapsed:.2f} MB/s", file=log)
+    print("You can now import this HTML file into your browser.", file=log)
+
 def main():
-    import sys
-    
-    if len(sys.argv) < 2:
-        print("Usage: python bookmark-converter.py input_file.txt [output_file.html]")
-        print("Example: python bookmark-converter.py my_urls.txt my_bookmarks.html")
+    parser = argparse.ArgumentParser(
+        description="Convert a text file of URLs (one per line) to an HTML bookmarks file.",
+        epilog="Example: python bookmark-converter.py my_urls.txt my_bookmarks.html"
+    )
+    parser.add_argument('input_file', help="text file with URLs, or - to read from stdin")
+    parser.add_argument('output_file', nargs='?',
+                        help="output file (default: bookmarks.html, or bookmarks.<format> with --to), "
+                             "or - to write to stdout")
+    parser.add_argument('--from', dest='from_format', choices=sorted(FORMATS), default='txt',
+                        help="format of the input file (default: txt)")
+    parser.add_argument('--to', dest='to_format', choices=sorted(FORMATS), default='html',
+                        help="format to write (default: html)")
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help="convert with N worker processes (default: 1, serial)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, metavar='BYTES',
+                        help="bytes of input per worker task in --workers mode (default: 8 MB)")
+    parser.add_argument('--dedupe', action='store_true',
+                        help="leave out repeated URLs (compared ignoring case of scheme and host, "
+                             "default ports, www. and trailing slashes)")
+    parser.add_argument('--dedupe-exact-limit', type=int, default=DEDUPE_MAX_EXACT, metavar='N',
+                        help="unique URLs remembered exactly before --dedupe switches to an "
+                             "approximate Bloom filter (default: 1000000)")
+    args = parser.parse_args()
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    if args.dedupe_exact_limit < 1:
+        parser.error("--dedupe-exact-limit must be at least 1")
+    output_file = args.output_file or 'bookmarks' + FORMATS[args.to_format].extension
+    dedupe = UrlDeduplicator(args.dedupe_exact_limit) if args.dedupe else None
+
+    if args.workers > 1 and dedupe is not None:
+        parser.error("--dedupe cannot be combined with --workers")
+    if (args.from_format, args.to_format) == ('txt', 'html'):
+        converted = txt_to_bookmarks_html(args.input_file, output_file, args.workers, args.chunk_size, dedupe)
+    elif args.workers > 1:
+        parser.error("--workers only applies to txt to html conversion")
+    else:
+        converted = convert_bookmarks(args.input_file, output_file, args.from_format, args.to_format, dedupe)
+    if not converted:
         sys.exit(1)
-    
-    input_file = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else "bookmarks.html"
-    
-    txt_to_bookmarks_html(input_file, output_file)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Bookmark Formats
+Readers and writers for the bookmark file formats browsers import and
+export: Netscape HTML, Chrome JSON ("roots" / "bookmark_bar") and CSV
+("Name,URL,Folder"), plus plain text URL lists.
+
+Readers yield (folder_path, title, url) records (see bookmark_tree), their
+folder paths built with bookmark_tree.child_path, and writers take any
+iterable of records, including a BookmarkTree, and produce the document as
+a sequence of chunks. Writers open and close folders as the folder path
+changes between records, so records for one folder should be grouped
+together; pass them through folder_sort.GroupByFolder, which collects them
+in a BookmarkTree, first if they are not.
+
+HTML and JSON are parsed incrementally by netscape_parser and chrome_json.
+FORMATS maps each format name to its reader and writer; convert() connects
+any reader to any writer one record at a time.
+"""
+
+import csv
+import io
+import json
+from collections import namedtuple
+from html import escape
+from itertools import islice
+
+from bookmark_tree import child_path
+from bookmark_writer import DOCUMENT_FOOTER, DOCUMENT_HEADER, iter_bookmarks
+from chrome_json import CHROME_ROOTS, read_chrome_json
+from folder_sort import SORT_BUFFER_ROWS, GroupByFolder
+from netscape_parser import read_netscape_html
+
+CSV_HEADER = ('Name', 'URL', 'Folder')
+CSV_FOLDER_SEPARATOR = '/'
+CSV_WRITE_BATCH_ROWS = 1000
+TEXT_FOLDER_NAME = 'Imported Bookmarks'
+
+
+def _common_depth(a, b):
+    """Length of the shared leading part of two folder paths"""
+    depth = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        depth += 1
+    return depth
+
+
+class _RecordWriter:
+    """
+    Iterable document built from (folder_path, title, url) records.
+
+    After iteration has finished, url_count holds the number of bookmarks
+    that were written.
+    """
+
+    def __init__(self, records):
+        self.records = records
+        self.url_count = 0
+
+    def write_to(self, file):
+        """Write the whole document to an open text file, returning the URL count"""
+        file.writelines(self)
+        return self.url_count
+
+
+class NetscapeHTMLWriter(_RecordWriter):
+    """Netscape bookmark HTML with a nested <DT><H3> folder for every folder path"""
+
+    def __iter__(self):
+        self.url_count = 0
+        yield DOCUMENT_HEADER
+
+        open_path = ()
+        for path, title, url in self.records:
+            if path is not open_path and path != open_path:
+                depth = _common_depth(open_path, path)
+                for level in range(len(open_path), depth, -1):
+                    yield '    ' * level + '</DL><p>\n'
+                for level in range(depth, len(path)):
+                    indent = '    ' * (level + 1)
+                    yield f'{indent}<DT><H3>{escape(path[level], quote=False)}</H3>\n{indent}<DL><p>\n'
+                open_path = path
+            yield f'{"    " * (len(path) + 1)}<DT><A HREF="{escape(url)}">{escape(title, quote=False)}</A>\n'
+            self.url_count += 1
+
+        for level in range(len(open_path), 0, -1):
+            yield '    ' * level + '</DL><p>\n'
+        yield DOCUMENT_FOOTER
+
+
+class ChromeJSONWriter(_RecordWriter):
+    """Chrome "Bookmarks" JSON with every record under the bookmark bar"""
+
+    def __iter__(self):
+        self.url_count = 0
+        yield '{"roots": {"bookmark_bar": {"children": ['
+
+        open_path = ()
+        first = True  # no item written yet in the innermost open children array
+        for path, title, url in self.records:
+            if path is not open_path and path != open_path:
+                depth = _common_depth(open_path, path)
+                for level in range(len(open_path), depth, -1):
+                    yield f'\n], "name": {json.dumps(open_path[level - 1])}, "type": "folder"}}'
+                    first = False
+                for level in range(depth, len(path)):
+                    yield '{"children": [' if first else ',\n{"children": ['
+                    first = True
+                open_path = path
+            item = f'{{"name": {json.dumps(title)}, "type": "url", "url": {json.dumps(url)}}}'
+            yield '\n' + item if first else ',\n' + item
+            first = False
+            self.url_count += 1
+
+        for level in range(len(open_path), 0, -1):
+            yield f'\n], "name": {json.dumps(open_path[level - 1])}, "type": "folder"}}'
+        yield '\n], "name": "Bookmarks bar", "type": "folder"}'
+        for key, name in CHROME_ROOTS[1:]:
+            yield f', "{key}": {{"children": [], "name": "{name}", "type": "folder"}}'
+        yield '}, "version": 1}\n'
+
+
+class CSVWriter(_RecordWriter):
+    """
+    Name,URL,Folder rows; nested folder names are joined with "/".
+
+    Rows are formatted CSV_WRITE_BATCH_ROWS at a time and yielded as one
+    chunk per batch.
+    """
+
+    def __iter__(self):
+        self.url_count = 0
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerow(CSV_HEADER)
+
+        records = iter(self.records)
+        folder_path, folder = None, None
+        while True:
+            rows = []
+            for path, title, url in islice(records, CSV_WRITE_BATCH_ROWS):
+                if path is not folder_path:
+                    folder_path, folder = path, CSV_FOLDER_SEPARATOR.join(path)
+                rows.append((title, url, folder))
+            writer.writerows(rows)
+            self.url_count += len(rows)
+            yield buffer.getvalue()
+            if len(rows) < CSV_WRITE_BATCH_ROWS:
+                break
+            buffer.seek(0)
+            buffer.truncate()
+
+
+class TextWriter(_RecordWriter):
+    """One URL per line; titles and folders are dropped"""
+
+    def __iter__(self):
+        self.url_count = 0
+        for path, title, url in self.records:
+            yield url + '\n'
+            self.url_count += 1
+
+
+def read_txt(file, folder_name=TEXT_FOLDER_NAME):
+    """
+    Yield (folder_path, title, url) records from a text file of URLs, one
+    per line. Every URL goes into one folder and is titled with its domain,
+    as the text to HTML converter does.
+    """
+    path = (folder_name,)
+    for title, url in iter_bookmarks(line.strip() for line in file):
+        yield path, title, url
+
+
+def read_html(file):
+    """Yield (folder_path, title, url) records from a Netscape bookmark HTML file"""
+    return read_netscape_html(file)
+
+
+def read_json(file):
+    """Yield (folder_path, title, url) records from a Chrome bookmarks JSON file"""
+    return read_chrome_json(file)
+
+
+def read_csv(file):
+    """
+    Yield (folder_path, title, url) records from a Name,URL,Folder CSV file.
+
+    The header row picks the columns; without one the columns are taken to
+    be in that order.
+    """
+    rows = csv.reader(file)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [name.strip().lower() for name in header]
+    if 'url' in columns:
+        name_column = columns.index('name') if 'name' in columns else None
+        url_column = columns.index('url')
+        folder_column = columns.index('folder') if 'folder' in columns else None
+    else:
+        name_column, url_column, folder_column = 0, 1, 2
+        rows = _prepend(header, rows)
+
+    paths = {'': ()}
+    for row in rows:
+        if len(row) <= url_column or not row[url_column]:
+            continue
+        folder = row[folder_column] if folder_column is not None and folder_column < len(row) else ''
+        path = paths.get(folder)
+        if path is None:
+            path = ()
+            for name in folder.split(CSV_FOLDER_SEPARATOR):
+                if name:
+                    path = child_path(path, name)
+            paths[folder] = path
+        title = row[name_column] if name_column is not None and name_column < len(row) else ''
+        yield path, title, row[url_column]
+
+
+def _prepend(first, rows):
+    yield first
+    yield from rows
+
+
+# reader(file) yields records and writer(records) is an iterable document.
+# grouped: the reader yields each folder's records together; nested: the
+# writer needs them to be (records from ungrouped readers are regrouped).
+BookmarkFormat = namedtuple('BookmarkFormat', 'reader writer extension mimetype grouped nested')
+
+FORMATS = {
+    'txt': BookmarkFormat(read_txt, TextWriter, '.txt', 'text/plain', True, False),
+    'html': BookmarkFormat(read_html, NetscapeHTMLWriter, '.html', 'text/html', True, True),
+    'json': BookmarkFormat(read_json, ChromeJSONWriter, '.json', 'application/json', True, True),
+    'csv': BookmarkFormat(read_csv, CSVWriter, '.csv', 'text/csv', False, False),
+}
+
+
+def convert(file, from_format, to_format, max_rows=SORT_BUFFER_ROWS, dedupe=None, validate=None,
+            **reader_options):
+    """
+    Return the to_format writer for the records read from file in
+    from_format; reader_options go to the reader (e.g. folder_name for
+    txt). validate, if given, wraps the reader's records (e.g.
+    upload_stream.iter_validated_records). Records whose URL dedupe (a
+    url_dedup.UrlDeduplicator) has seen before are dropped. Nothing is read
+    until the writer is iterated.
+    """
+    source, target = FORMATS[from_format], FORMATS[to_format]
+    records = source.reader(file, **reader_options)
+    if validate is not None:
+        records = validate(records)
+    if dedupe is not None:
+        records = dedupe.filter_records(records)
+    if target.nested and not source.grouped:
+        records = GroupByFolder(records, max_rows)
+    return target.writer(records)
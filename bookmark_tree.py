@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Bookmark Tree
+In-memory model of a bookmark collection: folders nested to any depth, each
+holding its links and subfolders.
+
+Readers and writers exchange bookmarks as (folder_path, title, url)
+records, where folder_path is a tuple of folder names from the top level
+("()" for links outside any folder). The readers build their folder paths
+with child_path, and records that have to be regrouped before they reach a
+writer are collected in a BookmarkTree (folder_sort.GroupByFolder), which
+iterates as a record stream again.
+
+Folders use __slots__ and keep their links array-backed, in parallel title
+and URL lists, so a link costs two list slots rather than an object. Every
+folder name is interned and every folder path tuple is stored once, so
+trees of millions of links stay small.
+"""
+
+import sys
+
+
+def child_path(path, name):
+    """Path of the folder called name inside the folder at path"""
+    return path + (sys.intern(name),)
+
+
+class Folder:
+    """A folder: its path from the top level, its links and its subfolders"""
+
+    __slots__ = ('path', 'titles', 'urls', 'subfolders')
+
+    def __init__(self, path):
+        self.path = path
+        self.titles = []  # link titles, in the order added
+        self.urls = []  # link URLs, parallel to titles
+        self.subfolders = []  # Folder nodes, in the order first seen
+
+    @property
+    def name(self):
+        return self.path[-1] if self.path else ''
+
+    def links(self):
+        """The folder's own links as (title, url) pairs"""
+        return zip(self.titles, self.urls)
+
+
+class BookmarkTree:
+    """
+    Folders and links built from (folder_path, title, url) records.
+
+    Records for the same folder are grouped into it wherever they appear in
+    the input, and folders keep the order in which they were first seen.
+    """
+
+    def __init__(self, records=()):
+        self.root = Folder(())
+        self.by_path = {(): self.root}  # path -> Folder
+        self.link_count = 0
+        self.extend(records)
+
+    def folder(self, path):
+        """Return the folder at path, creating it and any missing parents"""
+        path = tuple(path)
+        folder = self.by_path.get(path)
+        if folder is not None:
+            return folder
+
+        # Walk down from the deepest folder that already exists
+        depth = len(path) - 1
+        while path[:depth] not in self.by_path:
+            depth -= 1
+        folder = self.by_path[path[:depth]]
+        for name in path[depth:]:
+            child = Folder(child_path(folder.path, name))
+            folder.subfolders.append(child)
+            self.by_path[child.path] = child
+            folder = child
+        return folder
+
+    def add(self, folder_path, title, url):
+        """Add a link to the folder at folder_path"""
+        folder = self.folder(folder_path)
+        folder.titles.append(title)
+        folder.urls.append(url)
+        self.link_count += 1
+
+    def extend(self, records):
+        """Add every (folder_path, title, url) record, returning how many there were"""
+        by_path = self.by_path
+        count = 0
+        for folder_path, title, url in records:
+            folder = by_path.get(folder_path)
+            if folder is None:
+                folder = self.folder(folder_path)
+            folder.titles.append(title)
+            folder.urls.append(url)
+            count += 1
+        self.link_count += count
+        return count
+
+    def clear_links(self):
+        """Drop every link, keeping the folders"""
+        for folder in self.walk():
+            folder.titles = []
+            folder.urls = []
+        self.link_count = 0
+
+    def __len__(self):
+        return self.link_count
+
+    def __iter__(self):
+        """
+        Yield the tree as (folder_path, title, url) records, depth first,
+        each folder's own links before its subfolders.
+
+        All records of a folder share one path tuple. Empty folders produce
+        no records.
+        """
+        for folder in self.walk():
+            path = folder.path
+            for title, url in folder.links():
+                yield path, title, url
+
+    def walk(self):
+        """Every folder, the root first, in depth-first order"""
+        stack = [iter((self.root,))]
+        while stack:
+            for folder in stack[-1]:
+                yield folder
+                stack.append(iter(folder.subfolders))
+                break
+            else:
+                stack.pop()
+
+    def folders(self):
+        """All folders except the root, in depth-first order"""
+        walk = self.walk()
+        next(walk)
+        return walk
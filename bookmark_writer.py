@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Streaming Bookmark Writer
+Generates Netscape bookmark HTML as a sequence of small chunks, so a document
+never has to exist in memory as a whole. Chunks can be written to a file,
+returned from a Flask streamed Response, or joined for small inputs.
+"""
+
+from urllib.parse import urlparse
+
+_URL_SCHEMES = ('http://', 'https://')
+
+DOCUMENT_HEADER = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<!-- This is an automatically generated file.
+     It will be read and overwritten.
+     DO NOT EDIT! -->
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+<DL><p>
+"""
+
+DOCUMENT_FOOTER = "</DL><p>"
+
+FOLDER_FOOTER = """
+    </DL><p>
+"""
+
+BOOKMARKS_FOOTER = FOLDER_FOOTER + DOCUMENT_FOOTER
+
+
+def folder_header(folder_name):
+    """Return the <DT><H3> line and opening <DL> of a top-level folder"""
+    return f"""    <DT><H3>{folder_name}</H3>
+    <DL><p>
+"""
+
+
+def bookmarks_header(folder_name="Imported Bookmarks"):
+    """Return the Netscape header up to and including the folder's opening <DL>"""
+    return DOCUMENT_HEADER + folder_header(folder_name)
+
+
+def bookmark_title(url):
+    """Extract the domain name of a URL for use as its bookmark title"""
+    try:
+        return urlparse(url).netloc.replace('www.', '') or url
+    except ValueError:
+        return url
+
+
+def iter_bookmarks(urls):
+    """Yield (title, url) pairs for every http/https URL in urls"""
+    for url in urls:
+        if url and url.startswith(_URL_SCHEMES):
+            yield bookmark_title(url), url
+
+
+def iter_bookmark_items(urls):
+    """Yield one <DT><A> line (without newline) per bookmark"""
+    for title, url in iter_bookmarks(urls):
+        yield f'        <DT><A HREF="{url}">{title}</A>'
+
+
+class BookmarkHTMLStream:
+    """
+    Iterable Netscape bookmark document.
+
+    Iterating yields the header, each bookmark line and the footer in order.
+    After iteration has finished, url_count holds the number of bookmarks
+    that were written.
+    """
+
+    def __init__(self, urls, folder_name="Imported Bookmarks"):
+        self.urls = urls
+        self.folder_name = folder_name
+        self.url_count = 0
+
+    def __iter__(self):
+        self.url_count = 0
+        yield bookmarks_header(self.folder_name)
+
+        separator = ''
+        for item in iter_bookmark_items(self.urls):
+            yield separator + item
+            separator = '\n'
+            self.url_count += 1
+
+        yield BOOKMARKS_FOOTER
+
+    def write_to(self, file):
+        """Write the whole document to an open text file, returning the URL count"""
+        file.writelines(self)
+        return self.url_count
+
+
+class BookmarkFoldersHTMLStream:
+    """
+    Iterable Netscape bookmark document with several top-level folders.
+
+    folders is an iterable of (folder_name, urls) pairs, written in order as
+    sibling <DT><H3> folders. After iteration has finished, url_counts
+    holds the number of bookmarks written to each folder.
+    """
+
+    def __init__(self, folders):
+        self.folders = folders
+        self.url_counts = []
+
+    @property
+    def url_count(self):
+        return sum(self.url_counts)
+
+    def __iter__(self):
+        self.url_counts = []
+        yield DOCUMENT_HEADER
+        for folder_name, urls in self.folders:
+            self.url_counts.append(0)
+            yield folder_header(folder_name)
+
+            separator = ''
+            for item in iter_bookmark_items(urls):
+                yield separator + item
+                separator = '\n'
+                self.url_counts[-1] += 1
+
+            yield FOLDER_FOOTER
+        yield DOCUMENT_FOOTER
+
+    def write_to(self, file):
+        """Write the whole document to an open text file, returning the total URL count"""
+        file.writelines(self)
+        return self.url_count
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Chrome Bookmarks JSON Reader
+Streams (folder_path, title, url) records out of a Chrome "Bookmarks" file
+(roots -> bookmark_bar / other / synced -> children ...) without loading
+the document: an incremental tokenizer turns text chunks into JSON tokens
+and a small state machine walks the nested children arrays.
+
+Chrome writes object keys in sorted order, so a folder's "name" comes after
+its "children". A first pass over the file therefore collects just the
+folder names (one per folder, not per link), and the second pass yields
+the records with their full folder paths. Input that cannot be rewound is
+spooled to a temporary file first.
+"""
+
+import json
+import re
+import shutil
+import tempfile
+
+from bookmark_tree import child_path
+from netscape_parser import iter_file_chunks
+
+PARSE_CHUNK_SIZE = 64 * 1024  # characters read per chunk
+SPOOL_MAX_MEMORY = 1024 * 1024  # unseekable input bigger than this is spooled to disk
+
+# Top-level folders of a Chrome bookmarks file. Records outside any folder
+# belong to the bookmark bar; the other roots become folders of their own.
+CHROME_BOOKMARK_BAR = 'bookmark_bar'
+CHROME_ROOTS = (
+    (CHROME_BOOKMARK_BAR, 'Bookmarks bar'),
+    ('other', 'Other bookmarks'),
+    ('synced', 'Mobile bookmarks'),
+)
+_ROOT_NAMES = dict(CHROME_ROOTS)
+
+# One token after any whitespace, commas and colons: an object with no
+# nested objects or arrays (e.g. a bookmark node; these are passed on whole
+# and decoded by the json module, which is much faster than walking their
+# tokens one by one), a bracket, a string (a key when a colon follows) or a
+# number/literal
+_STRING = r'"([^"\\]*(?:\\.[^"\\]*)*)"'
+_TOKEN_PATTERN = re.compile(
+    r'[\s,:]*(?:'
+    r'(\{[^{}\[\]"]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^{}\[\]"]*)*\})'
+    r'|([{}\[\]])'
+    r'|' + _STRING + r'(\s*:)?'
+    r'|(-?[0-9][0-9.eE+-]*|true|false|null))'
+)
+_SEPARATORS = ' \t\r\n,:'
+_DECODER = json.JSONDecoder()
+
+
+def _tokenize(buffer, final):
+    """Split buffer into tokens; returns (tokens, unconsumed text)"""
+    tokens = []
+    pos = 0
+    # A token that reaches the end of the text may continue in the next chunk
+    limit = len(buffer) if final else len(buffer.rstrip())
+    match = _TOKEN_PATTERN.match
+    while True:
+        token = match(buffer, pos)
+        if token is None:
+            if final and buffer[pos:].strip(_SEPARATORS):
+                raise ValueError(f"Invalid JSON near: {buffer[pos:pos + 40]!r}")
+            break
+        if token.end() >= limit and not final:
+            break
+        flat, bracket, string, colon, scalar = token.groups()
+        if flat is not None:
+            tokens.append(('object', flat))
+        elif bracket is not None:
+            tokens.append((bracket, None))
+        elif string is not None:
+            if '\\' in string:
+                string = json.loads(f'"{string}"')
+            tokens.append(('key' if colon else 'string', string))
+        else:
+            tokens.append(('scalar', scalar))
+        pos = token.end()
+    return tokens, buffer[pos:]
+
+
+def iter_json_tokens(chunks):
+    """
+    Yield (kind, value) tokens from an iterable of JSON text chunks.
+
+    kind is one of "{", "}", "[", "]" (value None), "key", "string",
+    "scalar" (the number or literal as written) or "object" (the text of
+    an object that contains no objects or arrays).
+    """
+    rest = ''
+    for chunk in chunks:
+        tokens, rest = _tokenize(rest + chunk, final=False)
+        yield from tokens
+    tokens, rest = _tokenize(rest, final=True)
+    yield from tokens
+
+
+# Walker frame kinds
+_DOCUMENT, _TOP, _ROOTS, _NODE, _CHILDREN, _SKIP = range(6)
+
+
+class _Frame:
+    """An open JSON container and what we know about it"""
+
+    __slots__ = ('kind', 'key', 'depth', 'ordinal', 'root', 'path', 'name', 'url', 'type', 'folder')
+
+    def __init__(self, kind, path=None, ordinal=None, root=None):
+        self.kind = kind
+        self.key = None  # key of the value being read (objects)
+        self.depth = 0  # nested containers inside a skipped one
+        self.ordinal = ordinal  # position of a node in document order
+        self.root = root  # root key for the top-level nodes
+        self.path = path  # parent folder path for nodes, own path for children arrays
+        self.name = None
+        self.url = None
+        self.type = None
+        self.folder = False
+
+
+def _walk(tokens, folder_names, collect_names=False):
+    """
+    Walk the bookmark nodes of a Chrome bookmarks token stream.
+
+    With collect_names, fills folder_names (node ordinal -> name) and yields
+    nothing; otherwise yields (folder_path, title, url) records, taking the
+    names of folders whose name comes after their children from
+    folder_names. Truncated input (containers still open at the end)
+    raises ValueError.
+    """
+    stack = [_Frame(_DOCUMENT)]
+    ordinal = 0
+    for kind, value in tokens:
+        frame = stack[-1]
+        if kind == 'key':
+            frame.key = value
+            continue
+
+        if frame.kind == _SKIP:
+            if kind == '{' or kind == '[':
+                frame.depth += 1
+            elif kind == '}' or kind == ']':
+                if frame.depth:
+                    frame.depth -= 1
+                else:
+                    stack.pop()
+            continue
+
+        if kind == '}' or kind == ']':
+            stack.pop()
+            if frame.kind == _NODE:
+                if frame.folder:
+                    if collect_names:
+                        folder_names[frame.ordinal] = frame.name
+                elif frame.url and frame.type in ('url', None) and not collect_names:
+                    yield frame.path, frame.name or '', frame.url
+            continue
+
+        if kind == 'object':
+            # A node without children: a bookmark (or an empty folder)
+            if frame.kind == _CHILDREN or (frame.kind == _ROOTS and frame.key in _ROOT_NAMES):
+                ordinal += 1
+                if frame.kind == _CHILDREN and not collect_names:
+                    node = _DECODER.raw_decode(value)[0]
+                    url, name = node.get('url'), node.get('name')
+                    if isinstance(url, str) and url and node.get('type', 'url') == 'url':
+                        yield frame.path, name if isinstance(name, str) else '', url
+            continue
+
+        # A value inside frame: a string, a scalar or a container being opened
+        container = kind == '{' or kind == '['
+        child = None
+        if frame.kind == _NODE:
+            if kind == '[' and frame.key == 'children':
+                frame.folder = True
+                path = None
+                if not collect_names:
+                    name = frame.name if frame.name is not None else folder_names.get(frame.ordinal)
+                    if frame.root is None:
+                        path = child_path(frame.path, name or '')
+                    elif frame.root != CHROME_BOOKMARK_BAR:
+                        path = child_path((), name or _ROOT_NAMES[frame.root])
+                    else:
+                        path = ()
+                child = _Frame(_CHILDREN, path)
+            elif kind == 'string':
+                if frame.key == 'name':
+                    frame.name = value
+                elif frame.key == 'url':
+                    frame.url = value
+                elif frame.key == 'type':
+                    frame.type = value
+        elif frame.kind == _CHILDREN:
+            if kind == '{':
+                child = _Frame(_NODE, frame.path, ordinal)
+                ordinal += 1
+        elif frame.kind == _ROOTS:
+            if kind == '{' and frame.key in _ROOT_NAMES:
+                child = _Frame(_NODE, (), ordinal, root=frame.key)
+                ordinal += 1
+        elif frame.kind == _TOP:
+            if kind == '{' and frame.key == 'roots':
+                child = _Frame(_ROOTS)
+        elif kind == '{':
+            child = _Frame(_TOP)
+
+        if child is not None:
+            stack.append(child)
+        elif container:
+            stack.append(_Frame(_SKIP))
+
+    if len(stack) > 1:
+        raise ValueError(f"Invalid JSON: input ends inside {len(stack) - 1} unclosed object(s) or array(s)")
+
+
+def read_chrome_json(file, chunk_size=PARSE_CHUNK_SIZE):
+    """Yield (folder_path, title, url) records from an open Chrome bookmarks JSON file"""
+    if not file.seekable():
+        spool = tempfile.SpooledTemporaryFile(SPOOL_MAX_MEMORY, mode='w+', encoding='utf-8')
+        with spool:
+            shutil.copyfileobj(file, spool, chunk_size)
+            spool.seek(0)
+            yield from read_chrome_json(spool, chunk_size)
+        return
+
+    start = file.tell()
+    folder_names = {}
+    for _ in _walk(iter_json_tokens(iter_file_chunks(file, chunk_size)), folder_names, collect_names=True):
+        pass
+    file.seek(start)
+    yield from _walk(iter_json_tokens(iter_file_chunks(file, chunk_size)), folder_names)
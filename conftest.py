@@ -0,0 +1,12 @@
+"""
+Shared pytest setup
+Points the web app at a throwaway statistics database and artifact directory so
+importing app.py in tests never touches bookmark_stats.db
+"""
+
+import os
+import tempfile
+
+_test_dir = tempfile.mkdtemp(prefix='bookmark-converter-tests-')
+os.environ.setdefault('DATABASE_PATH', os.path.join(_test_dir, 'bookmark_stats.db'))
+os.environ.setdefault('ARTIFACT_DIR', os.path.join(_test_dir, 'artifacts'))
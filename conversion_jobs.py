@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Conversion Jobs
+Runs large conversions in the background: submitting a job returns at once
+with an id, a fixed number of workers take jobs from a bounded queue, and the
+job record tracks progress so it can be polled or pushed to the client.
+
+Workers are started through start_task and the queue is made by
+create_queue, so the app can hand in its SocketIO server's versions and the
+workers cooperate with whichever async mode it runs in (eventlet, gevent or
+plain threads).
+"""
+
+import queue
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+
+def _start_thread(target):
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+class ConversionJob:
+    """One queued conversion and its progress"""
+
+    def __init__(self, urls_text, folder_name, context=None):
+        self.id = secrets.token_urlsafe(12)
+        self.urls_text = urls_text  # released once the job has run
+        self.folder_name = folder_name
+        self.context = context  # whatever the caller needs when the job finishes
+        self.status = 'queued'
+        self.total_lines = urls_text.count('\n') + 1
+        self.processed_lines = 0
+        self.url_count = 0
+        self.result_id = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+    def percent(self):
+        if self.status == 'done':
+            return 100.0
+        return round(self.processed_lines / max(self.total_lines, 1) * 100, 1)
+
+    def to_dict(self):
+        """Job status in the /jobs/<id> response format"""
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'folder_name': self.folder_name,
+            'total_lines': self.total_lines,
+            'processed_lines': self.processed_lines,
+            'url_count': self.url_count,
+            'percent': self.percent(),
+            'error': self.error,
+            'processing_time_ms': (
+                int((self.finished_at - self.started_at) * 1000) if self.finished_at and self.started_at else None
+            ),
+        }
+
+
+class JobQueue:
+    """
+    Bounded queue of ConversionJobs served by a fixed pool of workers.
+
+    run_job(job) does the work, updating the job's progress as it goes and
+    setting result_id and url_count; an exception marks the job failed.
+    on_finished(job), if given, is called once the job is done or failed.
+    Finished jobs are remembered (oldest forgotten first) up to max_finished.
+    """
+
+    def __init__(self, run_job, workers=2, max_queue=100, max_finished=1000,
+                 start_task=_start_thread, create_queue=queue.Queue, on_finished=None):
+        self.run_job = run_job
+        self.on_finished = on_finished
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_finished = max_finished
+        self.start_task = start_task
+        self._queue = create_queue(max_queue)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._started = False
+        self.busy_workers = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the worker tasks"""
+        if not self._started:
+            self._started = True
+            for _ in range(self.workers):
+                self.start_task(self._work)
+
+    def submit(self, urls_text, folder_name, context=None):
+        """Queue a conversion; returns the job, or None if the queue is full"""
+        job = ConversionJob(urls_text, folder_name, context)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            self.rejected += 1
+            return None
+        self.submitted += 1
+        return job
+
+    def get(self, job_id):
+        """Look up a job by id (None if unknown or long forgotten)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def metrics(self):
+        """Counters for monitoring: workers, queue depth and job outcomes"""
+        return {
+            'workers': self.workers,
+            'busy_workers': self.busy_workers,
+            'queue_depth': self._queue.qsize(),
+            'max_queue': self.max_queue,
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+            'completed': self.completed,
+            'failed': self.failed,
+        }
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            self.busy_workers += 1
+            job.status = 'running'
+            job.started_at = time.time()
+            try:
+                self.run_job(job)
+                job.status = 'done'
+                self.completed += 1
+            except Exception as e:
+                print(f"Error running conversion job {job.id}: {e}")
+                job.status = 'failed'
+                job.error = str(e)
+                self.failed += 1
+            finally:
+                job.finished_at = time.time()
+                job.urls_text = None
+                self.busy_workers -= 1
+                self._forget_old_jobs()
+            if self.on_finished is not None:
+                try:
+                    self.on_finished(job)
+                except Exception as e:
+                    print(f"Error reporting conversion job {job.id}: {e}")
+
+    def _forget_old_jobs(self):
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+            for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+                del self._jobs[job_id]
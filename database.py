@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Database Connection Pool
+Keeps long-lived SQLite connections for the statistics database instead of
+opening a new connection for every query.
+
+Connections are checked out for the duration of a unit of work and returned
+afterwards, so the same pool works for OS threads and eventlet greenlets.
+Each connection gets its PRAGMAs applied once when it is created, keeps its
+page cache between requests, and reuses compiled statements through
+sqlite3's per-connection statement cache.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Applied once to every new connection (most of these are per-connection settings)
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA cache_size=10000',
+    'PRAGMA temp_store=MEMORY',
+)
+
+# Compiled statements kept per connection; SQL strings must be identical to hit the cache
+STATEMENT_CACHE_SIZE = 256
+
+
+class ConnectionPool:
+    """A small LIFO pool of SQLite connections to a single database file"""
+
+    def __init__(self, database, timeout=30.0, max_idle=8):
+        self.database = database
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.database,
+            timeout=self.timeout,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE
+        )
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        with self._lock:
+            self.created += 1
+        return conn
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def _checkin(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of the with block"""
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._checkin(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Yield a cursor and commit on success, roll back on error"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def close_all(self):
+        """Close every idle connection (call on shutdown)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+def apply_migrations(conn, migrations):
+    """
+    Run every (version, migrate) step newer than the database's user_version.
+
+    Each step runs in its own transaction together with the version bump, so
+    an interrupted migration is simply retried on the next start.
+    """
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    for target_version, migrate in migrations:
+        if target_version <= version:
+            continue
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN')
+            migrate(cursor)
+            cursor.execute(f'PRAGMA user_version = {int(target_version)}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+        version = target_version
+    return version
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Folder Sort
+Regroups a stream of (folder_path, title, url) records so every folder's
+records come out together, as the HTML and JSON writers need. CSV exports
+and other flat lists can name folders in any order.
+
+Records are collected in a bookmark_tree.BookmarkTree of at most max_rows
+links; if the input is larger, the tree's links are spilled to a temporary
+file as one run whenever it fills up, folder after folder, remembering
+where each folder's rows start, while the folders stay in the tree. The
+output then walks the tree and reads every folder's rows back from each
+run in turn, so memory use is bounded by max_rows (plus one node per
+folder) and no comparison sort is needed however big the input is.
+"""
+
+import csv
+import tempfile
+from itertools import islice
+
+from bookmark_tree import BookmarkTree
+
+SORT_BUFFER_ROWS = 200000  # records held in memory before spilling a run to disk
+
+
+class GroupByFolder:
+    """
+    Iterable of records grouped by folder.
+
+    Folders come out depth first, siblings in the order they first appear
+    in the input; within a folder, its own records (in input order) come
+    before its subfolders. After iteration has finished, url_count holds
+    the number of records and runs the number of runs spilled to disk.
+    """
+
+    def __init__(self, records, max_rows=SORT_BUFFER_ROWS, temp_dir=None):
+        self.records = records
+        self.max_rows = max_rows
+        self.temp_dir = temp_dir
+        self.url_count = 0
+        self.runs = 0
+
+    def __iter__(self):
+        self.url_count = 0
+        self.runs = 0
+        tree = BookmarkTree()
+        records = iter(self.records)
+        runs = []
+        try:
+            batch = max(1, self.max_rows)
+            while tree.extend(islice(records, batch)) == batch:
+                runs.append(self._spill(tree))
+                self.runs += 1
+
+            for folder in tree.walk():
+                path = folder.path
+                for run, segments in runs:
+                    segment = segments.get(path)
+                    if segment is not None:
+                        run.seek(segment[0])
+                        for title, url in islice(csv.reader(run), segment[1]):
+                            yield path, title, url
+                        self.url_count += segment[1]
+                for title, url in folder.links():
+                    yield path, title, url
+                    self.url_count += 1
+        finally:
+            for run, segments in runs:
+                run.close()
+
+    def _spill(self, tree):
+        """Move the tree's links to a temporary file; returns it with each folder's (offset, row count)"""
+        run = tempfile.TemporaryFile('w+', encoding='utf-8', newline='', dir=self.temp_dir)
+        writer = csv.writer(run)
+        segments = {}
+        for folder in tree.walk():
+            if folder.urls:
+                segments[folder.path] = (run.tell(), len(folder.urls))
+                writer.writerows(folder.links())
+        tree.clear_links()
+        return run, segments
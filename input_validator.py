@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Input Validator
+Detects potentially malicious content (script tags, javascript:/vbscript:
+URLs, inline event handlers) in user-submitted text.
+
+All rules are compiled into one case-insensitive alternation with a named
+group per rule, so a payload is scanned once no matter how many rules there
+are, and the match tells us which rule fired.
+"""
+
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# (rule name, pattern) pairs; names become the regex group names
+DANGEROUS_PATTERNS = (
+    ('script_tag', r'<script[^>]*>.*?</script>'),
+    ('javascript_url', r'javascript:'),
+    ('html_data_url', r'data:text/html'),
+    ('vbscript_url', r'vbscript:'),
+    ('onload_handler', r'onload\s*='),
+    ('onerror_handler', r'onerror\s*='),
+)
+
+# Every rule starts with one of "<s", "ja", "da", "vb" or "on". Checking that
+# pair with two character classes first lets the scan skip almost every
+# position without trying the rule branches one by one.
+_FIRST_CHARACTERS = r'(?=[<jdvo][sabn])'
+
+_DANGEROUS_PATTERN = re.compile(
+    _FIRST_CHARACTERS + '(?:' + '|'.join(f'(?P<{name}>{pattern})' for name, pattern in DANGEROUS_PATTERNS) + ')',
+    re.IGNORECASE
+)
+
+
+# The rules that can match any number of characters, and what may follow
+# their start in clean text that more text could still turn into a match.
+# A <script tag waits for its ">" and then for "</script>" before the end of
+# that line; a handler name waits for "=" after any whitespace.
+_OPEN_PREFIX_PATTERN = re.compile(r'(?=[<o][sn])(?:(<script)|(onload)|(onerror))', re.IGNORECASE)
+_UNFINISHED_PATTERN = re.compile(r'(?:<script[^>]*(?:>[^\n]*)?|onload\s*|onerror\s*)\Z', re.IGNORECASE)
+
+
+def find_dangerous_content(data):
+    """
+    Scan text for dangerous content.
+
+    Returns the name of the rule for the first match in the text, or None if
+    the text is clean.
+    """
+    match = _DANGEROUS_PATTERN.search(data)
+    if match is None:
+        return None
+    return match.lastgroup
+
+
+def has_unfinished_match(data, before):
+    """
+    Check clean text (no match of its own) for a <script tag or event
+    handler that starts before index before and could still become a match
+    if more text were appended.
+    """
+    # An unfinished <script has no ">" after it, or no newline after its ">",
+    # so it comes after the last ">" before the last newline; an unfinished
+    # handler is followed by whitespace only
+    last_tag_end = data.rfind('>', 0, data.rfind('\n') + 1)
+    start = max(0, min(last_tag_end, len(data.rstrip()) - len('onerror')))
+    if start >= before:
+        return False
+
+    # If one start of a rule is unfinished, so is every later one, so only
+    # the last start of each kind before the index needs checking
+    last_starts = {}
+    for match in _OPEN_PREFIX_PATTERN.finditer(data, start):
+        if match.start() >= before:
+            break
+        last_starts[match.lastindex] = match.start()
+    return any(_UNFINISHED_PATTERN.match(data, start) for start in last_starts.values())
+
+
+def validate_input(data, max_length=10000):
+    """
+    Validate user input.
+
+    Returns (True, data) for acceptable input, otherwise (False, error message).
+    """
+    if not isinstance(data, str):
+        return False, "Invalid data type"
+
+    if len(data) > max_length:
+        return False, f"Data too long (max {max_length} characters)"
+
+    rule = find_dangerous_content(data)
+    if rule is not None:
+        logger.warning("Rejected input matching rule %s", rule)
+        return False, "Potentially malicious content detected"
+
+    return True, data
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Netscape Bookmark Parser
+Incremental parser for Netscape bookmark HTML (<!DOCTYPE NETSCAPE-Bookmark-
+file-1>), the format every browser exports. Text is fed in chunks and each
+bookmark comes out as a (folder_path, title, url) record as soon as its
+</A> has been read, so memory use depends on the folder depth, not on the
+size of the file.
+
+Only the tags that carry structure are tokenized (<DL>, <H3> and <A>, with
+one compiled regex); everything else (<DT>, <p>, <DD> descriptions, ICON
+data) is skipped without being parsed.
+"""
+
+import re
+from html import unescape
+
+from bookmark_tree import child_path
+
+PARSE_CHUNK_SIZE = 64 * 1024  # characters read per chunk
+
+# An opening or closing <A>, <H3> or <DL> tag; quoted attribute values may contain ">"
+_TAG_PATTERN = re.compile(
+    r'<(/?)(a|h3|dl)(?=[\s/>])((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>',
+    re.IGNORECASE
+)
+_HREF_PATTERN = re.compile(r'\bhref\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))', re.IGNORECASE)
+_OTHER_TAG_PATTERN = re.compile(r'<[^>]*>')
+
+
+def _clean_text(pieces):
+    """Title or folder name from the raw text collected between tags"""
+    text = ''.join(pieces)
+    if '<' in text:
+        text = _OTHER_TAG_PATTERN.sub('', text)
+    return unescape(text.strip()) if '&' in text else text.strip()
+
+
+class NetscapeParser:
+    """
+    Incremental Netscape bookmark parser.
+
+    feed(text) and close() return the (folder_path, title, url) records
+    completed by the text seen so far. Links outside any folder have the
+    folder path (); every record of a folder shares one path tuple.
+    """
+
+    def __init__(self):
+        self._buffer = ''
+        self._paths = [()]  # folder path of each open <DL>
+        self._folder_name = None  # last <H3> text, named by the next <DL>
+        self._href = None  # URL of the open <A>
+        self._text = None  # text pieces inside the open <A> or <H3>
+        self.url_count = 0
+
+    def feed(self, data):
+        self._buffer += data
+        return self._parse(final=False)
+
+    def close(self):
+        records = self._parse(final=True)
+        if self._href is not None:
+            self._finish_link(records)
+        return records
+
+    def _parse(self, final):
+        buffer = self._buffer
+        records = []
+        pos = 0
+        for match in _TAG_PATTERN.finditer(buffer):
+            if self._text is not None:
+                self._text.append(buffer[pos:match.start()])
+            pos = match.end()
+
+            closing, tag, attributes = match.groups()
+            tag = tag.lower()
+            if tag == 'a':
+                if closing:
+                    if self._href is not None:
+                        self._finish_link(records)
+                else:
+                    if self._href is not None:  # unclosed <A> before this one
+                        self._finish_link(records)
+                    href = _HREF_PATTERN.search(attributes)
+                    self._href = unescape(href.group(href.lastindex)) if href else ''
+                    self._text = []
+            elif tag == 'h3':
+                if closing:
+                    if self._text is not None and self._href is None:
+                        self._folder_name = _clean_text(self._text)
+                        self._text = None
+                else:
+                    self._text = []
+            elif closing:
+                if len(self._paths) > 1:
+                    self._paths.pop()
+            else:
+                path = self._paths[-1]
+                if self._folder_name is not None:
+                    path = child_path(path, self._folder_name)
+                    self._folder_name = None
+                self._paths.append(path)
+
+        # Keep anything from the last "<" on: it may be a tag cut off by the chunk boundary
+        end = len(buffer) if final else buffer.rfind('<', pos)
+        if end < 0:
+            end = len(buffer)
+        if self._text is not None:
+            self._text.append(buffer[pos:end])
+        self._buffer = buffer[end:]
+        return records
+
+    def _finish_link(self, records):
+        if self._href:
+            records.append((self._paths[-1], _clean_text(self._text), self._href))
+            self.url_count += 1
+        self._href = self._text = None
+
+
+def parse_netscape_chunks(chunks):
+    """Yield (folder_path, title, url) records from an iterable of text chunks"""
+    parser = NetscapeParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+def iter_file_chunks(file, chunk_size=PARSE_CHUNK_SIZE):
+    """Read an open text file in chunks"""
+    return iter(lambda: file.read(chunk_size), '')
+
+
+def read_netscape_html(file, chunk_size=PARSE_CHUNK_SIZE):
+    """Yield (folder_path, title, url) records from an open Netscape bookmark HTML file"""
+    return parse_netscape_chunks(iter_file_chunks(file, chunk_size))
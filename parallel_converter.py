@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Parallel Bookmark Converter
+Splits a large URL file into newline-aligned byte ranges, renders the bookmark
+lines for each range in a process pool and merges the results back in order.
+The merged document is identical to the one produced by the serial converter.
+"""
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from bookmark_writer import BOOKMARKS_FOOTER, bookmarks_header, iter_bookmark_items
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MB per task
+
+
+def split_ranges(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Split a file into (start, end) byte ranges of roughly chunk_size bytes.
+
+    Every range except the last ends just after a newline, so no line is ever
+    split between two ranges.
+    """
+    file_size = os.path.getsize(path)
+    ranges = []
+
+    with open(path, 'rb') as file:
+        start = 0
+        while start < file_size:
+            file.seek(min(start + chunk_size, file_size))
+            file.readline()  # move to the end of the current line
+            end = min(file.tell(), file_size)
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def convert_range(task):
+    """
+    Render the bookmark lines for one byte range of a file.
+
+    Returns (items_text, url_count, line_count) where items_text holds the
+    <DT><A> lines joined by newlines.
+    """
+    path, start, end = task
+    with open(path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+
+    # Universal newlines, exactly like reading the file in text mode
+    lines = [line.strip() for line in io.StringIO(data.decode('utf-8'), newline=None)]
+    items = list(iter_bookmark_items(lines))
+
+    return '\n'.join(items), len(items), len(lines)
+
+
+class ParallelBookmarkHTMLStream:
+    """
+    Iterable Netscape bookmark document rendered by a pool of worker processes.
+
+    Behaves like BookmarkHTMLStream over the stripped lines of a file: after
+    iteration, url_count and line_count hold the totals.
+    """
+
+    def __init__(self, path, workers, folder_name="Imported Bookmarks", chunk_size=DEFAULT_CHUNK_SIZE):
+        self.path = path
+        self.workers = workers
+        self.folder_name = folder_name
+        self.chunk_size = chunk_size
+        self.url_count = 0
+        self.line_count = 0
+
+    def _iter_results(self):
+        """Yield range results in file order, keeping at most 2 tasks per worker in flight"""
+        tasks = [(self.path, start, end) for start, end in split_ranges(self.path, self.chunk_size)]
+        max_in_flight = self.workers * 2
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = []
+            for task in tasks:
+                pending.append(executor.submit(convert_range, task))
+                if len(pending) >= max_in_flight:
+                    yield pending.pop(0).result()
+            for future in pending:
+                yield future.result()
+
+    def __iter__(self):
+        self.url_count = 0
+        self.line_count = 0
+        yield bookmarks_header(self.folder_name)
+
+        separator = ''
+        for items_text, url_count, line_count in self._iter_results():
+            self.line_count += line_count
+            if url_count:
+                yield separator + items_text
+                separator = '\n'
+                self.url_count += url_count
+
+        yield BOOKMARKS_FOOTER
+
+    def write_to(self, file):
+        """Write the whole document to an open text file, returning the URL count"""
+        file.writelines(self)
+        return self.url_count
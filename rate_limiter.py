@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Sliding-Window Rate Limiter
+Per-client request limits with fixed-size state per key.
+
+Each key keeps two counters (this window and the previous one) instead of a
+list of request timestamps; the previous window's count is weighted by how
+much of it still overlaps the sliding window. Keys are held in an LRU-ordered
+OrderedDict, so a check is O(1), the number of tracked keys is capped and
+idle keys can be swept from the cold end without scanning the rest.
+
+Two backends share the same interface (hit, sweep, clear, metrics):
+SlidingWindowRateLimiter keeps the counters in process memory, and
+SQLiteRateLimiter keeps them in a SQLite file so every worker process on
+the host enforces one shared limit, which also survives restarts.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from database import ConnectionPool
+
+SWEEP_BATCH_SIZE = 10000  # keys removed per lock acquisition
+
+
+class _WindowCounter:
+    """Request counts for one key: the current fixed window and the one before it"""
+
+    __slots__ = ('window', 'current', 'previous')
+
+    def __init__(self, window):
+        self.window = window
+        self.current = 0
+        self.previous = 0
+
+
+class SlidingWindowRateLimiter:
+    """
+    Allow at most limit requests per key in any window of window seconds.
+
+    max_keys bounds memory: when a new key would exceed it, the least
+    recently seen key is evicted. sweep() drops keys idle for two whole
+    windows, which no longer affect any decision.
+    """
+
+    def __init__(self, limit, window, max_keys=100000, clock=time.monotonic):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self.clock = clock
+        self._keys = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def __len__(self):
+        return len(self._keys)
+
+    def hit(self, key, now=None):
+        """Count a request for key; returns False (without counting it) if over the limit"""
+        if now is None:
+            now = self.clock()
+        window = int(now // self.window)
+        elapsed = now / self.window - window  # fraction of the current window that has passed
+
+        with self._lock:
+            counter = self._keys.get(key)
+            if counter is None:
+                counter = self._keys[key] = _WindowCounter(window)
+                if len(self._keys) > self.max_keys:
+                    self._keys.popitem(last=False)
+                    self.evicted += 1
+            else:
+                self._keys.move_to_end(key)
+                if counter.window != window:
+                    counter.previous = counter.current if counter.window == window - 1 else 0
+                    counter.current = 0
+                    counter.window = window
+
+            if counter.previous * (1 - elapsed) + counter.current >= self.limit:
+                self.limited += 1
+                return False
+            counter.current += 1
+            self.allowed += 1
+            return True
+
+    def sweep(self, now=None):
+        """Drop keys that have been idle for two full windows; returns how many were removed"""
+        if now is None:
+            now = self.clock()
+        oldest_useful = int(now // self.window) - 1
+        removed = 0
+
+        # Least recently seen first, so stop at the first key still in use.
+        # The lock is released between batches so checks are never held up for long.
+        done = False
+        while not done:
+            with self._lock:
+                for _ in range(SWEEP_BATCH_SIZE):
+                    if not self._keys:
+                        done = True
+                        break
+                    key, counter = self._keys.popitem(last=False)
+                    if counter.window >= oldest_useful:
+                        self._keys[key] = counter
+                        self._keys.move_to_end(key, last=False)
+                        done = True
+                        break
+                    removed += 1
+                    self.expired += 1
+        return removed
+
+    def clear(self):
+        """Forget every key"""
+        with self._lock:
+            self._keys.clear()
+
+    def metrics(self):
+        """Counters for monitoring: tracked keys, decisions and evictions"""
+        return {
+            'backend': 'memory',
+            'allowed': self.allowed,
+            'limited': self.limited,
+            'evicted': self.evicted,
+            'expired': self.expired,
+            'keys': len(self._keys),
+            'max_keys': self.max_keys,
+        }
+
+
+# One atomic statement per check: roll the window forward, count the request
+# only if it is under the limit and report the decision.
+# ?1 key, ?2 current window, ?3 weight of the previous window, ?4 limit
+_HIT_SQL = '''
+    INSERT INTO rate_limits (key, window_id, current_count, previous_count, allowed)
+    VALUES (?1, ?2, ?4 > 0, 0, ?4 > 0)
+    ON CONFLICT(key) DO UPDATE SET
+        allowed = (
+            CASE WHEN window_id = ?2 THEN previous_count WHEN window_id = ?2 - 1 THEN current_count ELSE 0 END * ?3
+            + CASE WHEN window_id = ?2 THEN current_count ELSE 0 END < ?4
+        ),
+        current_count = CASE WHEN window_id = ?2 THEN current_count ELSE 0 END + (
+            CASE WHEN window_id = ?2 THEN previous_count WHEN window_id = ?2 - 1 THEN current_count ELSE 0 END * ?3
+            + CASE WHEN window_id = ?2 THEN current_count ELSE 0 END < ?4
+        ),
+        previous_count = CASE WHEN window_id = ?2 THEN previous_count WHEN window_id = ?2 - 1 THEN current_count ELSE 0 END,
+        window_id = ?2
+    RETURNING allowed
+'''
+
+
+class SQLiteRateLimiter:
+    """
+    Sliding-window limiter whose counters live in a SQLite database.
+
+    Every process pointing at the same file shares the limits. Each check is
+    a single upsert in its own short write transaction; keep the file on
+    local disk (it uses WAL like the statistics database).
+    """
+
+    def __init__(self, limit, window, database, clock=time.time):
+        self.limit = limit
+        self.window = window
+        self.clock = clock
+        self.pool = ConnectionPool(database, timeout=5.0)
+        self.allowed = 0
+        self.limited = 0
+        self.expired = 0
+        with self.pool.connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    key TEXT PRIMARY KEY,
+                    window_id INTEGER NOT NULL,
+                    current_count INTEGER NOT NULL,
+                    previous_count INTEGER NOT NULL,
+                    allowed INTEGER NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            conn.commit()
+
+    def __len__(self):
+        with self.pool.connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM rate_limits').fetchone()[0]
+
+    def hit(self, key, now=None):
+        """Count a request for key; returns False (without counting it) if over the limit"""
+        if now is None:
+            now = self.clock()
+        window = int(now // self.window)
+        weight = 1 - (now / self.window - window)
+
+        with self.pool.connection() as conn:
+            allowed = conn.execute(_HIT_SQL, (key, window, weight, self.limit)).fetchone()[0]
+            conn.commit()
+
+        if allowed:
+            self.allowed += 1
+            return True
+        self.limited += 1
+        return False
+
+    def sweep(self, now=None):
+        """Drop keys that have been idle for two full windows; returns how many were removed"""
+        if now is None:
+            now = self.clock()
+        with self.pool.connection() as conn:
+            removed = conn.execute(
+                'DELETE FROM rate_limits WHERE window_id < ?', (int(now // self.window) - 1,)
+            ).rowcount
+            conn.commit()
+        self.expired += removed
+        return removed
+
+    def clear(self):
+        """Forget every key"""
+        with self.pool.connection() as conn:
+            conn.execute('DELETE FROM rate_limits')
+            conn.commit()
+
+    def metrics(self):
+        """Counters for monitoring; allowed/limited are for this process only"""
+        return {
+            'backend': 'sqlite',
+            'allowed': self.allowed,
+            'limited': self.limited,
+            'expired': self.expired,
+            'keys': len(self),
+        }
+
+
+def create_rate_limiter(backend, limit, window, max_keys=100000, database=None):
+    """Build the rate limiter for a RATE_LIMIT_BACKEND name ('memory' or 'sqlite')"""
+    if backend == 'memory':
+        return SlidingWindowRateLimiter(limit, window, max_keys=max_keys)
+    if backend == 'sqlite':
+        return SQLiteRateLimiter(limit, window, database)
+    raise ValueError(f"Unknown rate limit backend: {backend}")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Result Cache
+Content-addressed index of generated bookmark files. The key is a hash of
+the normalized URL list plus the folder name, so converting the same list
+again hands back the artifact that is already stored.
+
+The files themselves belong to the ArtifactStore, which expires and evicts
+them; an entry whose artifact is gone simply counts as a miss.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from itertools import chain
+
+
+def cache_key(urls, folder_name):
+    """
+    Hash a normalized URL list and folder name into a cache key.
+
+    Every field is prefixed with its length, so no folder name or URL
+    (newlines included) can make two different requests hash the same.
+    """
+    digest = hashlib.sha256()
+    for field in chain([folder_name], urls):
+        data = field.encode('utf-8')
+        digest.update(len(data).to_bytes(8, 'big'))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """LRU map from cache keys to artifact ids in an ArtifactStore"""
+
+    def __init__(self, store, max_entries=1000):
+        self.store = store
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> artifact id
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the artifact id cached for key, or None on a miss"""
+        with self._lock:
+            artifact_id = self._entries.get(key)
+            if artifact_id is not None and not self.store.exists(artifact_id):
+                del self._entries[key]
+                artifact_id = None
+            if artifact_id is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return artifact_id
+
+    def add(self, key, artifact_id):
+        """Remember the artifact generated for key"""
+        with self._lock:
+            self._entries[key] = artifact_id
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def metrics(self):
+        """Counters for monitoring: hits, misses and indexed entries"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+        }
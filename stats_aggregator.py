@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Live Statistics Aggregator
+Keeps running totals, per-type and per-folder counters and hourly/daily
+buckets in memory. It is seeded from the database once at startup and then
+updated with every batch of stored conversions, so reading the live
+statistics never touches the disk.
+"""
+
+import calendar
+import heapq
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+RECENT_ACTIVITY_SIZE = 15
+DAILY_HISTORY_DAYS = 14
+TOP_FOLDERS = 10
+ACTIVE_SESSION_SECONDS = 24 * 60 * 60
+
+
+# Totals and breakdowns come from the hourly_stats and folder_stats rollups,
+# which outlive compacted usage_stats rows
+SEED_TOTALS_SQL = '''
+    SELECT
+        COALESCE(SUM(conversions), 0),
+        COALESCE(SUM(urls), 0),
+        COALESCE(SUM(successful), 0),
+        COALESCE(SUM(processing_time_sum), 0),
+        COALESCE(SUM(processing_time_count), 0)
+    FROM hourly_stats
+'''
+
+SEED_CONVERSION_TYPES_SQL = '''
+    SELECT conversion_type, SUM(successful), SUM(successful_urls)
+    FROM hourly_stats
+    GROUP BY conversion_type
+    HAVING SUM(successful) > 0
+'''
+
+SEED_HOURLY_SQL = '''
+    SELECT day, hour, SUM(conversions), SUM(urls)
+    FROM hourly_stats
+    WHERE day = ?
+    GROUP BY hour
+'''
+
+SEED_FOLDERS_SQL = '''
+    SELECT folder_name, conversions, urls
+    FROM folder_stats
+'''
+
+
+def _utc_timestamp(created_at):
+    """Format a time.time() value the way SQLite's CURRENT_TIMESTAMP does"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(created_at))
+
+
+def _local_date(created_at):
+    return time.strftime('%Y-%m-%d', time.localtime(created_at))
+
+
+def _parse_utc_timestamp(timestamp):
+    return calendar.timegm(time.strptime(timestamp, '%Y-%m-%d %H:%M:%S'))
+
+
+class _DayBucket:
+    """Counters for one day; the user set is only kept for days still receiving events"""
+
+    __slots__ = ('conversions', 'urls', 'users', 'unique_users', 'time_sum', 'time_count')
+
+    def __init__(self, conversions=0, urls=0, unique_users=0, time_sum=0, time_count=0):
+        self.conversions = conversions
+        self.urls = urls
+        self.users = None
+        self.unique_users = unique_users
+        self.time_sum = time_sum
+        self.time_count = time_count
+
+    def add_user(self, client_ip_hash):
+        if client_ip_hash is None:
+            return
+        if self.users is None:
+            self.users = set()
+        if client_ip_hash not in self.users:
+            self.users.add(client_ip_hash)
+            self.unique_users = len(self.users)
+
+    def avg_processing_time(self):
+        return self.time_sum / self.time_count if self.time_count else 0
+
+
+class LiveStatsAggregator:
+    """In-memory mirror of the statistics that get_live_stats used to query"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total_conversions = 0
+        self.total_urls = 0
+        self.successful_conversions = 0
+        self.users = set()
+        self.time_sum = 0
+        self.time_count = 0
+        self.days = {}
+        self.hours = {}  # (UTC date, hour) -> [conversions, urls]
+        self.recent_activity = deque(maxlen=RECENT_ACTIVITY_SIZE)
+        self.conversion_types = {}  # type -> [count, urls], successful conversions only
+        self.folders = {}  # folder name -> [count, urls], successful conversions only
+        self.sessions = {}  # session id -> last seen, as time.time()
+
+    def seed(self, cursor):
+        """Load the current totals from the database (called once at startup)"""
+        today = datetime.now().strftime('%Y-%m-%d')
+
+        cursor.execute(SEED_TOTALS_SQL)
+        totals = cursor.fetchone()
+        cursor.execute('SELECT DISTINCT client_ip_hash FROM daily_users')
+        users = {row[0] for row in cursor.fetchall()}
+
+        cursor.execute('''
+            SELECT date, total_conversions, total_urls, unique_users,
+                   processing_time_sum, processing_time_count
+            FROM daily_stats
+            ORDER BY date DESC
+            LIMIT ?
+        ''', (DAILY_HISTORY_DAYS,))
+        days = {row[0]: _DayBucket(*(value or 0 for value in row[1:])) for row in cursor.fetchall()}
+
+        # Today keeps receiving events, so it also needs its set of users
+        if today in days:
+            cursor.execute('SELECT client_ip_hash FROM daily_users WHERE date = ?', (today,))
+            days[today].users = {row[0] for row in cursor.fetchall()}
+
+        cursor.execute(SEED_HOURLY_SQL, (today,))
+        hours = {(date, hour): [conversions, urls] for date, hour, conversions, urls in cursor.fetchall()}
+
+        # The newest raw rows; compaction only removes rows past the retention period
+        cursor.execute('''
+            SELECT timestamp, url_count, folder_name, conversion_type, processing_time_ms
+            FROM usage_stats
+            WHERE success = 1
+            ORDER BY timestamp DESC
+            LIMIT ?
+        ''', (RECENT_ACTIVITY_SIZE,))
+        recent = cursor.fetchall()
+
+        cursor.execute(SEED_CONVERSION_TYPES_SQL)
+        conversion_types = {row[0]: [row[1], row[2]] for row in cursor.fetchall()}
+
+        cursor.execute(SEED_FOLDERS_SQL)
+        folders = {row[0]: [row[1], row[2]] for row in cursor.fetchall()}
+
+        cursor.execute('''
+            SELECT session_id, last_seen
+            FROM user_sessions
+            WHERE last_seen > datetime('now', '-24 hours')
+        ''')
+        sessions = {row[0]: _parse_utc_timestamp(row[1]) for row in cursor.fetchall()}
+
+        with self._lock:
+            self.total_conversions = totals[0]
+            self.total_urls = totals[1]
+            self.successful_conversions = totals[2]
+            self.time_sum = totals[3]
+            self.time_count = totals[4]
+            self.users = users
+            self.days = days
+            self.hours = hours
+            self.recent_activity = deque(
+                (
+                    {
+                        'timestamp': row[0],
+                        'url_count': row[1],
+                        'folder_name': row[2],
+                        'conversion_type': row[3],
+                        'processing_time_ms': row[4]
+                    }
+                    for row in reversed(recent)
+                ),
+                maxlen=RECENT_ACTIVITY_SIZE
+            )
+            self.conversion_types = conversion_types
+            self.folders = folders
+            self.sessions = sessions
+
+    def record(self, events):
+        """Add a batch of stored ConversionEvents to the running totals"""
+        with self._lock:
+            for event in events:
+                self._record(event)
+
+    def _record(self, event):
+        timestamp = _utc_timestamp(event.created_at)
+        self.total_conversions += 1
+        self.total_urls += event.url_count
+        if event.client_ip_hash is not None:
+            self.users.add(event.client_ip_hash)
+        if event.processing_time_ms is not None:
+            self.time_sum += event.processing_time_ms
+            self.time_count += 1
+
+        date = _local_date(event.created_at)
+        day = self.days.get(date)
+        if day is None:
+            day = self.days[date] = _DayBucket()
+            self._prune_days()
+        day.conversions += 1
+        day.urls += event.url_count
+        day.add_user(event.client_ip_hash)
+        if event.processing_time_ms is not None:
+            day.time_sum += event.processing_time_ms
+            day.time_count += 1
+
+        hour = self.hours.setdefault((timestamp[:10], int(timestamp[11:13])), [0, 0])
+        hour[0] += 1
+        hour[1] += event.url_count
+
+        self.sessions[event.session_id] = event.created_at
+
+        if not event.success:
+            return
+        self.successful_conversions += 1
+        self.recent_activity.append({
+            'timestamp': timestamp,
+            'url_count': event.url_count,
+            'folder_name': event.folder_name,
+            'conversion_type': event.conversion_type,
+            'processing_time_ms': event.processing_time_ms
+        })
+        counts = self.conversion_types.setdefault(event.conversion_type, [0, 0])
+        counts[0] += 1
+        counts[1] += event.url_count
+        if event.folder_name is not None:
+            counts = self.folders.setdefault(event.folder_name, [0, 0])
+            counts[0] += 1
+            counts[1] += event.url_count
+
+    def _prune_days(self):
+        """Keep only the days shown in the daily chart; only the newest keeps its user set"""
+        dates = sorted(self.days, reverse=True)
+        for date in dates[DAILY_HISTORY_DAYS:]:
+            del self.days[date]
+        for date in dates[1:DAILY_HISTORY_DAYS]:
+            self.days[date].users = None
+        # Hourly buckets are keyed by UTC date, so keep the last two days around
+        cutoff = dates[min(1, len(dates) - 1)]
+        for key in [key for key in self.hours if key[0] < cutoff]:
+            del self.hours[key]
+
+    def snapshot(self):
+        """Return the live statistics in the /analytics response format"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        active_since = time.time() - ACTIVE_SESSION_SECONDS
+
+        with self._lock:
+            expired = [session for session, last_seen in self.sessions.items() if last_seen <= active_since]
+            for session in expired:
+                del self.sessions[session]
+
+            today_stats = self.days.get(today)
+            daily = sorted(self.days.items(), reverse=True)[:DAILY_HISTORY_DAYS]
+            # Most used first, ties broken by name so the order is stable
+            top_folders = heapq.nsmallest(TOP_FOLDERS, self.folders.items(),
+                                          key=lambda item: (-item[1][0], item[0]))
+
+            return {
+                'total_conversions': self.total_conversions,
+                'total_urls': self.total_urls,
+                'unique_users': len(self.users),
+                'avg_processing_time': round(self.time_sum / self.time_count if self.time_count else 0, 2),
+                'success_rate': round(self.successful_conversions / max(self.total_conversions, 1) * 100, 1),
+                'today_conversions': today_stats.conversions if today_stats else 0,
+                'today_urls': today_stats.urls if today_stats else 0,
+                'today_unique_users': today_stats.unique_users if today_stats else 0,
+                'today_avg_processing_time': round(today_stats.avg_processing_time() if today_stats else 0, 2),
+                'active_sessions': len(self.sessions),
+                'hourly_stats': [
+                    {
+                        'hour': hour,
+                        'conversions': counts[0],
+                        'urls': counts[1]
+                    }
+                    for (date, hour), counts in sorted(self.hours.items())
+                    if date == today
+                ],
+                'recent_activity': [dict(activity) for activity in reversed(self.recent_activity)],
+                'daily_stats': [
+                    {
+                        'date': date,
+                        'conversions': day.conversions,
+                        'urls': day.urls,
+                        'unique_users': day.unique_users
+                    }
+                    for date, day in daily
+                ],
+                'conversion_breakdown': [
+                    {
+                        'type': conversion_type,
+                        'count': counts[0],
+                        'total_urls': counts[1]
+                    }
+                    for conversion_type, counts in sorted(self.conversion_types.items())
+                ],
+                'top_folders': [
+                    {
+                        'name': name,
+                        'count': counts[0],
+                        'total_urls': counts[1]
+                    }
+                    for name, counts in top_folders
+                ],
+                'last_updated': datetime.now().isoformat()
+            }
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the analytics write-behind queue
+"""
+
+import threading
+import time
+
+from analytics_queue import AnalyticsWriter, ConversionEvent
+
+
+def make_event(url_count=1):
+    return ConversionEvent(url_count, 'Folder', 'download', 'ip', 'agent', 'session', 5, True, time.time())
+
+
+class RecordingSink:
+    def __init__(self, delay=0):
+        self.batches = []
+        self.delay = delay
+
+    def __call__(self, events):
+        time.sleep(self.delay)
+        self.batches.append(list(events))
+        return len(events)
+
+
+def test_events_are_written_in_batches():
+    sink = RecordingSink()
+    writer = AnalyticsWriter(sink, max_batch=10, flush_interval_ms=1000)
+    for _ in range(25):
+        writer.submit(make_event())
+    writer.start()
+
+    assert writer.flush()
+    assert sum(len(batch) for batch in sink.batches) == 25
+    assert max(len(batch) for batch in sink.batches) <= 10
+    assert writer.metrics()['written'] == 25
+    writer.stop()
+
+
+def test_submit_many_stays_in_one_batch():
+    sink = RecordingSink()
+    writer = AnalyticsWriter(sink, max_batch=2, flush_interval_ms=1000)
+    writer.start()
+    writer.submit_many([make_event() for _ in range(5)])
+
+    writer.flush()
+    assert [len(batch) for batch in sink.batches] == [5]
+    writer.stop()
+
+
+def test_full_queue_drops_instead_of_blocking():
+    release = threading.Event()
+    writer = AnalyticsWriter(lambda events: release.wait() and len(events), max_queue=2)
+    writer.start()
+    writer.submit(make_event())
+    time.sleep(0.05)  # let the writer pick up the first event and block
+
+    results = [writer.submit(make_event()) for _ in range(5)]
+
+    assert results.count(False) == 3
+    assert writer.metrics()['dropped'] == 3
+    release.set()
+    writer.stop()
+
+
+def test_stop_flushes_pending_events():
+    sink = RecordingSink()
+    writer = AnalyticsWriter(sink, flush_interval_ms=60000)
+    writer.start()
+    writer.submit(make_event())
+    writer.submit(make_event())
+
+    writer.stop()
+    assert sum(len(batch) for batch in sink.batches) == 2
+
+
+def test_rejected_and_failed_events_are_counted():
+    writer = AnalyticsWriter(lambda events: len(events) - 1)
+    writer.start()
+    writer.submit_many([make_event(), make_event()])
+    writer.flush()
+    assert writer.metrics()['rejected'] == 1
+
+    def broken(events):
+        raise RuntimeError('disk full')
+    writer.write_batch = broken
+    writer.submit(make_event())
+    writer.flush()
+    assert writer.metrics()['failed'] == 1
+    writer.stop()
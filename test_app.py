@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+"""
+Tests for the Flask web app routes
+Uses Flask's test client against a temporary statistics database
+"""
+
+import gzip
+import io
+import json
+import sqlite3
+import time
+from datetime import datetime
+
+import pytest
+
+import app as bookmark_app
+from database import apply_migrations
+from stats_aggregator import SEED_HOURLY_SQL, LiveStatsAggregator
+
+
+@pytest.fixture
+def client():
+    bookmark_app.app.config['TESTING'] = True
+    bookmark_app.rate_limiter.clear()
+    return bookmark_app.app.test_client()
+
+
+def test_convert_and_download(client):
+    response = client.post('/convert', json={'urls': 'github.com\n- python.org', 'folder_name': 'Dev'})
+
+    assert response.status_code == 200
+    assert response.json['url_count'] == 2
+
+    download = client.get(response.json['download_url'])
+    assert download.status_code == 200
+    assert b'<DT><H3>Dev</H3>' in download.data
+    assert b'<DT><A HREF="https://python.org">python.org</A>' in download.data
+
+
+def test_downloads_are_precompressed_and_conditional(client):
+    url = client.post('/convert', json={'urls': 'encoding.example.com', 'folder_name': 'Enc'}).json['download_url']
+    plain = client.get(url)
+
+    gzipped = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in gzipped.headers['Vary']
+    assert gzip.decompress(gzipped.data) == plain.data
+    assert gzipped.headers['ETag'] != plain.headers['ETag']
+
+    not_modified = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': gzipped.headers['ETag']})
+    assert not_modified.status_code == 304
+
+    partial = client.get(url, headers={'Range': 'bytes=0-9'})
+    assert partial.status_code == 206
+    assert partial.data == plain.data[:10]
+    assert partial.headers['Content-Range'] == f'bytes 0-9/{len(plain.data)}'
+
+
+def test_large_downloads_are_sent_from_disk(client):
+    body = ''.join(f'https://large-{i}.example.com/page\n' for i in range(3000))
+    url = client.post('/convert/upload?folder_name=Large', data=body, content_type='text/plain').json['download_url']
+    variant = bookmark_app.artifact_store.get_by_filename(url.rsplit('/', 1)[1], ['gzip'])
+    assert variant.data is None
+
+    gzipped = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert b'https://large-2999.example.com/page' in gzip.decompress(gzipped.data)
+    tail = client.get(url, headers={'Range': 'bytes=-8'})
+    assert (tail.status_code, tail.data) == (206, b'</DL><p>')
+
+
+def test_brotli_is_preferred_when_available(client):
+    brotli = pytest.importorskip('brotli')
+    url = client.post('/convert', json={'urls': 'brotli.example.com', 'folder_name': 'Br'}).json['download_url']
+
+    response = client.get(url, headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert b'brotli.example.com' in brotli.decompress(response.data)
+
+
+def test_identical_lists_are_served_from_the_cache(client):
+    first = client.post('/convert', json={'urls': 'cache-test.example.com\nhttps://python.org', 'folder_name': 'C'})
+    bookmark_app.analytics_writer.flush()
+    before = bookmark_app.get_live_stats()['total_conversions']
+    second = client.post('/convert', json={'urls': '- cache-test.example.com\n\n  https://python.org ', 'folder_name': 'C'})
+
+    assert first.json['cached'] is False
+    assert second.json['cached'] is True
+    assert second.json['download_url'] == first.json['download_url']
+    assert second.json['url_count'] == 2
+    assert client.get(second.json['download_url']).status_code == 200
+    assert client.get('/metrics').json['result_cache']['hits'] >= 1
+
+    # Cache hits still count as conversions
+    bookmark_app.analytics_writer.flush()
+    assert bookmark_app.get_live_stats()['total_conversions'] == before + 1
+
+
+def test_cache_does_not_mix_up_folder_names_and_urls(client):
+    first = client.post('/convert', json={'urls': 'https://y-collide.com', 'folder_name': 'A\nhttps://x-collide.com'})
+    second = client.post('/convert', json={'urls': 'https://x-collide.com\nhttps://y-collide.com', 'folder_name': 'A'})
+
+    assert second.json['cached'] is False
+    assert second.json['download_url'] != first.json['download_url']
+    assert second.json['url_count'] == 2
+
+
+def test_convert_can_remove_duplicate_urls(client):
+    urls = 'github.com\nhttps://GitHub.com/\nwww.github.com\npython.org\n'
+
+    plain = client.post('/convert', json={'urls': urls, 'folder_name': 'Dups'}).json
+    deduped = client.post('/convert', json={'urls': urls, 'folder_name': 'Dups', 'dedupe': True}).json
+
+    assert plain['url_count'] == 4 and 'duplicates_removed' not in plain
+    assert (deduped['url_count'], deduped['duplicates_removed']) == (2, 2)
+    html = client.get(deduped['download_url']).get_data(as_text=True)
+    assert html.count('github.com</A>') == 1
+
+    upload = client.post('/convert/upload?dedupe=1', data=urls.encode('utf-8'), content_type='text/plain').json
+    assert (upload['url_count'], upload['duplicates_removed']) == (2, 2)
+
+    converted = client.post('/convert/file?to=txt&dedupe=true', data=urls.encode('utf-8'), content_type='text/plain')
+    assert converted.data == b'https://github.com\nhttps://python.org\n'
+    assert converted.headers['X-Duplicates-Removed'] == '2'
+
+    assert bookmark_app.clean_and_process_urls(urls, dedupe=True) == ['https://github.com', 'https://python.org']
+
+
+def test_results_over_the_storage_quota_are_rejected(client, monkeypatch):
+    monkeypatch.setattr(bookmark_app.artifact_store, 'max_bytes', 100)
+
+    response = client.post('/convert', json={'urls': 'quota.example.com', 'folder_name': 'Quota'})
+
+    assert response.status_code == 400
+    assert 'storage quota' in response.json['error']
+
+
+def test_convert_rejects_text_without_urls(client):
+    response = client.post('/convert', json={'urls': 'no links here'})
+
+    assert response.status_code == 400
+
+
+def test_convert_stream_matches_txt_to_bookmarks_html(client):
+    urls_text = 'https://github.com\nJob Board (indeed.com)'
+    response = client.post('/convert/stream', json={'urls': urls_text, 'folder_name': 'Jobs'})
+
+    assert response.status_code == 200
+    expected_html, _ = bookmark_app.txt_to_bookmarks_html(urls_text, 'Jobs')
+    assert response.get_data(as_text=True) == expected_html
+
+
+def test_upload_converts_large_plain_text_bodies(client):
+    urls_text = '\n'.join(f'site{n}.example.com/page' for n in range(5000))
+    bookmark_app.analytics_writer.flush()
+    before = bookmark_app.get_live_stats()['total_urls']
+
+    response = client.post('/convert/upload?folder_name=Big', data=urls_text.encode('utf-8'),
+                           content_type='text/plain')
+
+    assert response.status_code == 200
+    assert response.json['url_count'] == 5000
+    expected_html, _ = bookmark_app.txt_to_bookmarks_html(urls_text, 'Big')
+    assert client.get(response.json['download_url']).get_data(as_text=True) == expected_html
+
+    # More than the old 1000 URL cap on usage_stats, and still logged
+    bookmark_app.analytics_writer.flush()
+    assert bookmark_app.get_live_stats()['total_urls'] == before + 5000
+
+
+def test_upload_accepts_multipart_files(client):
+    response = client.post('/convert/upload', data={
+        'folder_name': 'Files',
+        'file': (io.BytesIO(b'github.com\r\npython.org\r\n'), 'urls.txt'),
+    }, content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    assert response.json['url_count'] == 2
+    assert b'<DT><H3>Files</H3>' in client.get(response.json['download_url']).data
+
+
+def test_upload_rejects_dangerous_content(client):
+    body = ('github.com\n' * 20000 + 'https://x.com/<script>alert(1)</script>\n').encode('utf-8')
+    response = client.post('/convert/upload', data=body, content_type='text/plain')
+
+    assert response.status_code == 400
+    assert response.json['error'] == 'Potentially malicious content detected'
+
+
+def test_convert_file_between_formats(client):
+    csv_text = 'Name,URL,Folder\nB,https://b.example.com,Work/Jira\nA,https://a.example.com,Home\nC,https://c.example.com,Work\n'
+    response = client.post('/convert/file?from=csv&to=json', data=csv_text.encode('utf-8'), content_type='text/csv')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/json'
+    assert response.headers['X-Bookmark-Count'] == '3'
+    assert 'filename=bookmarks.json' in response.headers['Content-Disposition']
+    bar = json.loads(response.data)['roots']['bookmark_bar']['children']
+    assert [folder['name'] for folder in bar] == ['Work', 'Home']
+
+    upload = client.post('/convert/file', data={
+        'from': 'json', 'to': 'csv', 'file': (io.BytesIO(response.data), 'Bookmarks'),
+    }, content_type='multipart/form-data')
+    assert upload.status_code == 200
+    assert upload.get_data(as_text=True) == (
+        'Name,URL,Folder\nC,https://c.example.com,Work\nB,https://b.example.com,Work/Jira\n'
+        'A,https://a.example.com,Home\n'
+    )
+
+
+def test_convert_file_from_text_normalizes_urls(client):
+    response = client.post('/convert/file?to=txt&folder_name=Links', data=b'github.com\nnot a url\n',
+                           content_type='text/plain')
+
+    assert response.status_code == 200
+    assert response.data == b'https://github.com\n'
+
+
+def test_convert_file_rejects_bad_input(client):
+    unknown = client.post('/convert/file?from=xml', data=b'<xml/>', content_type='text/plain')
+    assert unknown.status_code == 400
+    assert 'Unknown format' in unknown.json['error']
+
+    html = ('<DL><p><DT><A HREF="https://a.com">A</A>' * 5000 + '<A HREF="javascript:alert(1)">x</A>').encode('utf-8')
+    dangerous = client.post('/convert/file?from=html&to=csv', data=html, content_type='text/html')
+    assert dangerous.status_code == 400
+    assert dangerous.json['error'] == 'Potentially malicious content detected'
+
+    broken = client.post('/convert/file?from=json&to=html', data=b'{"roots": {"bookmark_bar": [}',
+                         content_type='application/json')
+    assert broken.status_code == 400
+
+    truncated = client.post('/convert/file?from=json&to=html', data=b'{"roots": {', content_type='application/json')
+    assert truncated.status_code == 400
+    assert 'unclosed' in truncated.json['error']
+
+    empty = client.post('/convert/file?from=csv', data=b'Name,URL,Folder\n', content_type='text/csv')
+    assert empty.status_code == 400
+
+
+def test_convert_file_rejects_escaped_dangerous_content(client):
+    uploads = [
+        ('json', b'{"roots": {"bookmark_bar": {"type": "folder", "name": "Bar", "children": ['
+                 b'{"type": "url", "name": "x", "url": "javascript\\u003aalert(1)"}]}}}'),
+        ('html', b'<DL><p><DT><A HREF="javascript&#58;alert(1)">x</A></DL>'),
+        ('csv', b'Name,URL,Folder\nx,https://a.com,<img onerror&#61;alert(1)>\n'),
+    ]
+    for from_format, data in uploads:
+        response = client.post(f'/convert/file?from={from_format}&to=html', data=data, content_type='text/plain')
+        assert response.status_code == 400
+        assert response.json['error'] == 'Potentially malicious content detected'
+
+
+def test_uploads_stop_at_the_storage_quota(client, monkeypatch):
+    monkeypatch.setattr(bookmark_app.artifact_store, 'max_bytes', 50000)
+    body = ''.join(f'https://quota-{n}.example.com\n' for n in range(20000)).encode('utf-8')
+
+    response = client.post('/convert/upload', data=body, content_type='text/plain')
+
+    assert response.status_code == 400
+    assert 'storage quota' in response.json['error']
+
+
+def test_batch_builds_one_file_with_a_folder_per_list(client, monkeypatch):
+    bookmark_app.analytics_writer.flush()
+    before = bookmark_app.get_live_stats()
+    submitted = []
+    original_submit_many = bookmark_app.analytics_writer.submit_many
+
+    def submit_many(events):
+        submitted.append(events)
+        return original_submit_many(events)
+
+    monkeypatch.setattr(bookmark_app.analytics_writer, 'submit_many', submit_many)
+
+    response = client.post('/convert/batch', json={'folders': [
+        {'folder_name': 'Dev', 'urls': 'github.com\npython.org'},
+        {'folder_name': 'Nothing', 'urls': 'not a url'},
+        {'folder_name': 'News', 'urls': 'https://news.ycombinator.com'},
+    ]})
+
+    assert response.status_code == 200
+    assert response.json['url_count'] == 3
+    assert [folder['url_count'] for folder in response.json['folders']] == [2, 0, 1]
+    html = client.get(response.json['download_url']).get_data(as_text=True)
+    assert html.index('<DT><H3>Dev</H3>') < html.index('<DT><H3>Nothing</H3>') < html.index('<DT><H3>News</H3>')
+
+    # Empty folders are not logged; the rest go to the writer together
+    assert len(submitted) == 1
+    assert [(event.url_count, event.folder_name) for event in submitted[0]] == [(2, 'Dev'), (1, 'News')]
+    bookmark_app.analytics_writer.flush()
+    after = bookmark_app.get_live_stats()
+    assert after['total_conversions'] == before['total_conversions'] + 2
+    assert after['total_urls'] == before['total_urls'] + 3
+
+
+def test_batch_removes_duplicates_within_each_folder(client):
+    response = client.post('/convert/batch', json={'dedupe': True, 'folders': [
+        {'folder_name': 'Dev', 'urls': 'github.com\nhttps://github.com/\npython.org'},
+        {'folder_name': 'Again', 'urls': 'github.com'},
+    ]})
+
+    assert response.status_code == 200
+    assert response.json['folders'] == [
+        {'folder_name': 'Dev', 'url_count': 2, 'duplicates_removed': 1},
+        {'folder_name': 'Again', 'url_count': 1, 'duplicates_removed': 0},
+    ]
+
+
+def test_batch_rejects_bad_requests(client, monkeypatch):
+    monkeypatch.setattr(bookmark_app, 'BATCH_MAX_FOLDERS', 2)
+    folder = {'folder_name': 'A', 'urls': 'github.com'}
+
+    assert client.post('/convert/batch', json={'folders': []}).status_code == 400
+    assert client.post('/convert/batch', json={'folders': [folder] * 3}).json['error'] == 'Too many folders (max 2)'
+    assert client.post('/convert/batch', json={'folders': ['github.com']}).status_code == 400
+    dangerous = client.post('/convert/batch', json={'folders': [folder, {'urls': 'javascript:alert(1)'}]})
+    assert dangerous.json['error'] == 'Potentially malicious content detected'
+    empty = client.post('/convert/batch', json={'folders': [{'folder_name': 'A', 'urls': 'nothing here'}]})
+    assert empty.json['error'] == 'No valid URLs found in the provided folders'
+
+
+def test_large_conversions_run_as_jobs(client):
+    urls_text = '\n'.join(f'site{n}.example.com' for n in range(12000))
+    socket = bookmark_app.socketio.test_client(bookmark_app.app, flask_test_client=client)
+
+    response = client.post('/jobs', json={'urls': urls_text, 'folder_name': 'Big'})
+    assert response.status_code == 202
+    job_id = response.json['job_id']
+    socket.emit('join_job', {'job_id': job_id})
+
+    for _ in range(500):
+        status = client.get(response.json['status_url']).json
+        if status['status'] in ('done', 'failed'):
+            break
+        bookmark_app.socketio.sleep(0.01)  # let the job workers run
+
+    assert status['status'] == 'done'
+    assert status['url_count'] == 12000
+    expected_html, _ = bookmark_app.txt_to_bookmarks_html(urls_text, 'Big')
+    assert client.get(status['download_url']).get_data(as_text=True) == expected_html
+
+    events = [message['name'] for message in socket.get_received()]
+    assert 'job_progress' in events and 'job_done' in events
+    assert client.get('/metrics').json['jobs']['completed'] >= 1
+    assert client.get('/jobs/unknown').status_code == 404
+    socket.disconnect()
+    bookmark_app.analytics_writer.flush()
+
+
+def test_add_to_browser(client):
+    response = client.post('/add-to-browser', json={'urls': 'www.github.com'})
+
+    assert response.json['bookmarks'] == [{'title': 'github.com', 'url': 'https://www.github.com'}]
+
+
+def test_analytics_and_health(client):
+    client.post('/convert', json={'urls': 'github.com'})
+    assert bookmark_app.analytics_writer.flush()
+
+    stats = client.get('/analytics').json
+    assert stats['total_conversions'] >= 1
+    assert client.get('/health').json['status'] == 'healthy'
+    assert 'system_metrics' in client.get('/admin').json
+
+
+def test_health_check_queries_the_database(client, monkeypatch):
+    def broken_connection():
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(bookmark_app.db_pool, 'connection', broken_connection)
+    response = client.get('/health')
+
+    assert response.status_code == 500
+    assert response.json['database'] == 'disconnected'
+    assert 'database is locked' in response.json['error']
+
+
+def test_convert_is_rate_limited(client):
+    responses = [
+        client.post('/convert', json={'urls': 'github.com'}, environ_base={'REMOTE_ADDR': '10.0.0.1'})
+        for _ in range(bookmark_app.RATE_LIMIT_MAX_REQUESTS + 1)
+    ]
+
+    assert [response.status_code for response in responses[:-1]] == [200] * bookmark_app.RATE_LIMIT_MAX_REQUESTS
+    assert responses[-1].status_code == 429
+    assert client.get('/metrics').json['rate_limiter']['limited'] >= 1
+    bookmark_app.analytics_writer.flush()
+
+
+def test_conversions_are_logged_through_the_queue(client):
+    before = bookmark_app.get_live_stats()['total_urls']
+    client.post('/convert', json={'urls': 'github.com\npython.org\nflask.palletsprojects.com'})
+    bookmark_app.analytics_writer.flush()
+
+    assert bookmark_app.get_live_stats()['total_urls'] == before + 3
+    metrics = client.get('/metrics').json['analytics_queue']
+    assert metrics['written'] >= 1
+    assert metrics['dropped'] == 0
+
+
+def test_live_stats_match_a_fresh_seed_from_the_database(client):
+    client.post('/convert', json={'urls': 'github.com\npython.org', 'folder_name': 'Dev'})
+    client.post('/add-to-browser', json={'urls': 'news.ycombinator.com', 'folder_name': 'News'})
+    bookmark_app.analytics_writer.flush()
+
+    fresh = LiveStatsAggregator()
+    with bookmark_app.db_pool.connection() as conn:
+        fresh.seed(conn.cursor())
+
+    live = bookmark_app.get_live_stats()
+    seeded = fresh.snapshot()
+    for stats in (live, seeded):
+        stats.pop('last_updated')
+        stats['recent_activity'].sort(key=lambda activity: sorted(activity.items(), key=str))
+    assert live == seeded
+
+
+def test_daily_stats_migration_backfills_existing_rows(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'old.db'))
+    bookmark_app.create_tables(conn.cursor())
+    conn.executemany(
+        'INSERT INTO usage_stats (timestamp, url_count, client_ip_hash, processing_time_ms) VALUES (?, ?, ?, ?)',
+        [
+            ('2025-01-01 10:00:00', 3, 'a', 100),
+            ('2025-01-01 11:00:00', 2, 'b', None),
+            ('2025-01-01 12:00:00', 1, 'a', 300),
+            ('2025-01-02 09:00:00', 4, 'c', 50),
+        ]
+    )
+    conn.executemany(
+        'INSERT INTO daily_stats (date, total_conversions, total_urls, unique_users, avg_processing_time) VALUES (?, ?, ?, ?, ?)',
+        [('2025-01-01', 3, 6, 2, 200.0), ('2025-01-02', 1, 4, 1, 50.0)]
+    )
+    conn.commit()
+
+    version = apply_migrations(conn, bookmark_app.SCHEMA_MIGRATIONS)
+
+    assert version == conn.execute('PRAGMA user_version').fetchone()[0] == bookmark_app.SCHEMA_MIGRATIONS[-1][0]
+    rows = conn.execute('''
+        SELECT date, unique_users, processing_time_sum, processing_time_count
+        FROM daily_stats ORDER BY date
+    ''').fetchall()
+    assert rows == [('2025-01-01', 2, 400, 2), ('2025-01-02', 1, 50, 1)]
+    assert conn.execute('SELECT COUNT(*) FROM daily_users').fetchone()[0] == 3
+    assert conn.execute('SELECT DISTINCT day, hour FROM usage_stats ORDER BY day, hour LIMIT 2').fetchall() == [
+        ('2025-01-01', 10), ('2025-01-01', 11)
+    ]
+    assert conn.execute('''
+        SELECT day, SUM(conversions), SUM(urls), SUM(processing_time_sum), SUM(processing_time_count)
+        FROM hourly_stats GROUP BY day ORDER BY day
+    ''').fetchall() == [('2025-01-01', 3, 6, 400, 2), ('2025-01-02', 1, 4, 50, 1)]
+
+    # The 1000 URL cap is gone and row ids keep counting up
+    conn.execute("INSERT INTO usage_stats (timestamp, url_count) VALUES ('2025-01-03 08:00:00', 250000)")
+    assert conn.execute('SELECT MAX(id) FROM usage_stats').fetchone()[0] == 5
+    conn.rollback()
+
+    # Running the migrations again is a no-op
+    assert apply_migrations(conn, bookmark_app.SCHEMA_MIGRATIONS) == version
+    conn.close()
+
+
+def test_daily_stats_are_updated_incrementally(client):
+    today = datetime.now().strftime('%Y-%m-%d')
+    with bookmark_app.db_pool.connection() as conn:
+        before = conn.execute(
+            'SELECT total_conversions, processing_time_count FROM daily_stats WHERE date = ?', (today,)
+        ).fetchone() or (0, 0)
+
+    client.post('/convert', json={'urls': 'github.com'})
+    client.post('/convert', json={'urls': 'python.org'})
+    bookmark_app.analytics_writer.flush()
+
+    with bookmark_app.db_pool.connection() as conn:
+        conversions, time_count, avg_time, time_sum = conn.execute('''
+            SELECT total_conversions, processing_time_count, avg_processing_time, processing_time_sum
+            FROM daily_stats WHERE date = ?
+        ''', (today,)).fetchone()
+    assert conversions == before[0] + 2
+    assert time_count == before[1] + 2
+    assert avg_time == pytest.approx(time_sum / time_count)
+
+
+@pytest.mark.parametrize('query, params', [
+    (bookmark_app.ADMIN_HOURLY_SQL, ()),
+    (bookmark_app.ADMIN_TOP_HOURS_SQL, ()),
+    (SEED_HOURLY_SQL, ('2025-01-01',)),
+])
+def test_time_range_queries_use_the_hourly_rollup(query, params):
+    with bookmark_app.db_pool.connection() as conn:
+        plan = ' '.join(row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + query, params))
+
+    assert 'SEARCH hourly_stats USING PRIMARY KEY' in plan
+    assert 'usage_stats' not in plan
+
+
+def test_expired_usage_query_uses_the_day_hour_index():
+    with bookmark_app.db_pool.connection() as conn:
+        plan = ' '.join(row[3] for row in conn.execute(
+            'EXPLAIN QUERY PLAN ' + bookmark_app.EXPIRED_USAGE_IDS_SQL, ('-30 days', 10)
+        ))
+
+    assert 'idx_usage_day_hour' in plan
+    assert 'SCAN usage_stats' not in plan
+
+
+def test_admin_metrics_come_from_the_hourly_rollup(client):
+    client.post('/convert', json={'urls': 'github.com\npython.org'})
+    bookmark_app.analytics_writer.flush()
+
+    with bookmark_app.db_pool.connection() as conn:
+        raw = conn.execute('''
+            SELECT COUNT(*), SUM(url_count), COUNT(CASE WHEN success = 0 THEN 1 END)
+            FROM usage_stats
+        ''').fetchone()
+        rolled = conn.execute('''
+            SELECT SUM(conversions), SUM(urls), SUM(failed) FROM hourly_stats
+        ''').fetchone()
+    assert rolled == raw
+
+    metrics = client.get('/admin').json['system_metrics']
+    assert metrics['total_records'] == raw[0]
+
+
+def test_compaction_archives_old_rows_and_keeps_rollups(client, tmp_path):
+    old_rows = [
+        ('2000-01-01 10:00:00', '2000-01-01', 10, 2, 'Old', 'download', 'old', 'test', 'old_session', 100, True)
+        for _ in range(5)
+    ]
+    with bookmark_app.db_pool.connection() as conn:
+        conn.executemany(bookmark_app.INSERT_USAGE_SQL, old_rows)
+        conn.commit()
+        rollup_before = conn.execute('SELECT SUM(conversions) FROM hourly_stats').fetchone()[0]
+        recent_before = conn.execute("SELECT COUNT(*) FROM usage_stats WHERE day >= '2001-01-01'").fetchone()[0]
+        old_ids = [row[0] for row in conn.execute("SELECT id FROM usage_stats WHERE day < '2001-01-01' ORDER BY id")]
+
+    archive = tmp_path / 'archive.db'
+    removed = bookmark_app.compact_usage_stats(retention_days=30, archive_path=str(archive), batch_size=2)
+
+    assert removed == 5
+    with bookmark_app.db_pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM usage_stats WHERE day < '2001-01-01'").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM usage_stats WHERE day >= '2001-01-01'").fetchone()[0] == recent_before
+        assert conn.execute('SELECT SUM(conversions) FROM hourly_stats').fetchone()[0] == rollup_before
+        assert 'archive' not in [row[1] for row in conn.execute('PRAGMA database_list')]
+    with sqlite3.connect(str(archive)) as archived:
+        assert archived.execute('SELECT COUNT(*), SUM(url_count) FROM usage_stats').fetchone() == (5, 10)
+        assert [row[0] for row in archived.execute('SELECT id FROM usage_stats ORDER BY id')] == old_ids
+
+    compaction = client.get('/metrics').json['compaction']
+    assert compaction['deleted'] >= 5
+    assert compaction['archived'] >= 5
+    assert bookmark_app.compact_usage_stats(retention_days=0) == 0
+
+
+def test_folder_totals_and_first_record_survive_compaction(client, tmp_path):
+    old = datetime(2000, 1, 1, 10).timestamp()
+    bookmark_app.write_conversion_batch([
+        bookmark_app.ConversionEvent(count, 'Compacted', 'download', 'ip', 'agent', 'old_session', 100, success, old)
+        for count, success in ((3, True), (4, True), (9, False))
+    ])
+    bookmark_app.compact_usage_stats(retention_days=30, archive_path=str(tmp_path / 'archive.db'))
+
+    fresh = LiveStatsAggregator()
+    with bookmark_app.db_pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM usage_stats WHERE folder_name = 'Compacted'").fetchone()[0] == 0
+        fresh.seed(conn.cursor())
+    assert fresh.folders['Compacted'] == [2, 7]
+    first_record = client.get('/admin').json['system_metrics']['first_record']
+    assert first_record == time.strftime('%Y-%m-%d %H:00:00', time.gmtime(old))
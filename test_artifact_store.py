@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for the artifact store
+"""
+
+import gzip
+import os
+
+import pytest
+
+from artifact_store import ENCODING_SUFFIXES, ArtifactStore, QuotaExceeded, _compress_bytes
+
+
+def store_artifact(store, size=10):
+    with store.create() as (artifact_id, file):
+        file.write('x' * size)
+    return artifact_id
+
+
+def stored_bytes(size=10):
+    """Bytes one artifact of size characters takes on disk, compressed variants included"""
+    data = b'x' * size
+    return sum(len(_compress_bytes(data, encoding)) if encoding != 'identity' else size
+               for encoding in ENCODING_SUFFIXES)
+
+
+def test_artifacts_get_random_ids_and_are_served_from_the_index(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    first, second = store_artifact(store), store_artifact(store)
+
+    assert first != second
+    variant = store.get_by_filename(store.filename(first))
+    assert variant is not None and os.path.getsize(variant.path) == 10
+    assert store.get_by_filename('missing.html') is None
+    assert store.get_by_filename('../app.py') is None
+    metrics = store.metrics()
+    assert (metrics['artifacts'], metrics['hits'], metrics['misses']) == (2, 1, 2)
+
+
+def test_failed_writes_leave_nothing_behind(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    with pytest.raises(RuntimeError):
+        with store.create() as (artifact_id, file):
+            file.write('partial')
+            raise RuntimeError('conversion failed')
+
+    assert os.listdir(tmp_path) == []
+    assert not store.exists(artifact_id)
+
+
+def test_oversized_artifacts_fail_while_being_written(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_bytes=20000)
+    writes = 0
+    with pytest.raises(QuotaExceeded):
+        with store.create() as (artifact_id, file):
+            for writes in range(1, 1001):
+                file.write('x' * 1000)
+
+    # Stopped a buffer's worth past the quota, not after the whole input
+    assert writes < 50
+    assert os.listdir(tmp_path) == []
+
+
+def test_quota_evicts_least_recently_used(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_bytes=int(stored_bytes() * 2.5))
+    a, b = store_artifact(store), store_artifact(store)
+    store.get(a)
+    c = store_artifact(store)
+
+    assert store.exists(a) and store.exists(c)
+    assert not store.exists(b)
+    assert not any(name.startswith(b) for name in os.listdir(tmp_path))
+    assert store.metrics()['evictions'] == 1
+
+    with pytest.raises(QuotaExceeded):
+        store_artifact(store, size=1000)
+    assert store.metrics()['bytes'] == stored_bytes() * 2
+
+
+def test_sweep_expires_unused_artifacts(tmp_path):
+    store = ArtifactStore(str(tmp_path), ttl_seconds=60)
+    old, fresh = store_artifact(store), store_artifact(store)
+    store._artifacts[old].last_used -= 120
+
+    assert store.sweep() == 1
+    assert not store.exists(old) and store.exists(fresh)
+    assert store.metrics()['expired'] == 1
+
+
+def test_existing_files_are_indexed_on_startup(tmp_path):
+    store = ArtifactStore(str(tmp_path), ttl_seconds=60)
+    artifact_id = store_artifact(store)
+    fresh = os.path.join(str(tmp_path), 'fresh.partial')
+    stale = os.path.join(str(tmp_path), 'stale.partial')
+    open(fresh, 'w').close()
+    open(stale, 'w').close()
+    os.utime(stale, (0, 0))
+
+    reopened = ArtifactStore(str(tmp_path), ttl_seconds=60)
+    assert reopened.exists(artifact_id)
+    assert reopened.metrics()['bytes'] == stored_bytes()
+    assert reopened.get(artifact_id, ['gzip']).encoding == 'gzip'
+    # Another process may still be writing the fresh one
+    assert os.path.exists(fresh)
+    assert not os.path.exists(stale)
+
+
+def test_artifacts_written_by_another_process_are_found_on_disk(tmp_path):
+    worker_a = ArtifactStore(str(tmp_path))
+    worker_b = ArtifactStore(str(tmp_path))
+    artifact_id = store_artifact(worker_a)
+
+    variant = worker_b.get(artifact_id, ['gzip'])
+    assert variant.encoding == 'gzip'
+    assert gzip.decompress(open(variant.path, 'rb').read()) == b'x' * 10
+    assert worker_b.exists(artifact_id)
+    assert worker_b.metrics()['bytes'] == stored_bytes()
+
+    assert worker_b.get('../' + artifact_id[3:]) is None
+    assert worker_b.get_by_filename('missing' * 3 + 'x.html') is None
+
+
+def test_variants_are_compressed_once_and_small_ones_kept_in_memory(tmp_path):
+    store = ArtifactStore(str(tmp_path), memory_threshold=100)
+    small, large = store_artifact(store, size=100), store_artifact(store, size=101)
+
+    variant = store.get(small, ['br', 'gzip'])
+    assert variant.encoding in ('br', 'gzip')
+    assert variant.etag == f'{small}.{variant.encoding}'
+    assert variant.size == len(variant.data) == os.path.getsize(variant.path) < 100
+
+    gzipped = store.get(large, ['gzip'])
+    assert gzipped.data is None
+    with open(gzipped.path, 'rb') as file:
+        assert gzip.decompress(file.read()) == b'x' * 101
+    assert store.get(large).encoding == 'identity'
+    assert store.metrics()['memory_bytes'] == store._artifacts[small].memory_size
+
+    store.delete(small)
+    store.delete(large)
+    assert os.listdir(tmp_path) == []
+    assert store.metrics()['memory_bytes'] == store.metrics()['bytes'] == 0
+
+
+def test_memory_budget_is_respected(tmp_path):
+    store = ArtifactStore(str(tmp_path), memory_threshold=100, memory_budget=stored_bytes(100))
+    first, second = store_artifact(store, size=100), store_artifact(store, size=100)
+
+    assert store.get(first).data == b'x' * 100
+    assert store.get(second).data is None
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests for the periodic background task helper
+"""
+
+import threading
+import time
+
+from background_tasks import PeriodicTask
+
+
+def test_periodic_task_runs_until_stopped():
+    ran = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        if len(calls) >= 3:
+            ran.set()
+
+    task = PeriodicTask(0.01, work, name='test-task')
+    task.start()
+    assert ran.wait(2)
+    task.stop()
+
+    count = len(calls)
+    time.sleep(0.05)
+    assert len(calls) == count
+
+
+def test_periodic_task_survives_errors(capsys):
+    ran = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError('boom')
+        ran.set()
+
+    task = PeriodicTask(0.01, work, name='flaky-task')
+    task.start()
+    assert ran.wait(2)
+    task.stop()
+
+    assert 'Error in background task flaky-task: boom' in capsys.readouterr().out
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for the bookmark-converter.py command line tool
+Runs the script as a subprocess, the same way it is used from a shell
+"""
+
+import os
+import subprocess
+import sys
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bookmark-converter.py')
+
+SAMPLE_URLS = """https://github.com
+  http://www.example.org/path
+not a url
+
+https://stackoverflow.com/questions
+"""
+
+
+def run_converter(*args, input_text=None):
+    return subprocess.run(
+        [sys.executable, SCRIPT, *args],
+        input=input_text, capture_output=True, text=True, encoding='utf-8'
+    )
+
+
+def test_file_to_file(tmp_path):
+    input_path = tmp_path / 'urls.txt'
+    output_path = tmp_path / 'bookmarks.html'
+    input_path.write_text(SAMPLE_URLS, encoding='utf-8')
+
+    result = run_converter(str(input_path), str(output_path))
+
+    assert result.returncode == 0
+    assert 'Successfully converted 3 URLs' in result.stdout
+    assert 'lines/s' in result.stdout
+    html = output_path.read_text(encoding='utf-8')
+    assert html.startswith('<!DOCTYPE NETSCAPE-Bookmark-file-1>')
+    assert '<DT><A HREF="http://www.example.org/path">example.org</A>' in html
+
+
+def test_stdin_to_stdout_matches_file_output(tmp_path):
+    input_path = tmp_path / 'urls.txt'
+    output_path = tmp_path / 'bookmarks.html'
+    input_path.write_text(SAMPLE_URLS, encoding='utf-8')
+    run_converter(str(input_path), str(output_path))
+
+    result = run_converter('-', '-', input_text=SAMPLE_URLS)
+
+    assert result.returncode == 0
+    assert result.stdout == output_path.read_text(encoding='utf-8')
+    assert 'Successfully converted 3 URLs to stdout' in result.stderr
+
+
+def test_missing_input_file_fails(tmp_path):
+    result = run_converter(str(tmp_path / 'missing.txt'), str(tmp_path / 'out.html'))
+
+    assert result.returncode == 1
+    assert 'Error:' in result.stderr
+
+
+def test_workers_output_matches_serial(tmp_path):
+    lines = []
+    for i in range(500):
+        lines.append(f'https://site{i}.example.com/page/{i}')
+        lines.append('not a url' if i % 3 else '')
+        lines.append(f'  http://www.host{i}.org/é  \r')
+    input_path = tmp_path / 'urls.txt'
+    input_path.write_text('\n'.join(lines), encoding='utf-8')
+    serial_path = tmp_path / 'serial.html'
+    parallel_path = tmp_path / 'parallel.html'
+
+    run_converter(str(input_path), str(serial_path))
+    result = run_converter('--workers', '3', '--chunk-size', '997', str(input_path), str(parallel_path))
+
+    assert result.returncode == 0
+    assert 'Successfully converted 1000 URLs' in result.stdout
+    assert parallel_path.read_bytes() == serial_path.read_bytes()
+
+
+def test_workers_reject_stdin():
+    result = run_converter('--workers', '2', '-', '-', input_text=SAMPLE_URLS)
+
+    assert result.returncode == 1
+    assert 'regular input file' in result.stderr
+
+
+def test_converts_between_formats(tmp_path):
+    csv_path = tmp_path / 'bookmarks.csv'
+    csv_path.write_text('Name,URL,Folder\nB,https://b.com,Work\nA,https://a.com,Home\nC,https://c.com,Work\n',
+                        encoding='utf-8')
+
+    result = run_converter('--from', 'csv', '--to', 'json', str(csv_path), str(tmp_path / 'Bookmarks'))
+    assert result.returncode == 0
+    assert 'Successfully converted 3 bookmarks from csv to json' in result.stdout
+    assert 'rows/s' in result.stdout
+
+    # JSON from stdin back to CSV on stdout, folders now grouped
+    json_text = (tmp_path / 'Bookmarks').read_text(encoding='utf-8')
+    result = run_converter('--from', 'json', '--to', 'csv', '-', '-', input_text=json_text)
+    assert result.returncode == 0
+    assert result.stdout == 'Name,URL,Folder\nB,https://b.com,Work\nC,https://c.com,Work\nA,https://a.com,Home\n'
+
+
+def test_default_output_name_follows_the_format(tmp_path):
+    input_path = tmp_path / 'urls.txt'
+    input_path.write_text(SAMPLE_URLS, encoding='utf-8')
+
+    result = subprocess.run([sys.executable, SCRIPT, '--to', 'csv', str(input_path)],
+                            cwd=tmp_path, capture_output=True, text=True)
+
+    assert result.returncode == 0
+    assert (tmp_path / 'bookmarks.csv').read_text(encoding='utf-8').startswith('Name,URL,Folder\ngithub.com,')
+
+
+def test_workers_need_txt_to_html():
+    result = run_converter('--from', 'csv', '--workers', '2', 'in.csv')
+
+    assert result.returncode == 2
+    assert '--workers only applies to txt to html' in result.stderr
+
+
+def test_dedupe_removes_repeated_urls(tmp_path):
+    input_path = tmp_path / 'urls.txt'
+    input_path.write_text('https://github.com\nhttps://GitHub.com/\nhttp://www.example.org:80/\n'
+                          'http://example.org\n', encoding='utf-8')
+
+    result = run_converter('--dedupe', str(input_path), str(tmp_path / 'bookmarks.html'))
+    assert result.returncode == 0
+    assert 'Successfully converted 2 URLs' in result.stdout
+    assert 'Removed 2 duplicate URLs' in result.stdout
+
+    result = run_converter('--dedupe', '--dedupe-exact-limit', '1', '--to', 'txt', str(input_path), '-')
+    assert result.stdout == 'https://github.com\nhttp://www.example.org:80/\n'
+    assert 'approximate' in result.stderr
+
+    result = run_converter('--dedupe', '--workers', '2', str(input_path))
+    assert result.returncode == 2
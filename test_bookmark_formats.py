@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the bookmark format readers and writers
+"""
+
+import io
+import json
+
+import pytest
+
+import bookmark_formats
+from bookmark_formats import (CSVWriter, ChromeJSONWriter, NetscapeHTMLWriter, TextWriter, convert, read_csv,
+                              read_html, read_json, read_txt)
+from bookmark_tree import BookmarkTree
+from bookmark_writer import BookmarkHTMLStream
+
+RECORDS = [
+    ((), 'Top', 'https://top.example'),
+    (('Dev',), 'GitHub', 'https://github.com'),
+    (('Dev', 'Python'), 'Python & <friends>', 'https://python.org/?a=1&b="2"'),
+    (('Dev',), 'MDN, docs', 'https://developer.mozilla.org'),
+    (('News',), 'HN', 'https://news.ycombinator.com'),
+]
+
+FORMATS = [
+    (NetscapeHTMLWriter, read_html),
+    (ChromeJSONWriter, read_json),
+    (CSVWriter, read_csv),
+]
+
+
+@pytest.mark.parametrize('writer, reader', FORMATS)
+def test_round_trip(writer, reader):
+    stream = writer(BookmarkTree(RECORDS))
+    output = io.StringIO()
+
+    assert stream.write_to(output) == 5
+    output.seek(0)
+    assert list(reader(output)) == list(BookmarkTree(RECORDS))
+
+
+@pytest.mark.parametrize('writer, reader', FORMATS)
+def test_empty_documents(writer, reader):
+    document = ''.join(writer([]))
+    assert list(reader(io.StringIO(document))) == []
+
+
+def test_html_matches_the_single_folder_converter():
+    urls = ['https://github.com', 'https://www.python.org']
+    records = [(('Dev',), 'github.com', urls[0]), (('Dev',), 'python.org', urls[1])]
+    assert ''.join(NetscapeHTMLWriter(records)) == ''.join(BookmarkHTMLStream(urls, 'Dev'))
+
+
+def test_reads_browser_html_exports():
+    html = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks Menu</H1>
+<DL><p>
+    <DT><H3 ADD_DATE="1600000000" PERSONAL_TOOLBAR_FOLDER="true">Bookmarks Toolbar</H3>
+    <DL><p>
+        <DT><A HREF="https://www.google.com" ADD_DATE="1600000000" ICON="data:image/png;base64,AAAA">Google</A>
+        <DD>Search engine
+        <DT><H3>Empty</H3>
+        <DL><p>
+        </DL><p>
+        <DT><A HREF="https://github.com">GitHub</A>
+    </DL><p>
+    <DT><A HREF="https://example.com/?q=a&amp;b">Caf&eacute;</A>
+</DL>
+"""
+    assert list(read_html(io.StringIO(html))) == [
+        (('Bookmarks Toolbar',), 'Google', 'https://www.google.com'),
+        (('Bookmarks Toolbar',), 'GitHub', 'https://github.com'),
+        ((), 'Café', 'https://example.com/?q=a&b'),
+    ]
+
+
+def test_json_output_is_a_chrome_bookmarks_file():
+    data = json.loads(''.join(ChromeJSONWriter(BookmarkTree(RECORDS))))
+
+    bar = data['roots']['bookmark_bar']
+    assert data['version'] == 1 and bar['type'] == 'folder'
+    assert [child.get('name') for child in bar['children']] == ['Top', 'Dev', 'News']
+    assert bar['children'][1]['children'][2] == {'children': [
+        {'name': 'Python & <friends>', 'type': 'url', 'url': 'https://python.org/?a=1&b="2"'}
+    ], 'name': 'Python', 'type': 'folder'}
+
+
+def test_reads_every_chrome_root():
+    document = json.dumps({'version': 1, 'roots': {
+        'bookmark_bar': {'children': [{'name': 'Google', 'type': 'url', 'url': 'https://www.google.com'}],
+                         'name': 'Bookmarks bar', 'type': 'folder'},
+        'other': {'children': [{'name': 'Work', 'type': 'folder', 'children': [
+            {'name': 'Jira', 'type': 'url', 'url': 'https://jira.example'}]}], 'name': 'Other bookmarks'},
+        'synced': {'children': [], 'name': 'Mobile bookmarks'},
+    }, 'sync_metadata': 'abc'})
+
+    assert list(read_json(io.StringIO(document))) == [
+        ((), 'Google', 'https://www.google.com'),
+        (('Other bookmarks', 'Work'), 'Jira', 'https://jira.example'),
+    ]
+
+
+def test_csv_columns_follow_the_header():
+    document = 'url,folder,name\nhttps://github.com,Dev,GitHub\n,Dev,No URL\nhttps://x.example\n'
+    assert list(read_csv(io.StringIO(document))) == [
+        (('Dev',), 'GitHub', 'https://github.com'),
+        ((), '', 'https://x.example'),
+    ]
+    headerless = 'GitHub,https://github.com,Dev/Tools\n'
+    assert list(read_csv(io.StringIO(headerless))) == [(('Dev', 'Tools'), 'GitHub', 'https://github.com')]
+
+
+def test_text_lists_become_one_folder():
+    records = list(read_txt(io.StringIO('https://github.com\n  http://www.example.org/x \nnot a url\n'), 'Links'))
+
+    assert records == [(('Links',), 'github.com', 'https://github.com'),
+                       (('Links',), 'example.org', 'http://www.example.org/x')]
+    assert ''.join(TextWriter(records)) == 'https://github.com\nhttp://www.example.org/x\n'
+
+
+@pytest.mark.parametrize('from_format', sorted(bookmark_formats.FORMATS))
+@pytest.mark.parametrize('to_format', sorted(bookmark_formats.FORMATS))
+def test_any_format_converts_to_any_other(from_format, to_format):
+    records = RECORDS if from_format != 'txt' else [(('Imported Bookmarks',), 'github.com', 'https://github.com')]
+    document = ''.join(bookmark_formats.FORMATS[from_format].writer(records))
+
+    writer = convert(io.StringIO(document), from_format, to_format)
+    converted = ''.join(writer)
+
+    assert writer.url_count == len(records)
+    if to_format != 'txt':
+        read_back = bookmark_formats.FORMATS[to_format].reader(io.StringIO(converted))
+        assert sorted(read_back) == sorted(records)
+
+
+def test_csv_in_random_folder_order_is_grouped_for_tree_formats():
+    document = ''.join(CSVWriter(RECORDS[::-1] + RECORDS[:2]))
+
+    html = ''.join(convert(io.StringIO(document), 'csv', 'html', max_rows=2))
+
+    assert html.count('<DT><H3>Dev</H3>') == 1
+    assert html.count('<DT><A ') == 7
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the bookmark tree model
+"""
+
+from bookmark_tree import BookmarkTree, Folder, child_path
+
+RECORDS = [
+    ((), 'Top', 'https://top.example'),
+    (('Dev',), 'GitHub', 'https://github.com'),
+    (('Dev', 'Python'), 'Python', 'https://python.org'),
+    (('News',), 'HN', 'https://news.ycombinator.com'),
+    (('Dev',), 'MDN', 'https://developer.mozilla.org'),
+]
+
+
+def test_records_are_grouped_by_folder_in_first_seen_order():
+    tree = BookmarkTree(RECORDS)
+
+    assert len(tree) == 5
+    assert list(tree) == [
+        ((), 'Top', 'https://top.example'),
+        (('Dev',), 'GitHub', 'https://github.com'),
+        (('Dev',), 'MDN', 'https://developer.mozilla.org'),
+        (('Dev', 'Python'), 'Python', 'https://python.org'),
+        (('News',), 'HN', 'https://news.ycombinator.com'),
+    ]
+    assert [folder.path for folder in tree.folders()] == [('Dev',), ('Dev', 'Python'), ('News',)]
+    assert tree.folder(('Dev', 'Python')).name == 'Python'
+    assert list(tree.folder(['Dev']).links()) == [('GitHub', 'https://github.com'),
+                                                 ('MDN', 'https://developer.mozilla.org')]
+
+
+def test_folder_paths_are_shared_and_interned():
+    tree = BookmarkTree(RECORDS)
+    tree.add(['Dev'], 'PyPI', 'https://pypi.org')
+
+    dev_paths = [path for path, title, url in tree if path == ('Dev',)]
+    assert len(dev_paths) == 3
+    assert all(path is tree.folder(('Dev',)).path for path in dev_paths)
+    assert len(list(tree.folders())) == 3
+
+    name = ''.join(['Py', 'thon'])
+    assert child_path(('Dev',), name)[-1] is tree.folder(('Dev', 'Python')).name
+
+
+def test_folders_have_no_instance_dict():
+    tree = BookmarkTree(RECORDS)
+    assert not hasattr(tree.root, '__dict__') and isinstance(tree.root, Folder)
+
+
+def test_cleared_folders_keep_their_subfolders():
+    tree = BookmarkTree(RECORDS)
+    tree.clear_links()
+    assert len(tree) == 0
+    tree.add(('Dev', 'Python'), 'PyPI', 'https://pypi.org')
+
+    assert list(tree) == [(('Dev', 'Python'), 'PyPI', 'https://pypi.org')]
+    assert [folder.path for folder in tree.folders()] == [('Dev',), ('Dev', 'Python'), ('News',)]
+
+
+def test_deep_trees_are_walked_without_recursion():
+    path = tuple(f'level{n}' for n in range(2000))
+    tree = BookmarkTree([(path, 'Deep', 'https://deep.example')])
+
+    assert list(tree) == [(path, 'Deep', 'https://deep.example')]
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming bookmark writer
+The streamed document must be byte-for-byte the same as the old
+template-based output
+"""
+
+import io
+
+from bookmark_writer import BookmarkFoldersHTMLStream, BookmarkHTMLStream, bookmark_title, iter_bookmarks
+
+
+def legacy_bookmarks_html(urls, folder_name):
+    """Render bookmarks the way the original str.format template did"""
+    html_template = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<!-- This is an automatically generated file.
+     It will be read and overwritten.
+     DO NOT EDIT! -->
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+<DL><p>
+    <DT><H3>{folder_name}</H3>
+    <DL><p>
+{bookmark_items}
+    </DL><p>
+</DL><p>"""
+    items = [f'        <DT><A HREF="{url}">{title}</A>' for title, url in iter_bookmarks(urls)]
+    return html_template.format(folder_name=folder_name, bookmark_items='\n'.join(items))
+
+
+URLS = [
+    'https://github.com',
+    'http://www.example.org/path',
+    'httpbin.org',
+    '',
+    'https://[broken',
+]
+
+
+def test_stream_matches_template_output():
+    stream = BookmarkHTMLStream(URLS, 'Dev Tools')
+    assert ''.join(stream) == legacy_bookmarks_html(URLS, 'Dev Tools')
+    assert stream.url_count == 3
+
+
+def test_empty_document():
+    stream = BookmarkHTMLStream([], 'Empty')
+    assert ''.join(stream) == legacy_bookmarks_html([], 'Empty')
+    assert stream.url_count == 0
+
+
+def test_write_to_accepts_generators():
+    output = io.StringIO()
+    count = BookmarkHTMLStream(iter(URLS)).write_to(output)
+    assert count == 3
+    assert output.getvalue() == legacy_bookmarks_html(URLS, 'Imported Bookmarks')
+
+
+def test_single_folder_batch_matches_single_folder_stream():
+    stream = BookmarkFoldersHTMLStream([('Dev Tools', URLS)])
+    assert ''.join(stream) == legacy_bookmarks_html(URLS, 'Dev Tools')
+    assert stream.url_counts == [3]
+
+
+def test_folders_are_written_as_siblings():
+    stream = BookmarkFoldersHTMLStream([('Dev', ['https://github.com']), ('Empty', []), ('News', iter(URLS))])
+    html = ''.join(stream)
+
+    assert stream.url_counts == [1, 0, 3]
+    assert stream.url_count == 4
+    assert html.count('<DT><H3>') == 3
+    assert html.index('<H3>Dev</H3>') < html.index('<H3>Empty</H3>') < html.index('<H3>News</H3>')
+    assert html.count('<DL><p>') == html.count('</DL><p>') == 4
+    assert html.endswith('    </DL><p>\n</DL><p>')
+
+
+def test_bookmark_title():
+    assert bookmark_title('https://www.github.com/x') == 'github.com'
+    assert bookmark_title('https://[broken') == 'https://[broken'
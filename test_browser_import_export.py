@@ -4,6 +4,7 @@ Comprehensive Testing Script for Browser Import/Export Features
 Tests all browsers and bookmark formats
 """
 
+import io
 import os
 import json
 import tempfile
@@ -11,6 +12,8 @@ import subprocess
 import time
 from datetime import datetime
 
+from bookmark_formats import CSVWriter, read_csv
+
 class BrowserImportExportTester:
     def __init__(self):
         self.test_results = []
@@ -223,12 +226,11 @@ class BrowserImportExportTester:
         """Test CSV bookmark import"""
         csv_content = "Name,URL,Folder\nGoogle,https://www.google.com,Bookmarks\nGitHub,https://github.com,Bookmarks"
         
-        lines = csv_content.split('\n')
-        if len(lines) < 2:
-            return False
-        
-        header = lines[0].split(',')
-        return 'Name' in header and 'URL' in header
+        records = list(read_csv(io.StringIO(csv_content)))
+        return records == [
+            (('Bookmarks',), 'Google', 'https://www.google.com'),
+            (('Bookmarks',), 'GitHub', 'https://github.com'),
+        ]
     
     def test_html_export(self):
         """Test HTML bookmark export"""
@@ -444,11 +446,8 @@ class BrowserImportExportTester:
     
     def generate_csv_bookmarks(self, bookmarks):
         """Generate CSV bookmark format"""
-        csv = "Name,URL,Folder\n"
-        for bookmark in bookmarks:
-            csv += f'"{bookmark["title"]}","{bookmark["url"]}","Bookmarks"\n'
-        
-        return csv
+        records = [(('Bookmarks',), bookmark["title"], bookmark["url"]) for bookmark in bookmarks]
+        return ''.join(CSVWriter(records))
     
     def record_test(self, category, test_name, result):
         """Record test result"""
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming Chrome bookmarks JSON reader
+"""
+
+import io
+import json
+
+import pytest
+
+from bookmark_formats import ChromeJSONWriter, read_json
+from bookmark_tree import BookmarkTree
+from chrome_json import iter_json_tokens, read_chrome_json
+
+# Keys in Chrome's order: a folder's name comes after its children
+CHROME_FILE = {
+    'checksum': 'abc123',
+    'roots': {
+        'bookmark_bar': {
+            'children': [
+                {'date_added': '13300000000000000', 'guid': 'g1', 'id': '5',
+                 'meta_info': {'children': [{'url': 'https://not-a-bookmark.example'}]},
+                 'name': 'Café "quoted" \\ back', 'type': 'url', 'url': 'https://cafe.example/?q=é'},
+                {'children': [
+                    {'children': [{'name': 'Deep', 'type': 'url', 'url': 'https://deep.example'}],
+                     'date_added': '1', 'name': 'Inner', 'type': 'folder'},
+                    {'name': 'GitHub', 'type': 'url', 'url': 'https://github.com'},
+                ], 'name': 'Dev', 'type': 'folder'},
+                {'children': [], 'name': 'Empty', 'type': 'folder'},
+                {'name': 'No URL', 'type': 'url'},
+            ],
+            'name': 'Bookmarks bar', 'type': 'folder',
+        },
+        'other': {'children': [{'name': 'Jira', 'type': 'url', 'url': 'https://jira.example'}],
+                  'name': 'Other bookmarks', 'type': 'folder'},
+        'synced': {'children': [{'type': 'url', 'url': 'https://phone.example', 'name': 'Phone'}],
+                   'type': 'folder'},
+        'unknown_root': {'children': [{'name': 'Skipped', 'type': 'url', 'url': 'https://skip.example'}]},
+    },
+    'sync_metadata': 'xyz',
+    'version': 1,
+}
+
+EXPECTED = [
+    ((), 'Café "quoted" \\ back', 'https://cafe.example/?q=é'),
+    (('Dev', 'Inner'), 'Deep', 'https://deep.example'),
+    (('Dev',), 'GitHub', 'https://github.com'),
+    (('Other bookmarks',), 'Jira', 'https://jira.example'),
+    (('Mobile bookmarks',), 'Phone', 'https://phone.example'),
+]
+
+
+class _Unseekable(io.StringIO):
+    def seekable(self):
+        return False
+
+
+def test_reads_chrome_bookmark_files():
+    document = json.dumps(CHROME_FILE, indent=3)
+    assert list(read_chrome_json(io.StringIO(document))) == EXPECTED
+    assert list(read_chrome_json(io.StringIO(json.dumps(CHROME_FILE, ensure_ascii=False)))) == EXPECTED
+
+
+def names_first(value):
+    """Copy of a JSON value with every "name" key moved to the front of its object"""
+    if isinstance(value, list):
+        return [names_first(item) for item in value]
+    if isinstance(value, dict):
+        keys = sorted(value, key=lambda key: key != 'name')
+        return {key: names_first(value[key]) for key in keys}
+    return value
+
+
+def test_names_before_children_and_unseekable_input():
+    document = json.dumps(names_first(CHROME_FILE))
+    assert document.index('"name": "Dev"') < document.index('"name": "GitHub"')
+    assert list(read_chrome_json(_Unseekable(document), chunk_size=16)) == EXPECTED
+
+
+def test_chunk_boundaries_do_not_change_the_result():
+    document = json.dumps(CHROME_FILE, indent=2) + '  \n'
+    for chunk_size in (1, 2, 5, 13, 64):
+        assert list(read_chrome_json(io.StringIO(document), chunk_size=chunk_size)) == EXPECTED
+
+
+def test_tokens():
+    tokens = list(iter_json_tokens(['{"a": [1, true, "x\\u00e9"], "b": {"c": null}, "d": {"e": {}}}']))
+    assert tokens == [
+        ('{', None), ('key', 'a'), ('[', None), ('scalar', '1'), ('scalar', 'true'), ('string', 'xé'), (']', None),
+        ('key', 'b'), ('object', '{"c": null}'),
+        ('key', 'd'), ('{', None), ('key', 'e'), ('object', '{}'), ('}', None),
+        ('}', None),
+    ]
+
+
+def test_round_trip_with_the_writer():
+    records = [((f'Folder {n % 5}', f'Sub {n % 3}'), f'Site {n}', f'https://site{n}.example.com') for n in range(300)]
+    tree = BookmarkTree(records)
+    document = ''.join(ChromeJSONWriter(tree))
+
+    assert list(read_json(io.StringIO(document))) == list(tree)
+
+
+def test_invalid_json_is_rejected():
+    with pytest.raises(ValueError):
+        list(read_chrome_json(io.StringIO('{"roots": {"bookmark_bar": {"children": [ nonsense ]}}}')))
+
+
+@pytest.mark.parametrize('document', [
+    '{"roots": {',
+    '{"roots": {"bookmark_bar": {"children": [{"name": "A", "type": "url", "url": "https://a.com"}',
+    '{"roots": {"bookmark_bar": {"children": [{"name": "A", "url": "https://a.c',
+])
+def test_truncated_json_is_rejected(document):
+    with pytest.raises(ValueError):
+        list(read_chrome_json(io.StringIO(document)))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the background conversion job queue
+"""
+
+import threading
+import time
+
+from conversion_jobs import JobQueue
+
+
+def wait_for(job, timeout=5.0):
+    deadline = time.time() + timeout
+    while not job.finished and time.time() < deadline:
+        time.sleep(0.01)
+    return job.finished
+
+
+def test_jobs_run_in_the_background():
+    finished = []
+
+    def run(job):
+        job.url_count = len(job.urls_text.split())
+        job.result_id = 'result'
+
+    queue = JobQueue(run, workers=2, on_finished=finished.append)
+    queue.start()
+    job = queue.submit('a b c', 'Folder', context={'client': 1})
+
+    assert job.status in ('queued', 'running', 'done')
+    assert wait_for(job)
+    assert job.to_dict()['status'] == 'done'
+    assert job.to_dict()['percent'] == 100.0
+    assert job.url_count == 3
+    assert job.urls_text is None
+    assert queue.get(job.id) is job
+    assert finished == [job] and job.context == {'client': 1}
+    assert queue.metrics()['completed'] == 1
+
+
+def test_failed_jobs_record_the_error():
+    def run(job):
+        raise ValueError('broken input')
+
+    queue = JobQueue(run, workers=1)
+    queue.start()
+    job = queue.submit('a', 'Folder')
+
+    assert wait_for(job)
+    assert job.status == 'failed'
+    assert job.error == 'broken input'
+    assert queue.metrics()['failed'] == 1
+
+
+def test_full_queue_rejects_new_jobs():
+    release = threading.Event()
+    queue = JobQueue(lambda job: release.wait(5), workers=1, max_queue=1)
+    queue.start()
+
+    first = queue.submit('a', 'Folder')
+    deadline = time.time() + 5
+    while first.status == 'queued' and time.time() < deadline:
+        time.sleep(0.01)
+    second = queue.submit('b', 'Folder')
+    third = queue.submit('c', 'Folder')
+
+    assert second is not None
+    assert third is None
+    metrics = queue.metrics()
+    assert metrics['busy_workers'] == 1
+    assert metrics['queue_depth'] == 1
+    assert metrics['rejected'] == 1
+    release.set()
+    assert wait_for(second)
+
+
+def test_only_recent_finished_jobs_are_kept():
+    finished = threading.Semaphore(0)
+    queue = JobQueue(lambda job: None, workers=1, max_finished=2, on_finished=lambda job: finished.release())
+    queue.start()
+    jobs = [queue.submit(str(n), 'Folder') for n in range(4)]
+    for _ in jobs:
+        assert finished.acquire(timeout=5)
+
+    assert [queue.get(job.id) for job in jobs] == [None, None, jobs[2], jobs[3]]
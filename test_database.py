@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite connection pool
+"""
+
+import threading
+
+import pytest
+
+from database import ConnectionPool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / 'test.db'))
+    yield pool
+    pool.close_all()
+
+
+def test_connections_are_reused(pool):
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+    assert pool.created == 1
+
+
+def test_pragmas_applied_to_every_connection(pool):
+    with pool.connection() as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA cache_size').fetchone()[0] == 10000
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+
+
+def test_transaction_commits_and_rolls_back(pool):
+    with pool.transaction() as cursor:
+        cursor.execute('CREATE TABLE items (name TEXT)')
+        cursor.execute("INSERT INTO items VALUES ('kept')")
+
+    with pytest.raises(RuntimeError):
+        with pool.transaction() as cursor:
+            cursor.execute("INSERT INTO items VALUES ('discarded')")
+            raise RuntimeError('boom')
+
+    with pool.connection() as conn:
+        assert conn.execute('SELECT name FROM items').fetchall() == [('kept',)]
+
+
+def test_concurrent_checkouts_get_separate_connections(pool):
+    barrier = threading.Barrier(4)
+    seen = []
+
+    def worker():
+        with pool.connection() as conn:
+            seen.append(conn)
+            barrier.wait()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(conn) for conn in seen}) == 4
+    assert pool.created == 4
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for grouping records by folder with the external sort fallback
+"""
+
+import io
+import random
+
+from bookmark_formats import CSVWriter, NetscapeHTMLWriter, read_csv
+from bookmark_tree import BookmarkTree
+from folder_sort import GroupByFolder
+
+
+def shuffled_records(count, seed=1):
+    rng = random.Random(seed)
+    folders = [('Work',), ('Work', 'Jira'), ('Home', 'Recipes', 'Soup'), ('Home',), ('Reading',)]
+    return [(rng.choice(folders), f'Site {n}', f'https://site{n}.example.com') for n in range(count)]
+
+
+def test_in_memory_and_spilled_grouping_agree():
+    records = shuffled_records(1000)
+    in_memory = GroupByFolder(records)
+    spilled = GroupByFolder(iter(records), max_rows=64)
+
+    grouped = list(in_memory)
+    assert list(spilled) == grouped
+    assert (in_memory.runs, spilled.runs) == (0, 15)
+    assert in_memory.url_count == spilled.url_count == 1000
+
+    # Same folders as building the whole tree, each keeping its links in input order
+    assert sorted(grouped) == sorted(BookmarkTree(records))
+    for folder in {path for path, title, url in records}:
+        assert [r for r in grouped if r[0] == folder] == [r for r in records if r[0] == folder]
+
+
+def test_each_folder_appears_once_in_the_output():
+    records = shuffled_records(500, seed=2)
+    html = ''.join(NetscapeHTMLWriter(GroupByFolder(records, max_rows=50)))
+
+    assert html.count('<DT><H3>') == 6  # Home/Recipes has no links of its own
+    assert html.count('<DT><A ') == 500
+
+
+def test_folder_order_is_first_seen_depth_first():
+    records = [
+        (('B',), 'b1', 'https://b1'),
+        (('A', 'X'), 'x1', 'https://x1'),
+        ((), 'top', 'https://top'),
+        (('A',), 'a1', 'https://a1'),
+        (('B',), 'b2', 'https://b2'),
+    ]
+    assert [title for path, title, url in GroupByFolder(records, max_rows=2)] == ['top', 'b1', 'b2', 'a1', 'x1']
+
+
+def test_randomly_ordered_csv_round_trip():
+    records = shuffled_records(300, seed=3)
+    document = ''.join(CSVWriter(records))
+    assert document.count('\n') == 301
+
+    grouped = list(GroupByFolder(read_csv(io.StringIO(document)), max_rows=40))
+    assert sorted(grouped) == sorted(records)
+    assert list(GroupByFolder(records)) == grouped
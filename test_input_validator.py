@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the input validator
+Checks that the single-pass validator gives exactly the same verdicts as the
+original one-regex-per-rule loop from app.py
+"""
+
+import random
+import re
+
+from input_validator import _FIRST_CHARACTERS, DANGEROUS_PATTERNS, find_dangerous_content, has_unfinished_match, validate_input
+
+
+def legacy_validate_input(data, max_length=10000):
+    """The original validate_input implementation, kept as a reference"""
+    if not isinstance(data, str):
+        return False, "Invalid data type"
+
+    if len(data) > max_length:
+        return False, f"Data too long (max {max_length} characters)"
+
+    dangerous_patterns = [
+        r'<script[^>]*>.*?</script>',
+        r'javascript:',
+        r'data:text/html',
+        r'vbscript:',
+        r'onload\s*=',
+        r'onerror\s*='
+    ]
+
+    for pattern in dangerous_patterns:
+        if re.search(pattern, data, re.IGNORECASE):
+            return False, "Potentially malicious content detected"
+
+    return True, data
+
+
+FRAGMENTS = [
+    '<script>', '</script>', '<SCRIPT src=x>', '<script', '>', '</scr', 'ipt>',
+    'javascript:', 'JavaScript', 'java', 'script:', 'data:text/html', 'data:text/plain',
+    'vbscript:', 'VBScript :', 'onload', 'onLoad =', 'onerror', 'ONERROR\t=', '=', ' ', '\n', '\t',
+    'https://github.com', 'example.com/path', 'alert(1)', '(', ')', 'ſcript', 'K', 'é',
+]
+
+
+def random_text(rng):
+    return ''.join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 12)))
+
+
+def test_rules_are_reported():
+    assert find_dangerous_content('hello <script>alert(1)</script>') == 'script_tag'
+    assert find_dangerous_content('JAVASCRIPT:alert(1)') == 'javascript_url'
+    assert find_dangerous_content('data:text/html;base64,xx') == 'html_data_url'
+    assert find_dangerous_content('vbscript:msgbox') == 'vbscript_url'
+    assert find_dangerous_content('<img onload = "x">') == 'onload_handler'
+    assert find_dangerous_content('<img OnError="x">') == 'onerror_handler'
+    assert find_dangerous_content('github.com\npython.org') is None
+
+
+def test_every_rule_passes_the_first_character_filter():
+    for name, pattern in DANGEROUS_PATTERNS:
+        assert re.match(_FIRST_CHARACTERS, pattern[:2], re.IGNORECASE), name
+
+
+def test_script_tag_must_close_on_the_same_line():
+    assert validate_input('<script>\n</script>') == (True, '<script>\n</script>')
+    assert not validate_input('<script>x</script>')[0]
+
+
+def test_type_and_length_checks():
+    assert validate_input(None) == (False, "Invalid data type")
+    assert validate_input('x' * 101, max_length=100) == (False, "Data too long (max 100 characters)")
+
+
+def test_rejections_are_logged_not_printed(caplog, capsys):
+    with caplog.at_level('WARNING', logger='input_validator'):
+        assert validate_input('javascript:alert(1)') == (False, "Potentially malicious content detected")
+
+    assert capsys.readouterr().out == ''
+    assert [record.getMessage() for record in caplog.records] == ['Rejected input matching rule javascript_url']
+
+
+def test_matches_legacy_on_random_input():
+    rng = random.Random(1234)
+    for _ in range(20000):
+        text = random_text(rng)
+        assert validate_input(text) == legacy_validate_input(text), repr(text)
+
+
+def test_long_matches_are_rejected():
+    for data in ('<script' + ' ' * 300 + '>alert(1)</script>', '<script>' + 'a' * 8000 + '</script>',
+                 '<img onerror' + ' ' * 300 + '=alert(1)>'):
+        assert validate_input(data) == legacy_validate_input(data) == (False, "Potentially malicious content detected")
+
+
+def test_unfinished_matches():
+    assert has_unfinished_match('x <script src=a', 5)
+    assert has_unfinished_match('<SCRIPT>alert(1)', 1)
+    assert has_unfinished_match('<img onerror  \n ', 8)
+    assert not has_unfinished_match('<script>alert(1)\n', 1)
+    assert not has_unfinished_match('onload is fine', 1)
+    assert not has_unfinished_match('x <script src=a', 2)
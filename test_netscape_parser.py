@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental Netscape bookmark parser
+"""
+
+import io
+import random
+
+from bookmark_formats import NetscapeHTMLWriter
+from bookmark_tree import BookmarkTree
+from netscape_parser import NetscapeParser, parse_netscape_chunks, read_netscape_html
+
+EXPORT = """<!DOCTYPE NETSCAPE-Bookmark-file-1>
+<!-- This is an automatically generated file. -->
+<META HTTP-EQUIV="Content-Type" CONTENT="text/html; charset=UTF-8">
+<TITLE>Bookmarks</TITLE>
+<H1>Bookmarks</H1>
+<DL><p>
+    <DT><H3 ADD_DATE="1600000000" PERSONAL_TOOLBAR_FOLDER="true">Toolbar &amp; more</H3>
+    <DL><p>
+        <DT><A HREF="https://www.google.com" ICON="data:image/png;base64,iVBORw0KGgo=" TAGS="a>b">Google</A>
+        <DD>Search <b>engine</b>
+        <DT><H3>Dev</H3>
+        <DL><p>
+            <dt><a href='https://github.com/?a=1&amp;b=2'>Git<b>Hub</b></a>
+            <DT><A HREF=https://python.org>
+                Python
+            </A>
+        </DL><p>
+        <DT><A HREF="">No URL</A>
+        <DT><ABBR>not a link</ABBR>
+    </DL><p>
+    <DT><A HREF="https://example.com">Unclosed
+    <DT><A HREF="https://last.example">Last</A>
+</DL><p>
+"""
+
+EXPECTED = [
+    (('Toolbar & more',), 'Google', 'https://www.google.com'),
+    (('Toolbar & more', 'Dev'), 'GitHub', 'https://github.com/?a=1&b=2'),
+    (('Toolbar & more', 'Dev'), 'Python', 'https://python.org'),
+    ((), 'Unclosed', 'https://example.com'),
+    ((), 'Last', 'https://last.example'),
+]
+
+
+def test_parses_browser_exports():
+    assert list(read_netscape_html(io.StringIO(EXPORT))) == EXPECTED
+
+
+def test_result_does_not_depend_on_chunk_boundaries():
+    rng = random.Random(7)
+    for chunk_size in (1, 2, 3, 7, 64):
+        chunks = [EXPORT[i:i + chunk_size] for i in range(0, len(EXPORT), chunk_size)]
+        assert list(parse_netscape_chunks(chunks)) == EXPECTED
+
+    cuts = sorted(rng.sample(range(1, len(EXPORT)), 40))
+    chunks = [EXPORT[a:b] for a, b in zip([0] + cuts, cuts + [len(EXPORT)])]
+    assert list(parse_netscape_chunks(chunks)) == EXPECTED
+
+
+def test_records_come_out_while_reading():
+    parser = NetscapeParser()
+    first = EXPORT.index('<DT><H3>Dev</H3>')
+
+    assert parser.feed(EXPORT[:first]) == EXPECTED[:1]
+    assert parser.feed(EXPORT[first:]) == EXPECTED[1:]
+    assert parser.feed('<DT><A HREF="https://end.example">End') == []
+    assert parser.close() == [((), 'End', 'https://end.example')]
+    assert parser.url_count == 6
+
+
+def test_buffered_text_stays_small_for_large_files():
+    records = [((f'Folder {n % 10}',), f'Site {n}', f'https://site{n}.example.com/') for n in range(20000)]
+    document = ''.join(NetscapeHTMLWriter(BookmarkTree(records)))
+    parser = NetscapeParser()
+    parsed = []
+    largest_buffer = 0
+    for start in range(0, len(document), 4096):
+        parsed.extend(parser.feed(document[start:start + 4096]))
+        largest_buffer = max(largest_buffer, len(parser._buffer))
+    parsed.extend(parser.close())
+
+    assert parsed == list(BookmarkTree(records))
+    assert largest_buffer < 200
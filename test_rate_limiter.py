@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the sliding-window rate limiter
+"""
+
+import multiprocessing
+
+import pytest
+
+from rate_limiter import SQLiteRateLimiter, SlidingWindowRateLimiter, create_rate_limiter
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_limiter(request, tmp_path):
+    def make(limit, window):
+        return create_rate_limiter(request.param, limit, window, database=str(tmp_path / 'limits.db'))
+    return make
+
+
+def test_limit_is_enforced_within_a_window(make_limiter):
+    limiter = make_limiter(limit=3, window=60)
+
+    assert [limiter.hit('ip', now=0.0) for _ in range(4)] == [True, True, True, False]
+    assert limiter.hit('other', now=0.0)
+    assert limiter.metrics()['limited'] == 1
+
+
+def test_previous_window_is_weighted_by_overlap(make_limiter):
+    limiter = make_limiter(limit=10, window=60)
+    for _ in range(10):
+        assert limiter.hit('ip', now=59.0)
+
+    # A quarter into the next window, 75% of the previous 10 requests still count
+    assert [limiter.hit('ip', now=75.0) for _ in range(3)] == [True, True, True]
+    assert not limiter.hit('ip', now=75.0)
+
+    # Two windows later the old requests no longer count at all
+    assert sum(limiter.hit('ip', now=180.0) for _ in range(12)) == 10
+
+
+def test_denied_requests_are_not_counted(make_limiter):
+    limiter = make_limiter(limit=2, window=60)
+    for _ in range(50):
+        limiter.hit('ip', now=0.0)
+
+    assert sum(limiter.hit('ip', now=120.0) for _ in range(3)) == 2
+
+
+def test_least_recently_seen_key_is_evicted_at_capacity():
+    limiter = SlidingWindowRateLimiter(limit=1, window=60, max_keys=2)
+    limiter.hit('a', now=0.0)
+    limiter.hit('b', now=0.0)
+    limiter.hit('a', now=1.0)
+    limiter.hit('c', now=2.0)
+
+    assert len(limiter) == 2
+    assert not limiter.hit('a', now=3.0)  # 'a' was kept, so it is still limited
+    assert limiter.hit('b', now=3.0)  # 'b' was evicted and starts over
+    assert limiter.metrics()['evicted'] >= 1
+
+
+def test_sweep_removes_only_idle_keys(make_limiter):
+    limiter = make_limiter(limit=5, window=60)
+    for n in range(100):
+        limiter.hit(f'idle-{n}', now=10.0)
+    limiter.hit('active', now=130.0)
+
+    assert limiter.sweep(now=130.0) == 100
+    assert len(limiter) == 1
+    assert limiter.sweep(now=130.0) == 0
+    assert limiter.metrics()['expired'] == 100
+
+
+def _hit_shared_limiter(database, hits, results):
+    limiter = SQLiteRateLimiter(limit=10, window=60, database=database)
+    results.put(sum(limiter.hit('shared-ip', now=1000.0) for _ in range(hits)))
+
+
+def test_sqlite_limit_is_shared_between_processes(tmp_path):
+    database = str(tmp_path / 'limits.db')
+    SQLiteRateLimiter(limit=10, window=60, database=database)  # create the table up front
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    workers = [context.Process(target=_hit_shared_limiter, args=(database, 10, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    allowed = [results.get(timeout=30) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=30)
+
+    # Four workers each tried ten requests, but only ten got through in total
+    assert sum(allowed) == 10
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_rate_limiter('redis', 10, 60)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed result cache
+"""
+
+from artifact_store import ArtifactStore
+from result_cache import ResultCache, cache_key
+
+
+def store_artifact(store, text='x'):
+    with store.create() as (artifact_id, file):
+        file.write(text)
+    return artifact_id
+
+
+def test_hits_and_misses(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    cache = ResultCache(store)
+    key = cache_key(['https://github.com'], 'Dev')
+
+    assert cache.get(key) is None
+    artifact_id = store_artifact(store)
+    cache.add(key, artifact_id)
+
+    assert cache.get(key) == artifact_id
+    assert cache.metrics()['hits'] == 1
+    assert cache.metrics()['misses'] == 1
+
+
+def test_key_depends_on_urls_and_folder():
+    urls = ['https://github.com', 'https://python.org']
+
+    assert cache_key(urls, 'Dev') == cache_key(list(urls), 'Dev')
+    assert cache_key(urls, 'Dev') != cache_key(urls, 'Other')
+    assert cache_key(urls, 'Dev') != cache_key(urls[::-1], 'Dev')
+
+
+def test_key_fields_cannot_run_into_each_other():
+    assert cache_key(['https://y.com'], 'A\nhttps://x.com') != cache_key(['https://x.com\nhttps://y.com'], 'A')
+    assert cache_key(['https://x.com', ''], 'A') != cache_key(['https://x.com'], 'A')
+    assert cache_key([], 'Dev') != cache_key(['Dev'], '')
+
+
+def test_removed_artifacts_are_misses(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    cache = ResultCache(store)
+    artifact_id = store_artifact(store)
+    cache.add('key', artifact_id)
+    store.delete(artifact_id)
+
+    assert cache.get('key') is None
+    assert cache.metrics()['entries'] == 0
+
+
+def test_entry_limit(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    cache = ResultCache(store, max_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.add(key, store_artifact(store))
+
+    assert cache.get('a') is None
+    assert cache.get('c') is not None
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory live statistics aggregator
+"""
+
+import time
+
+from analytics_queue import ConversionEvent
+from stats_aggregator import LiveStatsAggregator
+
+
+def make_event(url_count, folder_name='Folder', conversion_type='download', ip='ip-1',
+               session='s-1', processing_time_ms=100, success=True, created_at=None):
+    return ConversionEvent(url_count, folder_name, conversion_type, ip, 'agent', session,
+                           processing_time_ms, success, created_at or time.time())
+
+
+def test_totals_and_breakdowns():
+    stats = LiveStatsAggregator()
+    stats.record([
+        make_event(5, 'Jobs', 'download', ip='a', processing_time_ms=100),
+        make_event(3, 'Jobs', 'quickadd', ip='b', processing_time_ms=None),
+        make_event(2, 'News', 'download', ip='a', processing_time_ms=300, session='s-2'),
+    ])
+
+    snapshot = stats.snapshot()
+    assert snapshot['total_conversions'] == 3
+    assert snapshot['total_urls'] == 10
+    assert snapshot['unique_users'] == 2
+    assert snapshot['avg_processing_time'] == 200
+    assert snapshot['today_conversions'] == 3
+    assert snapshot['today_unique_users'] == 2
+    assert snapshot['active_sessions'] == 2
+    assert snapshot['conversion_breakdown'] == [
+        {'type': 'download', 'count': 2, 'total_urls': 7},
+        {'type': 'quickadd', 'count': 1, 'total_urls': 3},
+    ]
+    assert snapshot['top_folders'][0] == {'name': 'Jobs', 'count': 2, 'total_urls': 8}
+    assert sum(hour['conversions'] for hour in snapshot['hourly_stats']) == 3
+
+
+def test_recent_activity_is_newest_first_and_bounded():
+    stats = LiveStatsAggregator()
+    stats.record([make_event(count) for count in range(1, 21)])
+
+    recent = stats.snapshot()['recent_activity']
+    assert len(recent) == 15
+    assert [activity['url_count'] for activity in recent[:3]] == [20, 19, 18]
+
+
+def test_failed_conversions_only_count_towards_totals():
+    stats = LiveStatsAggregator()
+    stats.record([make_event(4), make_event(1, success=False)])
+
+    snapshot = stats.snapshot()
+    assert snapshot['success_rate'] == 50.0
+    assert snapshot['conversion_breakdown'] == [{'type': 'download', 'count': 1, 'total_urls': 4}]
+    assert len(snapshot['recent_activity']) == 1
+
+
+def test_old_days_are_pruned_from_the_daily_chart():
+    stats = LiveStatsAggregator()
+    day = 24 * 60 * 60
+    now = time.time()
+    stats.record([make_event(1, created_at=now - offset * day) for offset in range(20, -1, -1)])
+
+    snapshot = stats.snapshot()
+    assert len(snapshot['daily_stats']) == 14
+    assert snapshot['daily_stats'][0]['date'] == time.strftime('%Y-%m-%d', time.localtime(now))
+    assert snapshot['active_sessions'] == 1
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the chunked upload reader
+"""
+
+import io
+import random
+
+import pytest
+
+from input_validator import find_dangerous_content
+from upload_stream import VALIDATION_OVERLAP, ChunkReader, UploadRejected, iter_text_chunks, iter_validated_chunks, iter_validated_lines, iter_validated_records
+
+
+def read_lines(data, chunk_size, **kwargs):
+    return list(iter_validated_lines(iter_text_chunks(io.BytesIO(data), chunk_size), **kwargs))
+
+
+def test_lines_match_split_for_any_chunk_size():
+    rng = random.Random(7)
+    text = '\n'.join(
+        rng.choice(['github.com', 'https://python.org/é', '', '  - news.ycombinator.com\r', '日本.jp'])
+        for _ in range(500)
+    )
+    expected = text.split('\n')
+    if expected[-1] == '':
+        expected.pop()
+
+    for chunk_size in (1, 2, 3, 7, 64, 4096):
+        assert read_lines(text.encode('utf-8'), chunk_size) == expected
+
+
+def test_dangerous_content_across_a_chunk_boundary_is_rejected():
+    data = ('github.com\n' * 10 + 'https://x.com/<script>alert(1)</script>\n').encode('utf-8')
+    for chunk_size in (5, 16, 117, 123):
+        with pytest.raises(UploadRejected):
+            read_lines(data, chunk_size)
+
+
+def validate_in_chunks(text, chunk_size):
+    chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+    try:
+        list(iter_validated_chunks(chunks))
+    except UploadRejected:
+        return False
+    return True
+
+
+def test_matches_longer_than_the_overlap_are_rejected():
+    long = 2 * VALIDATION_OVERLAP
+    for payload in (
+        '<script' + ' ' * 300 + '>alert(1)</script>',
+        '<script' + '\n' * long + '>alert(1)</script>',
+        '{"title": "<script>' + 'x' * long + '</script>"}',
+        '<img onerror' + ' ' * long + '=alert(1)>',
+    ):
+        text = 'github.com\n' * 500 + payload + '\ngithub.com' * 500
+        assert find_dangerous_content(text) is not None
+        for chunk_size in (1000, 4096):
+            assert not validate_in_chunks(text, chunk_size)
+
+
+def test_clean_text_with_long_lines_passes_chunked_validation():
+    for text in (
+        '<script>\n' + 'x\n' * VALIDATION_OVERLAP + '</script>',
+        'https://example.com/onload\n' * 2000,
+        '{"title": "' + 'x' * 2 * VALIDATION_OVERLAP + '"}',
+    ):
+        assert find_dangerous_content(text) is None
+        for chunk_size in (1000, 4096):
+            assert validate_in_chunks(text, chunk_size)
+
+
+def test_long_lines_are_rejected():
+    with pytest.raises(UploadRejected):
+        read_lines(b'a' * 100, 8, max_line_length=50)
+    with pytest.raises(UploadRejected):
+        read_lines(b'a' * 100 + b'\n', 4096, max_line_length=50)
+
+
+def test_invalid_utf8_is_rejected():
+    with pytest.raises(UploadRejected):
+        read_lines(b'github.com\n\xff\xfe\n', 4)
+
+
+def test_chunk_reader_reads_and_iterates_like_a_file():
+    text = 'Name,URL\n"multi\nline",https://a.com\n\nlast line'
+    for size in (1, 3, 8, 100):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert list(ChunkReader(chunks)) == io.StringIO(text).readlines()
+        reader = ChunkReader(chunks)
+        assert reader.read(5) + reader.readline() + reader.read() == text
+        assert reader.read() == ''
+
+
+def test_documents_with_dangerous_content_are_rejected():
+    chunks = ['<A HREF="java', 'script:alert(1)">x</A>']
+    with pytest.raises(UploadRejected):
+        list(iter_validated_chunks(chunks))
+    assert list(iter_validated_chunks(['{"a": 1}', '{"b": 2}'])) == ['{"a": 1}', '{"b": 2}']
+
+
+def test_decoded_records_are_validated():
+    records = [(('Work',), 'A', 'https://a.com'), (('Work',), 'B', 'https://b.com')]
+    assert list(iter_validated_records(iter(records))) == records
+
+    for record in ((('Work',), 'x', 'javascript:alert(1)'), (('Work',), '<script>x</script>', 'https://a.com'),
+                   (('Work', 'onload='), 'x', 'https://a.com')):
+        with pytest.raises(UploadRejected):
+            list(iter_validated_records(iter(records + [record])))
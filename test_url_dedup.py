@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for URL canonicalization and deduplication
+"""
+
+import pytest
+
+from url_dedup import BloomFilter, UrlDeduplicator, canonical_url
+
+
+@pytest.mark.parametrize('a, b', [
+    ('HTTPS://GitHub.com/Python', 'https://github.com/Python'),
+    ('https://github.com:443/', 'https://github.com'),
+    ('http://example.org:80/a/', 'http://example.org/a'),
+    ('https://www.example.org/x?q=1', 'https://example.org/x?q=1'),
+    ('https://example.org/?q=1#top', 'https://example.org?q=1#top'),
+])
+def test_equivalent_urls_share_a_canonical_form(a, b):
+    assert canonical_url(a) == canonical_url(b)
+
+
+@pytest.mark.parametrize('a, b', [
+    ('http://example.org', 'https://example.org'),
+    ('https://example.org:8443', 'https://example.org'),
+    ('https://example.org/Path', 'https://example.org/path'),
+    ('https://example.org/?q=1', 'https://example.org/?q=2'),
+    ('https://mail.example.org', 'https://example.org'),
+])
+def test_different_urls_stay_different(a, b):
+    assert canonical_url(a) != canonical_url(b)
+
+
+def test_first_spelling_is_kept_and_duplicates_are_counted():
+    dedupe = UrlDeduplicator()
+    urls = ['https://GitHub.com/', 'not a url', 'https://github.com', 'not a url', 'https://www.github.com:443',
+            'https://python.org']
+
+    assert list(dedupe.filter(urls)) == ['https://GitHub.com/', 'not a url', 'not a url', 'https://python.org']
+    assert dedupe.duplicates == 2
+    assert not dedupe.approximate
+    assert dedupe.summary() == 'Removed 2 duplicate URLs'
+
+
+def test_records_are_filtered_by_url():
+    records = [(('A',), 'one', 'https://a.com'), (('B',), 'two', 'https://A.com/'), (('B',), 'three', 'https://b.com')]
+
+    assert [title for path, title, url in UrlDeduplicator().filter_records(records)] == ['one', 'three']
+
+
+def test_switches_to_a_bloom_filter_past_the_exact_limit():
+    dedupe = UrlDeduplicator(max_exact=100, bloom_capacity=10000, error_rate=0.001)
+    urls = [f'https://site{n}.example.com/' for n in range(2000)]
+
+    kept = list(dedupe.filter(urls + urls[::7]))
+
+    assert dedupe.approximate and not dedupe.seen
+    assert 'approximate' in dedupe.summary()
+    # Every repeat is caught; a unique URL is only rarely taken for one
+    assert dedupe.duplicates >= len(urls[::7])
+    assert len(kept) >= 2000 - 10
+
+
+def test_bloom_filter_sizing():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+
+    assert bloom.hash_count == 7
+    assert 9000 < bloom.bit_count < 10000
+    assert not bloom.add('a') and bloom.add('a')
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the URL normalizer
+Checks that the compiled single-pass normalizer gives exactly the same output
+as the original per-line regex chain from app.py
+"""
+
+import random
+import re
+
+from url_normalizer import normalize_line, normalize_lines, normalize_text
+
+
+def legacy_clean_and_process_urls(text):
+    """The original clean_and_process_urls implementation, kept as a reference"""
+    lines = text.split('\n')
+    processed_urls = []
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        line = re.sub(r'^[→\-\*\•\d+\.\)]\s*', '', line)
+        line = re.sub(r'^[A-Za-z\s]+\(', '', line)
+        line = re.sub(r'\)$', '', line)
+
+        if re.match(r'https?://', line):
+            processed_urls.append(line)
+            continue
+
+        if re.match(r'^[a-zA-Z0-9][a-zA-Z0-9\-\.]*\.[a-zA-Z]{2,}', line):
+            if not line.startswith('http'):
+                line = 'https://' + line
+            processed_urls.append(line)
+            continue
+
+        if re.match(r'^[a-zA-Z0-9][a-zA-Z0-9\-\.]*\.[a-zA-Z]{2,}$', line):
+            line = 'https://' + line
+            processed_urls.append(line)
+            continue
+
+    return processed_urls
+
+
+SAMPLE_TEXT = """
+https://github.com
+http://example.org/path?q=1
+→ linkedin.com/jobs
+- indeed.com
+* glassdoor.com
+• remote.co
+1. weworkremotely.com
+12. stackoverflow.com
+3) angel.co
+Job Board (monster.com)
+Remote Jobs (https://remoteok.io)
+(dice.com)
+httpbin.org
+www.python.org/
+just some words
+  spaced.example.com
+a.b
+x.io)
+-https://news.ycombinator.com
+example.c0m
+"""
+
+
+def test_matches_legacy_on_sample_text():
+    assert normalize_text(SAMPLE_TEXT) == legacy_clean_and_process_urls(SAMPLE_TEXT)
+
+
+def test_common_formats():
+    assert normalize_line('→ linkedin.com/jobs') == 'https://linkedin.com/jobs'
+    assert normalize_line('Job Board (monster.com)') == 'https://monster.com'
+    assert normalize_line('  https://github.com  ') == 'https://github.com'
+    assert normalize_line('just some words') is None
+    assert normalize_line('   ') is None
+
+
+def test_batch_api_accepts_iterators():
+    lines = iter(SAMPLE_TEXT.split('\n'))
+    assert list(normalize_lines(lines)) == legacy_clean_and_process_urls(SAMPLE_TEXT)
+
+
+def test_matches_legacy_on_random_input():
+    rng = random.Random(1234)
+    fragments = [
+        'http://', 'https://', 'http', 'www.', 'example', '.com', '.io', '.c',
+        '/path', '?q=1', '(', ')', '→', '-', '*', '•', '1', '23', '.', '+',
+        ' ', '\t', 'Label ', 'a', 'Z', '_', 'é', '\r', '\x0b', ' ',
+    ]
+    for _ in range(5000):
+        lines = [
+            ''.join(rng.choice(fragments) for _ in range(rng.randint(0, 8)))
+            for _ in range(rng.randint(1, 5))
+        ]
+        text = '\n'.join(lines)
+        assert normalize_text(text) == legacy_clean_and_process_urls(text), repr(text)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Upload Stream Reader
+Reads a large URL list from a binary stream (a request body or an uploaded
+file) in fixed-size chunks, validates each chunk and yields complete lines,
+so uploads of any size are processed in bounded memory.
+"""
+
+import codecs
+import html
+import io
+
+from input_validator import find_dangerous_content, has_unfinished_match
+
+UPLOAD_CHUNK_SIZE = 64 * 1024  # bytes read per chunk
+MAX_LINE_LENGTH = 8192  # characters; no URL list line needs more
+
+# Text carried over from the end of the previous chunk when validating the
+# next one, so a match that straddles a chunk boundary is still found.
+# Rules such as <script[^>]*> have no length limit, so a window is also
+# rejected when a match could still start further back than this.
+VALIDATION_OVERLAP = MAX_LINE_LENGTH
+
+
+class UploadRejected(ValueError):
+    """The upload cannot be converted; the message is safe to show to the client"""
+
+
+def iter_text_chunks(stream, chunk_size=UPLOAD_CHUNK_SIZE):
+    """Decode a binary stream as UTF-8, yielding text chunks as they are read"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        while True:
+            data = stream.read(chunk_size)
+            if not data:
+                break
+            text = decoder.decode(data)
+            if text:
+                yield text
+        text = decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        raise UploadRejected("Upload is not valid UTF-8 text")
+    if text:
+        yield text
+
+
+def iter_validated_lines(chunks, max_line_length=MAX_LINE_LENGTH):
+    """
+    Yield the lines of a text stream, rejecting the upload as soon as it
+    contains dangerous content or a line longer than max_line_length.
+
+    Only complete lines are checked and passed on; the partial line at the
+    end of a chunk waits for the next one.
+    """
+    too_long = f"Line too long (max {max_line_length} characters)"
+    pending = ''
+    tail = ''
+
+    for chunk in chunks:
+        text = pending + chunk
+        cut = text.rfind('\n') + 1
+        complete, pending = text[:cut], text[cut:]
+        if len(pending) > max_line_length:
+            raise UploadRejected(too_long)
+        if not complete:
+            continue
+
+        lines = complete.split('\n')
+        lines.pop()  # the empty string after the final newline
+        if max(map(len, lines)) > max_line_length:
+            raise UploadRejected(too_long)
+        tail = _validate(tail + complete)
+        yield from lines
+
+    if pending:
+        _validate(tail + pending)
+        yield pending
+
+
+def iter_validated_chunks(chunks):
+    """
+    Pass text chunks through, rejecting the upload as soon as it contains
+    dangerous content. For documents (HTML, JSON, CSV) whose lines may be
+    of any length.
+    """
+    tail = ''
+    for chunk in chunks:
+        tail = _validate(tail + chunk)
+        yield chunk
+
+
+def _is_dangerous(value):
+    """Check value both as it is and with HTML character references decoded"""
+    if find_dangerous_content(value) is not None:
+        return True
+    return '&' in value and find_dangerous_content(html.unescape(value)) is not None
+
+
+def iter_validated_records(records):
+    """
+    Pass (folder_path, title, url) records through, rejecting the upload as
+    soon as a title, URL or folder name contains dangerous content. Readers
+    decode escapes (\\u003a, &#58;) that a scan of the raw text cannot see;
+    values that still hold character references (CSV fields) are checked
+    with them decoded as well.
+    """
+    checked_path = None
+    for record in records:
+        path, title, url = record
+        if _is_dangerous(url) or _is_dangerous(title):
+            raise UploadRejected("Potentially malicious content detected")
+        if path != checked_path:
+            if any(_is_dangerous(name) for name in path):
+                raise UploadRejected("Potentially malicious content detected")
+            checked_path = path
+        yield record
+
+
+class ChunkReader(io.TextIOBase):
+    """Read-only, unseekable text file over an iterable of text chunks"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = ''
+        self._pos = 0  # read position in the buffer
+
+    def readable(self):
+        return True
+
+    def _fill(self):
+        """Append the next chunk to the unread text; False at the end of the stream"""
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _take(self, end):
+        data = self._buffer[self._pos:end]
+        self._pos = end
+        return data
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            while self._fill():
+                pass
+            return self._take(len(self._buffer))
+        while len(self._buffer) - self._pos < size and self._fill():
+            pass
+        return self._take(min(self._pos + size, len(self._buffer)))
+
+    def readline(self, size=-1):
+        end = self._buffer.find('\n', self._pos)
+        while end < 0:
+            searched = len(self._buffer) - self._pos
+            if not self._fill():
+                end = len(self._buffer)
+                break
+            end = self._buffer.find('\n', searched)
+        else:
+            end += 1
+        if size is not None and 0 <= size < end - self._pos:
+            end = self._pos + size
+        return self._take(end)
+
+
+def _validate(window):
+    """Reject dangerous content in window, returning the overlap to carry into the next one"""
+    if find_dangerous_content(window) is not None:
+        raise UploadRejected("Potentially malicious content detected")
+    if has_unfinished_match(window, len(window) - VALIDATION_OVERLAP):
+        raise UploadRejected("Potentially malicious content detected")
+    return window[-VALIDATION_OVERLAP:]
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+URL Deduplicator
+Drops repeated URLs from a stream, comparing them in canonical form: the
+scheme and host are lowercased, default ports (:80 for http, :443 for
+https), a leading "www." (as in bookmark titles) and trailing slashes are
+removed. The first spelling of each URL is the one kept.
+
+Canonical URLs are kept in an exact set. Once it holds max_exact of them,
+they are moved into a Bloom filter and deduplication carries on in bounded
+memory; from then on a small fraction (error_rate) of unique URLs may be
+dropped as duplicates, so the switch is reported.
+"""
+
+import hashlib
+import math
+import re
+
+DEDUPE_MAX_EXACT = 1000000  # canonical URLs held exactly before switching to the Bloom filter
+BLOOM_CAPACITY = 20000000  # URLs the Bloom filter is sized for
+BLOOM_ERROR_RATE = 0.001  # chance of a unique URL being taken for a duplicate
+
+_URL_SCHEMES = ('http://', 'https://')
+_DEFAULT_PORTS = {'http': ':80', 'https': ':443'}
+
+# scheme://[userinfo@]host[:port]path[?query][#fragment], split with one match
+_URL_PATTERN = re.compile(
+    r'([A-Za-z][A-Za-z0-9+.\-]*)://(?:([^/?#@]*)@)?([^/?#]*)([^?#]*)(?:\?([^#]*))?(?:#(.*))?',
+    re.DOTALL
+)
+
+
+def canonical_url(url):
+    """Return the form of url used to compare it with others"""
+    match = _URL_PATTERN.fullmatch(url.strip())
+    if match is None:
+        return url
+    scheme, userinfo, host, path, query, fragment = match.groups()
+    scheme = scheme.lower()
+    host = host.lower()
+    default_port = _DEFAULT_PORTS.get(scheme)
+    if default_port and host.endswith(default_port):
+        host = host[:-len(default_port)]
+    host = host.rstrip(':')
+    if host.startswith('www.'):
+        host = host[4:]
+    if userinfo is not None:
+        host = userinfo + '@' + host
+
+    canonical = f'{scheme}://{host}{path.rstrip("/")}'
+    if query:
+        canonical += '?' + query
+    if fragment:
+        canonical += '#' + fragment
+    return canonical
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings"""
+
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE):
+        self.bit_count = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self.bits = bytearray((self.bit_count + 7) // 8)
+
+    def add(self, key):
+        """Add key, returning True if it was (probably) already present"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        bits = self.bits
+        present = True
+        for i in range(self.hash_count):
+            index = (h1 + i * h2) % self.bit_count
+            mask = 1 << (index & 7)
+            if not bits[index >> 3] & mask:
+                bits[index >> 3] |= mask
+                present = False
+        return present
+
+
+class UrlDeduplicator:
+    """
+    Remembers the URLs seen so far.
+
+    duplicates counts the URLs dropped; approximate is True once the exact
+    set has been replaced by the Bloom filter.
+    """
+
+    def __init__(self, max_exact=DEDUPE_MAX_EXACT, bloom_capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE):
+        self.max_exact = max_exact
+        self.bloom_capacity = bloom_capacity
+        self.error_rate = error_rate
+        self.seen = set()
+        self.bloom = None
+        self.duplicates = 0
+
+    @property
+    def approximate(self):
+        return self.bloom is not None
+
+    def add(self, url):
+        """Record url, returning False if it is a duplicate of one seen before"""
+        key = canonical_url(url)
+        if self.bloom is not None:
+            duplicate = self.bloom.add(key)
+        else:
+            duplicate = key in self.seen
+            if not duplicate:
+                self.seen.add(key)
+                if len(self.seen) > self.max_exact:
+                    self._switch_to_bloom()
+        if duplicate:
+            self.duplicates += 1
+        return not duplicate
+
+    def _switch_to_bloom(self):
+        self.bloom = BloomFilter(max(self.bloom_capacity, len(self.seen)), self.error_rate)
+        for key in self.seen:
+            self.bloom.add(key)
+        self.seen = set()
+
+    def filter(self, urls):
+        """
+        Yield the URLs not seen before. Lines that are not http/https URLs
+        are passed on untouched; the bookmark writers skip them.
+        """
+        add = self.add
+        for url in urls:
+            if not url.startswith(_URL_SCHEMES) or add(url):
+                yield url
+
+    def filter_records(self, records):
+        """Yield the (folder_path, title, url) records whose URL has not been seen before"""
+        add = self.add
+        for record in records:
+            if add(record[2]):
+                yield record
+
+    def summary(self):
+        """One line report of the URLs removed"""
+        message = f"Removed {self.duplicates} duplicate URLs"
+        if self.approximate:
+            message += f" (approximate: more than {self.max_exact} unique URLs, error rate {self.error_rate:g})"
+        return message
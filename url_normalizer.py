@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+URL Normalizer
+Turns messy pasted text (bullets, numbering, "Label (example.com)" lines,
+bare domains) into a clean list of URLs.
+
+All patterns are compiled once at import time and every line is handled by a
+single regex match, so this is safe to call on very large inputs.
+"""
+
+import re
+
+# One pattern does the whole job for a stripped line:
+#   1. drop a leading arrow/bullet/digit/punctuation character plus spaces
+#   2. drop a leading "Some label (" prefix
+#   3. capture the body, minus one trailing ")"
+# The empty "domain" group only participates when the body starts with
+# something that looks like a domain name (e.g. "example.com/path").
+_LINE_PATTERN = re.compile(
+    r'(?:[→\-\*\•\d+\.\)]\s*)?'
+    r'(?:[A-Za-z\s]+\()?'
+    r'(?P<body>(?P<domain>(?=[a-zA-Z0-9][a-zA-Z0-9\-\.]*\.[a-zA-Z]{2,}))?.*?)'
+    r'\)?',
+    re.DOTALL
+)
+
+_URL_SCHEMES = ('http://', 'https://')
+
+
+def normalize_line(line):
+    """
+    Normalize a single line of text.
+
+    Returns the URL for the line, or None if the line does not contain one.
+    """
+    line = line.strip()
+    if not line:
+        return None
+
+    match = _LINE_PATTERN.fullmatch(line)
+    url = match.group('body')
+
+    # Already has http/https
+    if url.startswith(_URL_SCHEMES):
+        return url
+
+    # Domain with optional path (e.g. "example.com/path")
+    if match.group('domain') is not None:
+        if not url.startswith('http'):
+            url = 'https://' + url
+        return url
+
+    return None
+
+
+def normalize_lines(lines):
+    """
+    Normalize an iterable of lines, yielding one URL per line that has one.
+
+    Works with lists, generators and open file objects alike.
+    """
+    for url in map(normalize_line, lines):
+        if url is not None:
+            yield url
+
+
+def normalize_text(text):
+    """Normalize a block of text and return the list of URLs found in it"""
+    return list(normalize_lines(text.split('\n')))